@@ -0,0 +1,42 @@
+"""
+Dati sintetici condivisi dai test, con la struttura di Data/version_1.csv: identificativo
+'Sample code number', feature numeriche e classe 'classtype_v1' (2 = benigno, 4 = maligno).
+Ogni file di test aggiunge solo le colonne e le anomalie specifiche del proprio caso.
+"""
+import os
+import numpy as np
+import pandas as pd
+
+ID_COLUMN = 'Sample code number'
+TARGET_COLUMN = 'classtype_v1'
+
+
+def classi_alternate(n: int) -> np.ndarray:
+    """Etichette 2.0 / 4.0 alternate riga per riga: classi bilanciate in ogni blocco contiguo."""
+    return np.where(np.arange(n) % 2 == 0, 2.0, 4.0)
+
+
+def generatore_e_classi(n: int, seed: int = 0) -> tuple[np.random.Generator, np.ndarray]:
+    """Generatore con seme fisso ed etichette alternate, da cui partono i dataset dei singoli test."""
+    return np.random.default_rng(seed), classi_alternate(n)
+
+
+def dataset_cellule(n: int = 40, seed: int = 0) -> pd.DataFrame:
+    """
+    Piccolo dataset come version_1.csv: identificativo, due feature intere correlate alla classe
+    (quindi ben separabili dal k-NN) e l'etichetta.
+    """
+    rng, classi = generatore_e_classi(n, seed)
+    return pd.DataFrame({
+        ID_COLUMN: np.arange(n) + 1000,
+        'feature1': classi * 2 + rng.integers(0, 3, n),
+        'feature2': classi + rng.integers(0, 2, n),
+        TARGET_COLUMN: classi,
+    })
+
+
+def salva_csv(df: pd.DataFrame, cartella: str, nome: str = 'dataset.csv') -> str:
+    """Scrive il dataset in CSV nella cartella indicata e ne restituisce il percorso."""
+    path = os.path.join(cartella, nome)
+    df.to_csv(path, index=False)
+    return path
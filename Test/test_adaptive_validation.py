@@ -0,0 +1,67 @@
+import random
+import unittest
+import numpy as np
+import pandas as pd
+from validazione import AdaptiveValidation, RandomSubsampling, StratifiedValidation, Holdout
+from validazione.validation import ValidationProcess
+
+from dati_sintetici import generatore_e_classi
+
+
+class TestAdaptiveValidation(unittest.TestCase):
+
+    def setUp(self):
+        # Dataset facilmente separabile: l'accuracy converge rapidamente
+        rng, classi = generatore_e_classi(60)
+        self.data = pd.DataFrame({
+            "feature1": classi * 10 + rng.random(60),
+            "feature2": rng.random(60),
+        })
+        self.labels = pd.Series(classi)
+
+    def test_stops_on_convergence(self):
+        # Con una stima stabile ci si ferma al minimo di iterazioni, ben prima del massimo
+        adaptive = AdaptiveValidation(RandomSubsampling(test_size=0.2, iterazioni=1), tolleranza=0.05,
+                                      min_iterazioni=3, max_iterazioni=50)
+        risultati = adaptive.split_data(self.data, self.labels, k_vicini=3)
+
+        self.assertEqual(adaptive.motivo_arresto, 'convergenza')
+        self.assertEqual(adaptive.iterazioni_eseguite, len(risultati))
+        self.assertLess(len(risultati), 50)
+        self.assertLess(adaptive.ampiezza_intervallo, 0.05)
+
+    def test_stops_at_max_iterations(self):
+        # Con una tolleranza irraggiungibile si eseguono esattamente max_iterazioni
+        labels = pd.Series(np.random.default_rng(1).choice([2.0, 4.0], 60))
+        np.random.seed(0)
+        random.seed(0)
+        adaptive = AdaptiveValidation(StratifiedValidation(iterazioni=1, test_size=0.3), tolleranza=1e-9,
+                                      min_iterazioni=2, max_iterazioni=6)
+        risultati = adaptive.split_data(self.data, labels, k_vicini=3)
+
+        self.assertEqual(len(risultati), 6)
+        self.assertEqual(adaptive.motivo_arresto, 'max_iterazioni')
+        for y_real, y_pred, probabilities in risultati:
+            self.assertEqual(len(y_real), len(y_pred))
+            self.assertEqual(len(y_real), len(probabilities))
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            AdaptiveValidation(Holdout(test_size=0.2))
+        with self.assertRaises(ValueError):
+            AdaptiveValidation(RandomSubsampling(test_size=0.2, iterazioni=1), tolleranza=0)
+        with self.assertRaises(ValueError):
+            AdaptiveValidation(RandomSubsampling(test_size=0.2, iterazioni=1), min_iterazioni=10, max_iterazioni=5)
+
+    def test_incomplete_strategy_fails_on_creation(self):
+        # Una strategia senza generate_splits non si può istanziare (e non fallisce a metà esecuzione)
+        class SoloSplitData(ValidationProcess):
+            def split_data(self, data, labels, k):
+                return []
+
+        with self.assertRaises(TypeError):
+            SoloSplitData()
+
+
+if __name__ == "__main__":
+    unittest.main()
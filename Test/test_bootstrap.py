@@ -0,0 +1,81 @@
+import unittest
+import numpy as np
+import pandas as pd
+from validazione import Bootstrap
+from models.classifier import CustomKNN
+
+
+class TestBootstrap(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame(rng.integers(1, 10, (40, 3)).astype(float), columns=["f1", "f2", "f3"])
+        self.labels = pd.Series(rng.choice([2.0, 4.0], 40))
+
+    def test_output_format(self):
+        # Una tupla (y_real, y_pred, probabilità) per ricampionamento, come le altre strategie
+        bootstrap = Bootstrap(iterazioni=20)
+        risultati = bootstrap.split_data(self.data, self.labels, k_vicini=3)
+
+        self.assertEqual(len(risultati), 20)
+        for y_real, y_pred, probabilities in risultati:
+            self.assertGreater(len(y_real), 0, "Il set out-of-bag non deve essere vuoto")
+            self.assertEqual(len(y_real), len(y_pred))
+            self.assertEqual(len(y_real), len(probabilities))
+            self.assertTrue(all(0.0 <= p <= 1.0 for p in probabilities))
+
+    def test_counts_define_out_of_bag(self):
+        # Ogni ricampionamento ha n estrazioni e il test set è formato dai campioni con conteggio zero
+        bootstrap = Bootstrap(iterazioni=10)
+        counts = bootstrap.draw_counts(len(self.data))
+        self.assertEqual(counts.shape, (10, 40))
+        self.assertTrue((counts.sum(axis=1) == 40).all())
+
+        for train_idx, test_idx in bootstrap.generate_splits(self.data, self.labels):
+            self.assertEqual(len(train_idx), 40)
+            self.assertEqual(len(set(train_idx) & set(test_idx)), 0)
+
+    def test_matches_materialized_resample(self):
+        # Il voto pesato sui conteggi deve coincidere con CustomKNN addestrato sul ricampionamento materializzato
+        bootstrap = Bootstrap(iterazioni=3)
+        np.random.seed(7)
+        counts = bootstrap.draw_counts(len(self.data))
+        np.random.seed(7)
+        risultati = bootstrap.split_data(self.data, self.labels, k_vicini=5)
+
+        for c, (_, _, probabilities) in zip(counts, risultati):
+            train_idx = np.repeat(np.arange(len(self.data)), c)
+            knn = CustomKNN(5)
+            knn.fit(self.data.iloc[train_idx].reset_index(drop=True), self.labels.iloc[train_idx].reset_index(drop=True))
+            attese = [knn.predict_proba(self.data.iloc[i])[4.0] for i in np.flatnonzero(c == 0)]
+            np.testing.assert_allclose(probabilities, attese)
+
+    def test_parallel(self):
+        risultati = Bootstrap(iterazioni=8, n_jobs=2).split_data(self.data, self.labels, k_vicini=3)
+        self.assertEqual(len(risultati), 8)
+
+    def test_parallel_ties_use_distinct_seeds(self):
+        """
+        Verifica che i blocchi votati in processi diversi non estraggano le stesse parità.
+        """
+        n = 200
+        y = np.where(np.arange(n) % 2 == 0, 2.0, 4.0)
+        # I due vicini di ogni punto hanno classi diverse: ogni voto è una parità
+        vicini = (np.arange(n)[:, None] + np.array([1, 2])) % n
+        counts = np.ones((4, n), dtype=np.int32)
+        pred, _, _ = Bootstrap(iterazioni=4, n_jobs=2)._vota(np.arange(n), vicini, y, counts, 2)
+        self.assertFalse(np.array_equal(pred[:2], pred[2:]))
+
+        # Con lo stesso seme globale il risultato è riproducibile
+        np.random.seed(3)
+        primo = Bootstrap(iterazioni=4)._vota(np.arange(n), vicini, y, counts, 2)[0]
+        np.random.seed(3)
+        np.testing.assert_array_equal(Bootstrap(iterazioni=4)._vota(np.arange(n), vicini, y, counts, 2)[0], primo)
+
+    def test_invalid_iterations(self):
+        with self.assertRaises(ValueError):
+            Bootstrap(iterazioni=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
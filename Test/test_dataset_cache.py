@@ -0,0 +1,137 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+from preprocesso import DatasetCache
+from preprocesso.preprocesso_main import DataPreprocessor, preprocess_data
+from dati_sintetici import classi_alternate
+
+
+class TestDatasetCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmpdir.name, 'cache')
+        self.file_path = os.path.join(self.tmpdir.name, 'dataset.csv')
+        pd.DataFrame({
+            'Sample code number': [1001, 1002, 1003, 1004, 1005, 1006],
+            'feature1': [1, 2, 3, None, 5, 6],
+            'feature2': [6, 5, 4, 3, 2, 1],
+            'classtype_v1': [2, 4, 2, 4, 2, 4],
+        }).to_csv(self.file_path, index=False)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _features(self, n):
+        features = pd.DataFrame({'a': np.arange(n, dtype=float), 'b': np.ones(n)},
+                                index=pd.Index(np.arange(n) + 100, name='Sample code number'))
+        labels = pd.Series(classi_alternate(n), index=features.index, name='classtype_v1')
+        return features, labels
+
+    def test_round_trip_memory_mapped(self):
+        """
+        Verifica che feature ed etichette vengano rilette identiche e mappate in memoria.
+        """
+        cache = DatasetCache(self.cache_dir)
+        features, labels = self._features(10)
+        key = cache.key(self.file_path, 'remove', 'normalize')
+        self.assertIsNone(cache.load(key))
+
+        cache.store(key, features, labels)
+        letti, etichette, data = cache.load(key)
+        pd.testing.assert_frame_equal(letti, features)
+        pd.testing.assert_series_equal(etichette, labels)
+        pd.testing.assert_frame_equal(data, features.assign(classtype_v1=labels))
+        self.assertIsInstance(np.load(os.path.join(self.cache_dir, key, 'features.npy'), mmap_mode='r'), np.memmap)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # Copy-on-write: i dati letti sono modificabili e la voce su disco non cambia
+        letti.iloc[0, 0] = -1.0
+        self.assertEqual(cache.load(key)[0].iloc[0, 0], features.iloc[0, 0])
+
+    def test_key_depends_on_content_and_strategies(self):
+        cache = DatasetCache(self.cache_dir)
+        key = cache.key(self.file_path, 'remove', 'normalize')
+        self.assertEqual(key, cache.key(self.file_path, 'remove', 'normalize'))
+        self.assertNotEqual(key, cache.key(self.file_path, 'mean', 'normalize'))
+        self.assertNotEqual(key, cache.key(self.file_path, 'remove', 'standardize'))
+
+        # La lettura a blocchi produce tipi diversi (float32) e quindi una voce diversa
+        self.assertNotEqual(key, cache.key(self.file_path, 'remove', 'normalize', chunksize=2))
+        # Una modifica al codice del preprocessing invalida le voci esistenti
+        with patch.object(DatasetCache, '_impronta_codice', 'altra versione'):
+            self.assertNotEqual(key, cache.key(self.file_path, 'remove', 'normalize'))
+
+        with open(self.file_path, 'a') as file:
+            file.write("1007,7,0,2\n")
+        self.assertNotEqual(key, cache.key(self.file_path, 'remove', 'normalize'))
+
+    def test_lru_eviction_by_size(self):
+        """
+        Verifica che, superato il limite, venga eliminata la voce usata meno di recente.
+        """
+        features, labels = self._features(1000)
+        cache = DatasetCache(self.cache_dir)
+        cache.store('a', features, labels)
+        dimensione = cache.size()
+
+        cache = DatasetCache(self.cache_dir, max_bytes=int(dimensione * 2.5))
+        cache.store('b', features, labels)
+        os.utime(os.path.join(self.cache_dir, 'a', 'meta.json'), (0, 0))
+        os.utime(os.path.join(self.cache_dir, 'b', 'meta.json'), (1, 1))
+        cache.load('a')  # 'a' diventa la voce più recente
+        cache.store('c', features, labels)
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.load('a'))
+        self.assertIsNone(cache.load('b'))
+        self.assertLessEqual(cache.size(), cache.max_bytes)
+
+    def test_preprocess_data_skips_preprocessing_on_hit(self):
+        """
+        Verifica che la seconda esecuzione con le stesse scelte salti pulizia e scaling, ma mostri
+        comunque anteprima e profilo del file prima di chiedere le strategie.
+        """
+        cache = DatasetCache(self.cache_dir)
+        report_path = os.path.join(self.tmpdir.name, 'profilo.json')
+        with patch('builtins.input', side_effect=['remove', 'normalize']):
+            primo = preprocess_data(self.file_path, cache=cache, report_path=report_path)
+        self.assertTrue(primo[0])
+        os.remove(report_path)
+
+        eventi = []
+        profile_data = DataPreprocessor.profile_data
+
+        def profila(preprocessor):
+            eventi.append('profilo')
+            profile_data(preprocessor)
+
+        def risposta(_):
+            eventi.append('input')
+            return ['remove', 'normalize'][eventi.count('input') - 1]
+
+        with patch('builtins.input', side_effect=risposta), \
+                patch.object(DataPreprocessor, 'profile_data', profila), \
+                patch.object(DataPreprocessor, 'handle_missing_values') as handle_missing_values:
+            secondo = preprocess_data(self.file_path, cache=cache, report_path=report_path)
+        handle_missing_values.assert_not_called()
+        self.assertEqual(eventi, ['profilo', 'input', 'input'])
+
+        self.assertTrue(secondo[0])
+        pd.testing.assert_frame_equal(secondo[1], primo[1])
+        pd.testing.assert_series_equal(secondo[2], primo[2])
+        # Il dataset completo ha la stessa forma (compresa 'Sample code number') e il profilo viene riscritto
+        pd.testing.assert_frame_equal(secondo[3], primo[3])
+        self.assertTrue(os.path.exists(report_path))
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            DatasetCache(self.cache_dir, max_bytes=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
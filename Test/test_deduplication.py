@@ -0,0 +1,157 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+from preprocesso import DataPreprocessor, StreamingDeduplicator
+from preprocesso.dataset_cache import DatasetCache
+from preprocesso.preprocesso_main import preprocess_data
+from dati_sintetici import classi_alternate
+
+
+class TestStreamingDeduplicator(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Due "giorni" di esportazioni con campioni ripetuti sia nello stesso file sia tra file diversi.
+        """
+        rng = np.random.default_rng(0)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.giorni = []
+        for codici in ([1, 2, 3, 2, 4, np.nan, np.nan], [4, 5, 6, 1, 7]):
+            self.giorni.append(pd.DataFrame({
+                'Sample code number': codici,
+                'feature1': rng.integers(1, 10, len(codici)),
+                'classtype_v1': classi_alternate(len(codici)).astype(int),
+            }))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_duplicates_within_and_across_chunks(self):
+        dedup = StreamingDeduplicator()
+        primo = dedup.filter(self.giorni[0])
+        # Il secondo '2' viene rimosso, le righe senza chiave restano
+        self.assertEqual(list(primo.index), [0, 1, 2, 4, 5, 6])
+        # Il tipo letto (intero o float) non cambia la chiave
+        secondo = dedup.filter(self.giorni[1].astype({'Sample code number': np.int64}))
+        self.assertEqual(secondo['Sample code number'].tolist(), [5, 6, 7])
+        self.assertEqual(len(dedup), 7)
+        self.assertEqual(dedup.duplicati_rimossi, 3)
+
+    def test_persistent_keys_across_ingests(self):
+        """
+        Verifica che le chiavi salvate in un'ingestione vengano usate in quella successiva.
+        """
+        path = os.path.join(self.tmpdir.name, 'chiavi.npy')
+        primo = StreamingDeduplicator(path=path)
+        list(primo.filter_chunks([self.giorni[0].iloc[:3], self.giorni[0].iloc[3:]]))
+        self.assertTrue(os.path.exists(path))
+
+        secondo = StreamingDeduplicator(path=path)
+        self.assertEqual(len(secondo), 4)
+        letti = pd.concat(secondo.filter_chunks([self.giorni[1]]))
+        self.assertEqual(letti['Sample code number'].tolist(), [5, 6, 7])
+        self.assertEqual(len(StreamingDeduplicator(path=path)), 7)
+
+    def test_bloom_filter_matches_exact_set(self):
+        """
+        Verifica che il filtro di Bloom (anche molto piccolo, con molti falsi positivi) dia lo stesso risultato.
+        """
+        rng = np.random.default_rng(1)
+        chunks = [pd.DataFrame({'Sample code number': rng.integers(0, 3000, 1000)}) for _ in range(5)]
+        esatto = StreamingDeduplicator()
+        attesi = [esatto.filter(chunk) for chunk in chunks]
+        for bits in (64, StreamingDeduplicator.bloom_size(3000)[0]):
+            bloom = StreamingDeduplicator(bloom_bits=bits)
+            for chunk, atteso in zip(chunks, attesi):
+                pd.testing.assert_frame_equal(bloom.filter(chunk), atteso)
+            self.assertEqual(len(bloom), len(esatto))
+
+        bits, hashes = StreamingDeduplicator.bloom_size(1_000_000, 0.01)
+        self.assertEqual(hashes, 7)
+        self.assertAlmostEqual(bits / 1_000_000, 9.59, places=1)
+
+    def test_session_keys_kept_in_few_sorted_runs(self):
+        """
+        Verifica che, con molti blocchi piccoli, le chiavi della sessione restino in O(log n)
+        sequenze ordinate e che il risultato coincida con un insieme Python.
+        """
+        rng = np.random.default_rng(2)
+        dedup = StreamingDeduplicator()
+        viste = set()
+        for _ in range(200):
+            codici = rng.integers(0, 5000, 20)
+            tenute = dedup.filter(pd.DataFrame({'Sample code number': codici}))['Sample code number']
+            attese = [c for i, c in enumerate(codici) if c not in viste and c not in codici[:i]]
+            self.assertEqual(tenute.tolist(), attese)
+            viste.update(codici.tolist())
+
+        sequenze = dedup._sessione._sequenze
+        self.assertEqual(len(dedup), len(viste))
+        self.assertLessEqual(len(sequenze), int(np.log2(len(viste))) + 1)
+        for sequenza in sequenze:
+            self.assertTrue(np.all(sequenza[1:] > sequenza[:-1]))
+
+    def test_row_hash_and_id_keys(self):
+        righe = pd.DataFrame({'a': [1, 1, 2, 1], 'b': [1.0, 1.0, 1.0, 2.0]})
+        self.assertEqual(list(StreamingDeduplicator(key=None).filter(righe).index), [0, 2, 3])
+
+        con_id = righe.set_index(pd.Index([10, 11, 10, 12], name='ID'))
+        self.assertEqual(list(StreamingDeduplicator(key='ID').filter(con_id).index), [10, 11, 12])
+
+        with self.assertRaises(ValueError):
+            StreamingDeduplicator(key='inesistente').filter(righe)
+        with self.assertRaises(ValueError):
+            StreamingDeduplicator(bloom_bits=0)
+
+    def test_preprocessor_integration(self):
+        """
+        Verifica che il preprocessore rimuova i campioni già letti in un'ingestione precedente.
+        """
+        path = os.path.join(self.tmpdir.name, 'chiavi.npy')
+        for giorno, df in enumerate(self.giorni):
+            df.to_csv(os.path.join(self.tmpdir.name, f'giorno_{giorno}.csv'), index=False)
+
+        primo = DataPreprocessor(os.path.join(self.tmpdir.name, 'giorno_0.csv'), chunksize=2,
+                                 deduplicator=StreamingDeduplicator(path=path))
+        self.assertTrue(primo.load_data())
+        self.assertEqual(len(primo.data), 6)
+        # Le chiavi vengono salvate solo con il commit, a preprocessing riuscito
+        self.assertFalse(os.path.exists(path))
+        primo.commit_deduplication()
+        self.assertTrue(os.path.exists(path))
+
+        secondo = DataPreprocessor(os.path.join(self.tmpdir.name, 'giorno_1.csv'),
+                                   deduplicator=StreamingDeduplicator(path=path))
+        self.assertTrue(secondo.load_data())
+        self.assertEqual(secondo.data['Sample code number'].tolist(), [5, 6, 7])
+
+    def test_preprocess_data_commits_only_on_success(self):
+        """
+        Verifica che `preprocess_data` usi il deduplicatore (anche con una cache) e salvi le chiavi
+        solo se il preprocessing termina con successo.
+        """
+        path = os.path.join(self.tmpdir.name, 'chiavi.npy')
+        file_path = os.path.join(self.tmpdir.name, 'giorno_0.csv')
+        self.giorni[0].to_csv(file_path, index=False)
+
+        # Preprocessing fallito (etichetta persa): nessuna chiave salvata
+        with patch.object(DataPreprocessor, 'prepare_features_and_labels', return_value=(False, None, None)), \
+                patch('builtins.input', side_effect=['remove', 'normalize']):
+            preprocess_data(file_path, deduplicator=StreamingDeduplicator(path=path))
+        self.assertFalse(os.path.exists(path))
+
+        with tempfile.TemporaryDirectory() as cache_dir, patch('builtins.input', side_effect=['knn', 'normalize']):
+            successo, _, labels, _ = preprocess_data(file_path, cache=DatasetCache(cache_dir),
+                                                     deduplicator=StreamingDeduplicator(path=path))
+            self.assertEqual(os.listdir(cache_dir), [])
+        self.assertTrue(successo)
+        self.assertEqual(len(labels), 6)
+        self.assertEqual(len(StreamingDeduplicator(path=path)), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+from models import StreamScorer
+from models.neighbors import NeighborIndex
+from preprocesso import FittedReducer, DimensionalityReductionManager, PreprocessingPipeline
+from preprocesso.dimensionality_reduction import FittedPCA, GaussianRandomProjection
+from dati_sintetici import generatore_e_classi
+
+
+class TestDimensionalityReduction(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Dataset largo (40 feature) generato da 4 fattori latenti più un piccolo rumore, con l'etichetta.
+        """
+        n = 400
+        rng, classi = generatore_e_classi(n)
+        latenti = rng.normal(0, 1, (n, 4)) + classi[:, None]
+        X = latenti @ rng.normal(0, 1, (4, 40)) + 0.01 * rng.normal(0, 1, (n, 40))
+        self.data = pd.DataFrame(X, columns=[f'f{i}' for i in range(40)])
+        self.data['classtype_v1'] = classi
+
+    def test_pca_matches_exact_svd(self):
+        pca = FittedPCA(4, random_state=0).fit(self.data, skip_columns=['classtype_v1'])
+        X = self.data.drop(columns='classtype_v1').to_numpy()
+        _, s, vt = np.linalg.svd(X - X.mean(axis=0), full_matrices=False)
+
+        # Stessi sottospazi (a meno del segno) e stessa varianza spiegata della SVD esatta
+        np.testing.assert_allclose(np.abs(vt[:4] @ pca.components), np.eye(4), atol=1e-6)
+        np.testing.assert_allclose(pca.explained_variance_ratio, s[:4] ** 2 / (s ** 2).sum(), rtol=1e-6)
+
+        ridotti = pca.transform(self.data)
+        self.assertEqual(list(ridotti.columns), ['PC1', 'PC2', 'PC3', 'PC4', 'classtype_v1'])
+        pd.testing.assert_series_equal(ridotti['classtype_v1'], self.data['classtype_v1'])
+
+    def test_pca_variance_fraction(self):
+        pca = FittedPCA(0.999, random_state=0).fit(self.data, skip_columns=['classtype_v1'])
+        self.assertEqual(pca.components.shape, (40, 4))
+        self.assertGreaterEqual(pca.explained_variance_ratio.sum(), 0.999)
+
+    def test_random_projection_preserves_distances(self):
+        rp = GaussianRandomProjection(30, random_state=0).fit(self.data, skip_columns=['classtype_v1'])
+        originali = NeighborIndex().fit(self.data.drop(columns='classtype_v1')).distances(self.data.iloc[:20, :40])
+        proiettate = NeighborIndex().fit(rp.transform(self.data)[rp.output_columns]).distances(
+            rp.transform(self.data.iloc[:20])[rp.output_columns])
+        fuori_diagonale = originali > 0
+        rapporti = proiettate[fuori_diagonale] / originali[fuori_diagonale]
+        self.assertAlmostEqual(np.median(rapporti), 1.0, delta=0.1)
+
+        self.assertGreater(GaussianRandomProjection.componenti_minime(10_000, 0.1), 40)
+        # Se il lemma di Johnson-Lindenstrauss non riduce le feature originali, la proiezione è l'identità
+        identita = GaussianRandomProjection().fit(self.data)
+        np.testing.assert_array_equal(identita.components, np.eye(41))
+        np.testing.assert_array_equal(identita.transform(self.data).to_numpy(), self.data.to_numpy())
+
+    def test_persistence_and_consistent_queries(self):
+        """
+        Verifica che un riduttore salvato e ricaricato proietti i dati di query come l'originale
+        e che lo scorer applichi scaling e riduzione ai nuovi record.
+        """
+        train, query = self.data.iloc[:300], self.data.iloc[300:]
+        for strategy in ('pca', 'random_projection'):
+            reducer = DimensionalityReductionManager.create_reducer(strategy, 4, random_state=1)
+            reducer.fit(train, skip_columns=['classtype_v1'])
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = os.path.join(tmpdir, 'riduttore.json')
+                reducer.save(path)
+                caricato = FittedReducer.load(path)
+                # Un riduttore caricato si può salvare di nuovo senza perdere parametri
+                caricato.save(path)
+                ricaricato = FittedReducer.load(path)
+            self.assertIsInstance(caricato, type(reducer))
+            self.assertEqual(ricaricato.to_dict(), reducer.to_dict())
+            pd.testing.assert_frame_equal(caricato.transform(query), reducer.transform(query))
+
+        pca = FittedPCA(4, random_state=0).fit(train, skip_columns=['classtype_v1'])
+        ridotti = pca.transform(train)
+        scorer = StreamScorer(5, reducer=pca).fit(ridotti[pca.output_columns], ridotti['classtype_v1'])
+        risultato = scorer.score(query.drop(columns='classtype_v1'))
+        self.assertGreater((risultato['predizione'] == query['classtype_v1']).mean(), 0.8)
+
+    def test_pipeline_and_errors(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'dataset.csv')
+            self.data.to_csv(path, index=False)
+            features, _ = PreprocessingPipeline(path, reduction='pca', n_components=0.99).output('select')
+            self.assertEqual(list(features.columns), ['PC1', 'PC2', 'PC3', 'PC4'])
+
+        with self.assertRaises(ValueError):
+            FittedPCA(1.5)
+        with self.assertRaises(ValueError):
+            DimensionalityReductionManager.create_reducer('tsne')
+        with self.assertRaises(ValueError):
+            FittedPCA(2).fit(self.data.assign(f0=np.nan))
+        with self.assertRaises(ValueError):
+            FittedPCA(2).transform(self.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
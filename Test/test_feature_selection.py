@@ -0,0 +1,136 @@
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+from preprocesso import FeatureSelector, mutual_information, PreprocessingPipeline
+from validazione import Holdout
+from dati_sintetici import generatore_e_classi
+
+
+class TestFeatureSelection(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Due feature informative, una ridondante con un valore anomalo e due di puro rumore
+        (come 'Blood Pressure' e 'Heart Rate' in version_1.csv).
+        """
+        n = 300
+        rng, classi = generatore_e_classi(n)
+        self.labels = pd.Series(classi, name='classtype_v1')
+        self.data = pd.DataFrame({
+            'informativa1': classi + rng.normal(0, 0.7, n),
+            'rumore1': rng.normal(0, 1, n),
+            'informativa2': classi + rng.normal(0, 0.7, n),
+            'rumore2': rng.uniform(60, 100, n),
+            'ridondante': classi + rng.normal(0, 0.7, n),
+        })
+        self.data.loc[0, 'ridondante'] = 100.0
+
+    def test_mutual_information(self):
+        mi = mutual_information(self.data, self.labels)
+        self.assertEqual(list(mi.index), list(self.data.columns))
+        self.assertTrue((mi >= 0).all())
+        self.assertGreater(mi[['informativa1', 'informativa2', 'ridondante']].min(), 5 * mi[['rumore1', 'rumore2']].max())
+
+        # Confronto con il calcolo diretto da tabella di contingenza per una feature discreta
+        discreta = pd.DataFrame({'x': np.repeat([1, 2, 3], 4)})
+        etichette = np.array([2, 2, 2, 4, 2, 2, 4, 4, 4, 4, 4, 4])
+        congiunta = pd.crosstab(discreta['x'], etichette, normalize=True).to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            attesa = np.nansum(congiunta * np.log(congiunta / np.outer(congiunta.sum(1), congiunta.sum(0))))
+        self.assertAlmostEqual(mutual_information(discreta, etichette, n_bins=3)['x'], attesa)
+
+    def test_filter_removes_noise(self):
+        for direction in ('forward', 'backward'):
+            selector = FeatureSelector(direction=direction).fit(self.data, self.labels)
+            self.assertNotIn('rumore1', selector.selected)
+            self.assertNotIn('rumore2', selector.selected)
+            self.assertTrue(set(selector.selected) <= {'informativa1', 'informativa2', 'ridondante'})
+            self.assertEqual(list(selector.transform(self.data).columns), selector.selected)
+
+    def test_incremental_score_matches_direct_knn(self):
+        """
+        Verifica che il punteggio incrementale coincida con l'accuratezza leave-one-out calcolata da zero.
+        """
+        selector = FeatureSelector(k=3, direction='forward', n_features=2, min_mi=-1).fit(self.data, self.labels)
+        colonne, punteggio = selector.history[-1]
+        self.assertEqual(len(colonne), 2)
+
+        X = self.data[colonne].to_numpy()
+        y = self.labels.to_numpy()
+        distanze = np.sqrt(((X[:, None, :] - X[None, :, :]) ** 2).sum(axis=2))
+        np.fill_diagonal(distanze, np.inf)
+        vicini = np.argsort(distanze, axis=1)[:, :3]
+        predizioni = np.where((y[vicini] == 4.0).sum(axis=1) >= 2, 4.0, 2.0)
+        self.assertAlmostEqual(punteggio, np.mean(predizioni == y))
+
+    def test_partial_distance_and_wrapper_options(self):
+        con_nan = self.data.copy()
+        con_nan.iloc[::7, 0] = np.nan
+        selector = FeatureSelector(direction='backward', n_features=2, min_mi=-1).fit(con_nan, self.labels)
+        self.assertEqual(len(selector.selected), 2)
+        self.assertEqual([len(colonne) for colonne, _ in selector.history], [5, 4, 3, 2])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'selezione.json')
+            selector.save(path)
+            with open(path, encoding='utf-8') as file:
+                self.assertEqual(json.load(file)['selected'], selector.selected)
+
+        with self.assertRaises(ValueError):
+            FeatureSelector(direction='laterale')
+        with self.assertRaises(ValueError):
+            FeatureSelector().transform(self.data)
+
+    def test_small_fold_clamps_k(self):
+        """
+        Verifica che con righe non più di k (ad es. un fold piccolo) i vicini siano al più n - 1
+        e che con una sola riga l'errore sia esplicito.
+        """
+        piccolo, etichette = self.data.iloc[:4], self.labels.iloc[:4]
+        for direction in ('forward', 'backward'):
+            selector = FeatureSelector(k=5, direction=direction, min_mi=-1).fit(piccolo, etichette)
+            self.assertTrue(selector.selected)
+
+        with self.assertRaises(ValueError):
+            FeatureSelector(k=5).fit(self.data.iloc[:1], self.labels.iloc[:1])
+
+    def test_pipeline_stage(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'dataset.csv')
+            self.data.assign(classtype_v1=self.labels).to_csv(path, index=False)
+            pipeline = PreprocessingPipeline(path, feature_selection='forward')
+            features, labels = pipeline.output('select')
+            self.assertNotIn('rumore1', features.columns)
+            self.assertEqual(len(labels), len(features))
+
+            # Cambiando solo la selezione, le fasi precedenti restano in cache
+            pipeline.set(feature_selection=None).output('select')
+            self.assertEqual(pipeline.eseguite, ['select'])
+
+    def test_pipeline_fold_fits_on_training_rows(self):
+        """
+        Verifica che `fold` addestri la selezione sulle sole righe di training di ogni split.
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'dataset.csv')
+            self.data.assign(classtype_v1=self.labels).to_csv(path, index=False)
+            pipeline = PreprocessingPipeline(path, feature_selection='forward',
+                                             validation_strategy=Holdout(test_size=0.3), random_state=0)
+            train_idx, test_idx = pipeline.output('split')[0]
+            X_train, y_train, X_test, y_test = pipeline.fold(train_idx, test_idx)
+
+            scalati = pipeline.output('scale')[0]
+            atteso = FeatureSelector(direction='forward', random_state=0).fit(
+                scalati.drop(columns='classtype_v1').iloc[train_idx], y_train)
+            self.assertEqual(list(X_train.columns), atteso.selected)
+            self.assertEqual(list(X_test.columns), atteso.selected)
+            self.assertEqual(len(X_test), len(test_idx))
+            np.testing.assert_array_equal(y_test.to_numpy(), self.labels.to_numpy()[test_idx])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 import pandas as pd
 import numpy as np
@@ -5,6 +7,11 @@ import numpy as np
 from preprocesso.feature_transformer import (
     Normalizer,
     Standardizer,
+    FittedTransformer,
+    FittedNormalizer,
+    FittedStandardizer,
+    FittedRobustScaler,
+    RobustScaler,
     FeatureTransformationManager
 )
 
@@ -163,6 +170,106 @@ class TestFeatureTransformer(unittest.TestCase):
                 data=self.sample_data
             )
 
+    def test_fitted_normalizer_uses_training_parameters(self):
+        """
+        Verifica che un trasformatore addestrato su un sottoinsieme scali i nuovi batch
+        con i parametri appresi, senza ricalcolarli sui nuovi dati.
+        """
+        train = self.sample_data.iloc[:3]
+        normalizer = FittedNormalizer().fit(train, skip_columns=['col_constant'])
+        self.assertEqual(normalizer.columns, ['col_numeric_1', 'col_numeric_2'])
+
+        batch = self.sample_data.iloc[3:]
+        transformed = normalizer.transform(batch)
+        # col_numeric_1: min=10, max=30 sul training => 40 -> 1.5, 50 -> 2.0
+        np.testing.assert_allclose(transformed['col_numeric_1'], [1.5, 2.0])
+        # col_numeric_2 costante sul training => invariata
+        np.testing.assert_allclose(transformed['col_numeric_2'], [300, 500])
+        self.assertTrue((transformed['col_categorical'] == batch['col_categorical']).all())
+
+    def test_fitted_transformer_matches_stateless(self):
+        fitted = FittedStandardizer().fit(self.sample_data)
+        pd.testing.assert_frame_equal(fitted.transform(self.sample_data), Standardizer().transform(self.sample_data))
+
+    def test_fitted_transformer_serialization(self):
+        """
+        Verifica che i parametri salvati e ricaricati producano la stessa trasformazione.
+        """
+        standardizer = FeatureTransformationManager.create_transformer('standardize').fit(self.sample_data)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'scaler.json')
+            standardizer.save(path)
+            caricato = FittedTransformer.load(path)
+
+        self.assertIsInstance(caricato, FittedStandardizer)
+        pd.testing.assert_frame_equal(caricato.transform(self.sample_data), standardizer.transform(self.sample_data))
+
+    def test_inplace_scaling_writes_into_buffer(self):
+        """
+        Verifica che, su un unico blocco float, lo scaling in-place scriva nel buffer esistente
+        lasciando invariate le colonne saltate.
+        """
+        data = pd.DataFrame(np.array([[1.0, 10.0, 2.0], [3.0, 30.0, 4.0], [5.0, 20.0, 2.0]]),
+                            columns=['a', 'b', 'label'])
+        buffer = data.to_numpy()
+        atteso = Normalizer().transform(data, skip_columns=['label'])
+
+        risultato = FittedNormalizer().fit_transform(data, skip_columns=['label'], inplace=True)
+        self.assertIs(risultato, data)
+        self.assertTrue(np.shares_memory(buffer, data['a'].to_numpy()))
+        np.testing.assert_allclose(buffer, atteso.to_numpy())
+        np.testing.assert_array_equal(data['label'], [2.0, 4.0, 2.0])
+
+    def test_float_block_keeps_dtype_and_leaves_input(self):
+        data = pd.DataFrame({'a': [1, 2, 3], 'b': [4, 4, 8]}, dtype=np.float32)
+        originale = data.copy()
+        risultato = FittedStandardizer().fit_transform(data)
+
+        pd.testing.assert_frame_equal(data, originale)
+        self.assertTrue((risultato.dtypes == np.float32).all())
+        np.testing.assert_allclose(risultato.std(), [1.0, 1.0], rtol=1e-6)
+
+    def test_inplace_mixed_dtypes(self):
+        data = self.sample_data.copy()
+        risultato = FeatureTransformationManager.apply_transformation('normalize', data, inplace=True)
+        self.assertIs(risultato, data)
+        self.assertAlmostEqual(data['col_numeric_1'].max(), 1.0)
+        self.assertTrue((data['col_categorical'] == self.sample_data['col_categorical']).all())
+
+    def test_robust_scaler_median_and_iqr(self):
+        """
+        Verifica che lo scaling robusto usi mediana e IQR, ignorando l'outlier.
+        """
+        transformed_df = FeatureTransformationManager.apply_transformation('robust', self.sample_data)
+        # col_numeric_1: mediana 30, IQR 40 - 20 = 20
+        np.testing.assert_allclose(transformed_df['col_numeric_1'], [-1.0, -0.5, 0.0, 0.5, 1.0])
+        # col_numeric_2: mediana 100, IQR 300 - 100 = 200 (l'outlier 500 non cambia i parametri)
+        np.testing.assert_allclose(transformed_df['col_numeric_2'], [0.0, 0.0, 0.0, 1.0, 2.0])
+        self.assertTrue((transformed_df['col_constant'] == self.sample_data['col_constant']).all())
+        pd.testing.assert_frame_equal(RobustScaler().transform(self.sample_data), transformed_df)
+
+    def test_robust_scaler_from_streaming_sketches(self):
+        from preprocesso.streaming_statistics import StreamingStatistics
+
+        rng = np.random.default_rng(0)
+        data = pd.DataFrame({'a': rng.lognormal(size=20000), 'b': rng.normal(size=20000)})
+        stats = StreamingStatistics.from_chunks((data.iloc[i:i + 2000] for i in range(0, 20000, 2000)), quantile_k=400, seed=0)
+
+        da_stats = FittedRobustScaler().fit_from_statistics(stats)
+        esatto = FittedRobustScaler().fit(data)
+        np.testing.assert_allclose(da_stats.offset, esatto.offset, atol=0.05)
+        np.testing.assert_allclose(da_stats.scale, esatto.scale, rtol=0.05)
+
+        with self.assertRaises(ValueError):
+            FittedRobustScaler().fit_from_statistics(StreamingStatistics.from_chunks([data]))
+
+    def test_fitted_transformer_errors(self):
+        with self.assertRaises(ValueError):
+            FittedNormalizer().transform(self.sample_data)
+        normalizer = FittedNormalizer().fit(self.sample_data)
+        with self.assertRaises(ValueError):
+            normalizer.transform(self.sample_data.drop(columns=['col_numeric_1']))
+
 
 if __name__ == '__main__':
     unittest.main()
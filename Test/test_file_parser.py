@@ -0,0 +1,284 @@
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+from preprocesso.file_parser import (ParserDispatcher, StreamingSchema, ParquetFileParser, FeatherFileParser,
+                                     ExcelFileParser, NDJSONFileParser)
+from preprocesso.missing_data_manager import MissingDataHandler
+from preprocesso.preprocesso_main import DataPreprocessor
+
+
+class TestStreamingParser(unittest.TestCase):
+
+    def setUp(self):
+        """
+        File CSV/TSV di esempio con un valore non interpretabile, un'etichetta mancante e un ID duplicato
+        che cade in un blocco diverso dal primo.
+        """
+        self.df = pd.DataFrame({
+            'ID': [1, 2, 3, 4, 2, 5],
+            'Sample code number': [1000025, 1002945, 1015425, 1016277, 1002945, 1017023],
+            'A': ['1', '2', 'x', '4', '2', '6'],
+            'B': [2.5, 3.5, 4.5, 5.5, 3.5, 6.5],
+            'classtype_v1': [2, 4, np.nan, 2, 4, 4],
+        })
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmpdir.name, 'dati.csv')
+        self.tsv_path = os.path.join(self.tmpdir.name, 'dati.tsv')
+        self.df.to_csv(self.csv_path, index=False)
+        self.df.to_csv(self.tsv_path, index=False, sep='\t')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_chunks_use_declared_dtypes(self):
+        # Le feature sono float32, l'etichetta è un intero compatto, l'identificativo resta float64
+        parser = ParserDispatcher.get_parser(self.csv_path)
+        for chunk in parser.parse_chunks(self.csv_path, StreamingSchema(), chunksize=2):
+            self.assertEqual(chunk['A'].dtype, np.float32)
+            self.assertEqual(chunk['B'].dtype, np.float32)
+            self.assertEqual(chunk['classtype_v1'].dtype, np.int8)
+            self.assertEqual(chunk['Sample code number'].dtype, np.float64)
+
+    def test_chunks_match_full_parse(self):
+        # Concatenando i blocchi si ottengono gli stessi valori del parsing completo seguito dalla conversione
+        for path in [self.csv_path, self.tsv_path]:
+            parser = ParserDispatcher.get_parser(path)
+            streamed = pd.concat(parser.parse_chunks(path, StreamingSchema(), chunksize=2))
+
+            full = MissingDataHandler.convert_numerical_values(parser.parse_file(path))
+            full = MissingDataHandler.drop_rows_with_missing_target(full, target_col='classtype_v1')
+
+            self.assertEqual(list(streamed.index), list(full.index))
+            np.testing.assert_allclose(streamed.to_numpy(dtype=float), full.to_numpy(dtype=float))
+
+    def test_duplicates_removed_across_chunks(self):
+        # L'ID 2 compare nel primo e nel terzo blocco: deve restare una sola volta
+        parser = ParserDispatcher.get_parser(self.csv_path)
+        streamed = pd.concat(parser.parse_chunks(self.csv_path, chunksize=2))
+        self.assertEqual(sorted(streamed.index), [1, 2, 4, 5])
+        self.assertFalse(streamed['classtype_v1'].isna().any())
+
+    def test_skip_columns_not_read(self):
+        parser = ParserDispatcher.get_parser(self.csv_path)
+        schema = StreamingSchema(skip_columns=['Sample code number'])
+        streamed = pd.concat(parser.parse_chunks(self.csv_path, schema, chunksize=3))
+        self.assertNotIn('Sample code number', streamed.columns)
+
+    def test_chunks_parsed_with_declared_dtypes(self):
+        """
+        Verifica che le colonne numeriche siano lette direttamente nei tipi dello schema e che solo la
+        colonna con un valore non numerico ('x' nel secondo blocco) venga riletta come testo.
+        """
+        parser = ParserDispatcher.get_parser(self.csv_path)
+        with patch('preprocesso.file_parser.pd.read_csv', wraps=pd.read_csv) as read_csv:
+            streamed = pd.concat(parser.parse_chunks(self.csv_path, StreamingSchema(), chunksize=2))
+        letture = [c.kwargs['dtype'] for c in read_csv.call_args_list if c.kwargs.get('chunksize')]
+        self.assertEqual(letture[0], {'Sample code number': np.float64, 'A': np.float32, 'B': np.float32,
+                                      'classtype_v1': np.float32})
+        self.assertNotIn('A', letture[-1])
+        self.assertIn('B', letture[-1])
+        self.assertEqual(streamed['A'].dtype, np.float32)
+        self.assertEqual(sorted(streamed.index), [1, 2, 4, 5])
+
+    def test_preprocessor_chunks_stay_compact(self):
+        # Con le colonne ignorate escluse dallo schema, l'intero blocco resta float32 anche dopo la pulizia
+        preprocessor = DataPreprocessor(self.csv_path, chunksize=2)
+        self.assertTrue(preprocessor.load_data())
+        self.assertNotIn('Sample code number', preprocessor.data.columns)
+        preprocessor.handle_missing_values('keep')
+        self.assertTrue((preprocessor.data.dtypes == np.float32).all())
+
+    def test_invalid_chunksize(self):
+        parser = ParserDispatcher.get_parser(self.csv_path)
+        with self.assertRaises(ValueError):
+            list(parser.parse_chunks(self.csv_path, chunksize=0))
+
+
+class TestNDJSONParser(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'log.jsonl')
+        self.records = [
+            {'ID': i, 'Sample code number': 1000 + i, 'A': i % 10, 'B': '?' if i == 3 else i / 2,
+             'classtype_v1': 2 if i % 2 else 4}
+            for i in range(10)
+        ]
+        self._scrivi(self.records)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _scrivi(self, records, coda=''):
+        with open(self.path, 'a') as file:
+            for record in records:
+                file.write(json.dumps(record) + '\n')
+            file.write(coda)
+
+    def test_dispatcher_and_full_parse(self):
+        self.assertIsInstance(ParserDispatcher.get_parser(self.path), NDJSONFileParser)
+        self.assertIsInstance(ParserDispatcher.get_parser('log.ndjson'), NDJSONFileParser)
+
+        parser = ParserDispatcher.get_parser(self.path, skip_columns=['Sample code number'])
+        full = parser.parse_file(self.path)
+        self.assertEqual(list(full.columns), ['A', 'B', 'classtype_v1'])
+
+        streamed = pd.concat(parser.parse_chunks(self.path, chunksize=4))
+        self.assertEqual([len(c) for c in parser.parse_chunks(self.path, chunksize=4)], [4, 4, 2])
+        pd.testing.assert_frame_equal(streamed, StreamingSchema().coerce(full))
+        self.assertTrue(np.isnan(streamed.loc[3, 'B']))
+        self.assertEqual(parser.offset, os.path.getsize(self.path))
+
+    def test_resume_from_offset(self):
+        """
+        Verifica che `read_new` legga solo i record aggiunti, ignori la riga ancora in scrittura e gli ID già visti.
+        """
+        parser = NDJSONFileParser()
+        self.assertEqual(sum(len(c) for c in parser.read_new(self.path, chunksize=3)), 10)
+        self.assertEqual(sum(len(c) for c in parser.read_new(self.path)), 0)
+
+        nuovi = [{'ID': 20, 'A': 1, 'B': 2, 'classtype_v1': 2}, {'ID': 5, 'A': 1, 'B': 2, 'classtype_v1': 2}]
+        self._scrivi(nuovi, coda='{"ID": 21, "A": 1')
+        letti = pd.concat(parser.read_new(self.path))
+        self.assertEqual(list(letti.index), [20])
+
+        # Completata la riga, alla ripresa viene letto il solo record 21
+        self._scrivi([], coda=', "B": 3, "classtype_v1": 4}\n')
+        letti = pd.concat(parser.read_new(self.path))
+        self.assertEqual(list(letti.index), [21])
+        self.assertEqual(parser.offset, os.path.getsize(self.path))
+
+    def test_offset_follows_delivered_chunks(self):
+        # Interrompendo la lettura dopo due blocchi, la ripresa parte dal primo record non restituito
+        parser = NDJSONFileParser()
+        chunks = parser.parse_chunks(self.path, chunksize=4)
+        next(chunks)
+        next(chunks)
+        chunks.close()
+        letti = pd.concat(parser.read_new(self.path, chunksize=4))
+        self.assertEqual(list(letti.index), [8, 9])
+
+    def test_invalid_lines(self):
+        self._scrivi([], coda='[1, 2]\n')
+        with self.assertRaises(ValueError):
+            list(NDJSONFileParser().parse_chunks(self.path))
+        with self.assertRaises(ValueError):
+            list(NDJSONFileParser().parse_chunks(self.path, offset=-1))
+
+
+@unittest.skipUnless(importlib.util.find_spec('openpyxl'), "openpyxl non installato")
+class TestExcelStreamingParser(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Cartella di lavoro con un foglio di note e il foglio dei dati, con un ID duplicato tra blocchi.
+        """
+        self.df = pd.DataFrame({
+            'ID': [1, 2, 3, 4, 2, 5],
+            'Sample code number': [1000025, 1002945, 1015425, 1016277, 1002945, 1017023],
+            'A': ['1', '2', '?', '4', '2', '6'],
+            'B': [2.5, 3.5, 4.5, 5.5, 3.5, 6.5],
+            'classtype_v1': [2, 4, 2, 2, 4, 4],
+        })
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'dati.xlsx')
+        with pd.ExcelWriter(self.path) as writer:
+            self.df.to_excel(writer, sheet_name='dati', index=False)
+            pd.DataFrame({'nota': ['esportazione di prova']}).to_excel(writer, sheet_name='note', index=False)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_chunks_match_full_parse(self):
+        parser = ParserDispatcher.get_parser(self.path)
+        chunks = list(parser.parse_chunks(self.path, StreamingSchema(), chunksize=2))
+        self.assertEqual([len(c) for c in chunks], [2, 2, 1])
+        self.assertEqual(chunks[0]['A'].dtype, np.float32)
+        self.assertEqual(chunks[0]['classtype_v1'].dtype, np.int8)
+
+        streamed = pd.concat(chunks)
+        full = StreamingSchema().coerce(parser.parse_file(self.path))
+        pd.testing.assert_frame_equal(streamed, full)
+        self.assertEqual(list(streamed.index), [1, 2, 3, 4, 5])
+        self.assertTrue(np.isnan(streamed.loc[3, 'A']))
+
+    def test_column_projection(self):
+        parser = ParserDispatcher.get_parser(self.path, skip_columns=['Sample code number'])
+        self.assertEqual(list(parser.parse_file(self.path).columns), ['A', 'B', 'classtype_v1'])
+        streamed = pd.concat(parser.parse_chunks(self.path, chunksize=4))
+        self.assertEqual(list(streamed.columns), ['A', 'B', 'classtype_v1'])
+
+        parser = ExcelFileParser(columns=['ID', 'B', 'classtype_v1'])
+        streamed = pd.concat(parser.parse_chunks(self.path, chunksize=4))
+        self.assertEqual(list(streamed.columns), ['B', 'classtype_v1'])
+        with self.assertRaises(ValueError):
+            list(ExcelFileParser(columns=['inesistente']).parse_chunks(self.path))
+
+    def test_sheet_selection(self):
+        note = pd.concat(ExcelFileParser(sheet_name='note').parse_chunks(self.path, StreamingSchema(target_col=None)))
+        self.assertEqual(list(note.columns), ['nota'])
+        self.assertEqual(len(note), 1)
+        with self.assertRaises(ValueError):
+            list(ExcelFileParser(sheet_name='inesistente').parse_chunks(self.path))
+        with self.assertRaises(ValueError):
+            list(ExcelFileParser(sheet_name=5).parse_chunks(self.path))
+
+
+@unittest.skipUnless(importlib.util.find_spec('pyarrow'), "pyarrow non installato")
+class TestColumnarParser(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'Sample code number': [1000025.0, 1002945.0, 1015425.0],
+            'A': [1.0, 2.0, np.nan],
+            'B': [2.5, 3.5, 4.5],
+            'classtype_v1': [2.0, 4.0, 2.0],
+        })
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.paths = {}
+        for estensione in ['parquet', 'feather', 'arrow']:
+            path = os.path.join(self.tmpdir.name, f'dati.{estensione}')
+            if estensione == 'parquet':
+                self.df.to_parquet(path)
+            else:
+                self.df.to_feather(path)
+            self.paths[estensione] = path
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_dispatcher(self):
+        self.assertIsInstance(ParserDispatcher.get_parser(self.paths['parquet']), ParquetFileParser)
+        self.assertIsInstance(ParserDispatcher.get_parser(self.paths['feather']), FeatherFileParser)
+        self.assertIsInstance(ParserDispatcher.get_parser(self.paths['arrow']), FeatherFileParser)
+
+    def test_column_projection(self):
+        # Le colonne saltate non vengono lette, le altre coincidono con l'originale
+        for path in self.paths.values():
+            parser = ParserDispatcher.get_parser(path, skip_columns=['Sample code number'])
+            df = parser.parse_file(path)
+            self.assertEqual(list(df.columns), ['A', 'B', 'classtype_v1'])
+            pd.testing.assert_frame_equal(df, self.df.drop(columns=['Sample code number']))
+
+    def test_explicit_columns(self):
+        parser = ParquetFileParser(columns=['B', 'classtype_v1'])
+        self.assertEqual(list(parser.parse_file(self.paths['parquet']).columns), ['B', 'classtype_v1'])
+        with self.assertRaises(ValueError):
+            ParquetFileParser(columns=['inesistente']).parse_file(self.paths['parquet'])
+
+    def test_chunks(self):
+        for path in self.paths.values():
+            parser = ParserDispatcher.get_parser(path)
+            chunks = list(parser.parse_chunks(path, StreamingSchema(), chunksize=2))
+            self.assertEqual(sum(len(c) for c in chunks), 3)
+            self.assertEqual(chunks[0]['A'].dtype, np.float32)
+
+
+if __name__ == '__main__':
+    unittest.main()
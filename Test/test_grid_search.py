@@ -0,0 +1,120 @@
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+from models.classifier import CustomKNN
+from models.neighbors import NeighborIndex, vote_neighbors
+from validazione import GridSearch, RandomSearch, RandomSubsampling, Holdout
+from dati_sintetici import dataset_cellule, salva_csv
+
+
+class TestGridSearch(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Crea un piccolo dataset CSV con la stessa struttura di version_1.csv
+        (colonna identificativa, feature numeriche e classe 2/4) e qualche valore mancante.
+        """
+        df = dataset_cellule(40)
+        df.loc[3, 'feature1'] = np.nan
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.file_path = salva_csv(df, self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_grid_covers_all_combinations(self):
+        """
+        Verifica che ogni combinazione della griglia compaia una sola volta nei risultati.
+        """
+        search = GridSearch(
+            self.file_path, k_values=[1, 3, 5],
+            missing_strategies=['remove', 'mean'], scaling_strategies=['normalize', 'standardize'],
+            validation_strategies=[RandomSubsampling(test_size=0.25, iterazioni=3)], random_state=0
+        )
+        risultati = search.run()
+
+        self.assertEqual(len(risultati), 3 * 2 * 2)
+        self.assertFalse(risultati.duplicated(subset=['k', 'missing_strategy', 'scaling_strategy']).any())
+        self.assertTrue((risultati['n_split'] == 3).all())
+        # Ordinati dal migliore al peggiore
+        self.assertTrue(risultati['Accuracy Rate'].is_monotonic_decreasing)
+
+    def test_stage_cache_reuses_outputs(self):
+        """
+        Verifica che parsing, imputazione e scaling vengano calcolati una sola volta per parametri.
+        """
+        search = GridSearch(
+            self.file_path, k_values=[1, 3],
+            missing_strategies=['remove', 'mean'], scaling_strategies=['normalize', 'standardize'],
+            validation_strategies=[Holdout(test_size=0.25), RandomSubsampling(test_size=0.25, iterazioni=2)],
+            random_state=0
+        )
+        search.run()
+
+        # 1 parse + 2 missing + 4 scaling
+        self.assertEqual(search.cache.misses, 7)
+
+    def test_random_search_samples_subset(self):
+        """
+        Verifica che la ricerca casuale valuti solo il numero richiesto di combinazioni.
+        """
+        search = RandomSearch(
+            self.file_path, k_values=[1, 3, 5, 7],
+            missing_strategies=['remove', 'mean'], n_iter=3, random_state=1
+        )
+        self.assertEqual(len(search.run()), 3)
+
+    def test_invalid_k(self):
+        with self.assertRaises(ValueError):
+            GridSearch(self.file_path, k_values=[0, 3])
+
+    def test_shared_neighbors_match_custom_knn(self):
+        """
+        Verifica che i vicini condivisi tra i k producano le stesse probabilità di CustomKNN.
+        """
+        rng = np.random.default_rng(1)
+        X = pd.DataFrame(rng.integers(1, 5, (50, 3)).astype(float))
+        y = pd.Series(rng.choice([2.0, 4.0], 50))
+        X_train, y_train, X_test = X.iloc[:35], y.iloc[:35], X.iloc[35:]
+
+        _, vicini = NeighborIndex().fit(X_train).kneighbors(X_test, 7)
+        for k in [1, 3, 7]:
+            knn = CustomKNN(k)
+            knn.fit(X_train, y_train)
+            attese = [knn.predict_proba(X_test.iloc[i])[4.0] for i in range(len(X_test))]
+            _, probabilita = vote_neighbors(y_train.to_numpy()[vicini], k)
+            np.testing.assert_allclose(probabilita, attese)
+
+    def test_kneighbors_matches_full_sort(self):
+        """
+        Verifica che la selezione con argpartition e il prodotto matriciale diano gli stessi vicini
+        dell'ordinamento completo delle distanze calcolate dalle differenze, anche con molte parità
+        (misure discrete normalizzate) e con valori mancanti.
+        """
+        rng = np.random.default_rng(1)
+        train = (rng.integers(1, 11, (300, 4)) - 1) / 9
+        test = (rng.integers(1, 11, (30, 4)) - 1) / 9
+        con_nan = train.copy()
+        con_nan[rng.random(train.shape) < 0.2] = np.nan
+
+        for riferimento in (train, con_nan):
+            for metric in ('euclidean', 'manhattan'):
+                index = NeighborIndex(block_size=8, metric=metric).fit(riferimento)
+                dist, vicini = index.kneighbors(test, 9)
+                diff = test[:, None, :] - riferimento[None, :, :]
+                comuni = (~np.isnan(diff)).sum(axis=2)
+                diff = np.nan_to_num(diff)
+                somme = np.abs(diff).sum(axis=2) if metric == 'manhattan' else (diff ** 2).sum(axis=2)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    attese = somme * 4 / comuni if metric == 'manhattan' else np.sqrt(somme * 4 / comuni)
+                attese[comuni == 0] = np.inf
+                ordine = np.argsort(attese, axis=1, kind='stable')[:, :9]
+                np.testing.assert_array_equal(vicini, ordine)
+                np.testing.assert_allclose(dist, np.take_along_axis(attese, ordine, axis=1))
+                np.testing.assert_allclose(index.distances(test), attese, atol=1e-7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+import pandas as pd
+from validazione import LearningCurve, RandomSubsampling, Holdout
+from models.classifier import CustomKNN
+from models.neighbors import NeighborIndex
+from metriche.metrics import Metrics
+
+
+class TestLearningCurve(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame(rng.integers(1, 10, (50, 3)).astype(float), columns=["f1", "f2", "f3"])
+        self.labels = pd.Series(rng.choice([2.0, 4.0], 50))
+
+    def test_curve_shape(self):
+        # Una riga per ogni coppia (frazione, split), con dimensioni del training crescenti
+        curve = LearningCurve(RandomSubsampling(test_size=0.2, iterazioni=4), frazioni=[0.25, 0.5, 1.0])
+        risultati = curve.run(self.data, self.labels, k_vicini=3)
+
+        self.assertEqual(len(risultati), 3 * 4)
+        self.assertEqual(sorted(risultati['n_train'].unique()), [10, 20, 40])
+        riassunto = curve.summarize(risultati)
+        self.assertEqual(len(riassunto), 3)
+
+    def test_nested_sizes_match_custom_knn(self):
+        # Ogni dimensione deve coincidere con CustomKNN addestrato sul prefisso annidato del training set
+        k = 3
+        np.random.seed(3)
+        train_idx, test_idx = Holdout(test_size=0.2).generate_splits(self.data, self.labels)[0]
+        permutazione = np.random.permutation(len(train_idx))
+        train_perm = train_idx[permutazione]
+
+        np.random.seed(3)
+        curve = LearningCurve(Holdout(test_size=0.2), frazioni=[0.5, 1.0], metriche=["Area Under Curve"])
+        risultati = curve.run(self.data, self.labels, k_vicini=k)
+
+        for _, riga in risultati.iterrows():
+            prefisso = train_perm[:int(riga['n_train'])]
+            knn = CustomKNN(k)
+            knn.fit(self.data.iloc[prefisso], self.labels.iloc[prefisso])
+            y_test = [1 if v == 4.0 else 0 for v in self.labels.iloc[test_idx]]
+            proba = [knn.predict_proba(self.data.iloc[i])[4.0] for i in test_idx]
+            attesa = Metrics()._area_under_curve(y_test, proba)
+            self.assertAlmostEqual(riga['Area Under Curve'], attesa)
+
+    def test_prefix_neighbors_match_refit(self):
+        # I vicini tra i primi n punti coincidono con quelli di un indice costruito sul solo prefisso
+        rng = np.random.default_rng(1)
+        train, test = rng.normal(size=(200, 3)), rng.normal(size=(30, 3))
+        richieste = [(20, 3), (100, 5), (200, 5)]
+        risultati = NeighborIndex(block_size=7).fit(train).kneighbors_prefixes(test, richieste)
+        for (n_train, k), (dist, vicini) in zip(richieste, risultati):
+            attesi = NeighborIndex().fit(train[:n_train]).kneighbors(test, k)
+            np.testing.assert_array_equal(vicini, attesi[1])
+            np.testing.assert_allclose(dist, attesi[0])
+
+    def test_invalid_fractions(self):
+        with self.assertRaises(ValueError):
+            LearningCurve(Holdout(test_size=0.2), frazioni=[0.0, 0.5])
+        with self.assertRaises(ValueError):
+            LearningCurve(Holdout(test_size=0.2), frazioni=[1.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
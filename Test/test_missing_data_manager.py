@@ -55,6 +55,39 @@ class TestMissingDataManager(unittest.TestCase):
         # Quindi nessun NaN in col C
         self.assertFalse(converted_df["C"].isna().any())
 
+    def test_clean_numeric_single_pass(self):
+        """
+        Verifica che clean_numeric converta tutto in un unico blocco float, elimini le righe
+        con target mancante o non numerico e conti i valori convertiti in NaN.
+        """
+        data = self.sample_data.assign(C=["10", "x", "30", "?"], classtype_v1=["1", "2", "z", None])
+        cleaned, convertiti = MissingDataHandler.clean_numeric(data, target_col='classtype_v1')
+
+        # Righe 2 (target 'z') e 3 (target mancante) eliminate
+        self.assertEqual(list(cleaned.index), [0, 1])
+        self.assertEqual(cleaned._mgr.nblocks, 1)
+        self.assertTrue(all(pd.api.types.is_float_dtype(t) for t in cleaned.dtypes))
+        self.assertTrue(pd.isna(cleaned.loc[1, "C"]))
+        # I NaN già presenti non vengono contati come conversioni
+        self.assertEqual(convertiti.to_dict(), {"A": 0, "B": 0, "classtype_v1": 1, "C": 2})
+
+    def test_clean_numeric_keeps_compact_dtype(self):
+        """
+        Verifica che dati già compatti (feature float32, etichetta intera) restino in float32.
+        """
+        data = pd.DataFrame({"A": np.array([1, 2], dtype=np.float32), "classtype_v1": np.array([2, 4], dtype=np.int8)})
+        cleaned, _ = MissingDataHandler.clean_numeric(data, target_col='classtype_v1')
+        self.assertTrue((cleaned.dtypes == np.float32).all())
+
+    def test_handle_missing_data_return_counts(self):
+        df_cleaned, convertiti = MissingDataStrategyManager.handle_missing_data(
+            strategy='remove', data=self.sample_data.assign(C=["10", "20", "30", "n/a"]),
+            target_col='classtype_v1', return_counts=True
+        )
+        # Riga 1 (target mancante), riga 2 (A mancante) e riga 3 (C non numerico) eliminate
+        self.assertEqual(list(df_cleaned.index), [0])
+        self.assertEqual(convertiti["C"], 1)
+
     def test_drop_rows_with_missing_target(self):
         """
         Verifica che le righe con classtype_v1 = NaN vengano rimosse.
@@ -175,6 +208,85 @@ class TestMissingDataManager(unittest.TestCase):
         self.assertFalse(df_cleaned["B"].isna().any())
         self.assertFalse(df_cleaned["classtype_v1"].isna().any())
 
+    def test_fill_missing_with_knn_matches_row_by_row(self):
+        """
+        Verifica che l'imputazione KNN a blocchi coincida con il calcolo riga per riga
+        delle distanze sulle sole feature presenti, standardizzate sulle righe complete.
+        """
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(60, 4)) * [1.0, 10.0, 100.0, 0.1]
+        X[rng.random(X.shape) < 0.15] = np.nan
+        X[5] = np.nan  # riga senza feature presenti: riceve la media delle righe complete
+        df = pd.DataFrame(X, columns=list("abcd"))
+
+        imputato = MissingDataHandler.fill_missing_with_knn(df, n_neighbors=3, block_size=4)
+        self.assertFalse(imputato.isna().any().any())
+        self.assertTrue(df.isna().any().any())  # l'input non viene modificato
+
+        complete = X[~np.isnan(X).any(axis=1)]
+        scala = complete.std(axis=0)
+        for i in np.flatnonzero(np.isnan(X).any(axis=1)):
+            presenti = ~np.isnan(X[i])
+            if presenti.any():
+                distanze = (((complete[:, presenti] - X[i, presenti]) / scala[presenti]) ** 2).sum(axis=1)
+                atteso = complete[np.argsort(distanze)[:3]].mean(axis=0)
+            else:
+                atteso = complete.mean(axis=0)
+            np.testing.assert_allclose(imputato.iloc[i].to_numpy(), np.where(presenti, X[i], atteso))
+
+    def test_handle_missing_data_knn(self):
+        """
+        Verifica che la strategia 'knn' non elimini righe e non usi né imputi il target.
+        """
+        df_cleaned = MissingDataStrategyManager.handle_missing_data(
+            strategy='knn',
+            data=self.sample_data,
+            target_col='classtype_v1'
+        )
+        # Solo la riga 1 (target mancante) viene eliminata
+        self.assertEqual(list(df_cleaned.index), [0, 2, 3])
+        self.assertFalse(df_cleaned.isna().any().any())
+        # Riga 2 (A mancante): le righe complete sono solo la 0 e la 3 (A = 1 e 4), quindi k si riduce a 2
+        self.assertAlmostEqual(df_cleaned.loc[2, "A"], 2.5)
+
+    def test_knn_ignores_large_id_column(self):
+        """
+        Verifica che una colonna identificativa con valori dell'ordine di 1e6 (come 'Sample code number')
+        esclusa con `exclude_columns` non venga imputata né influenzi la scelta dei vicini.
+        """
+        data = pd.DataFrame({
+            # La riga 1 ha un ID vicino a quelli delle righe 3 e 4, ma feature simili alle righe 0 e 2
+            "Sample code number": [1000025, 1017000, 1002945, 1016277, 1017023, np.nan],
+            "A": [1, 1, 1, 9, 9, 9],
+            "B": [2, np.nan, 2, 8, 8, 8],
+            "classtype_v1": [2, 2, 2, 4, 4, 4],
+        })
+        pulito = MissingDataStrategyManager.handle_missing_data(
+            strategy='knn', data=data, target_col='classtype_v1',
+            exclude_columns=['Sample code number', 'classtype_v1']
+        )
+        # L'ID mancante resta tale
+        self.assertTrue(pd.isna(pulito.loc[5, "Sample code number"]))
+        # Con k=5 si userebbero quasi tutte le righe: si riduce k per verificare i vicini scelti
+        vicini = MissingDataHandler.fill_missing_with_knn(
+            data.astype(float), n_neighbors=2, exclude_columns=['Sample code number', 'classtype_v1']
+        )
+        self.assertEqual(vicini.loc[1, "B"], 2.0)
+        self.assertTrue(pd.isna(vicini.loc[5, "Sample code number"]))
+
+    def test_knn_invariant_to_column_scale(self):
+        """
+        Verifica che moltiplicare una colonna per una costante non cambi i vicini scelti.
+        """
+        rng = np.random.default_rng(1)
+        X = rng.normal(size=(40, 3))
+        X[rng.random(X.shape) < 0.2] = np.nan
+        df = pd.DataFrame(X, columns=list("abc"))
+        base = MissingDataHandler.fill_missing_with_knn(df, n_neighbors=3)
+        scalato = MissingDataHandler.fill_missing_with_knn(df.assign(a=df["a"] * 1e6), n_neighbors=3)
+        np.testing.assert_allclose(scalato["a"] / 1e6, base["a"])
+        np.testing.assert_allclose(scalato[["b", "c"]], base[["b", "c"]])
+
     def test_handle_missing_data_invalid_strategy(self):
         """
         Verifica che venga sollevata ValueError se la strategia non è valida.
@@ -0,0 +1,99 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from models.classifier import CustomKNN
+from models.neighbors import NeighborIndex
+from preprocesso.missing_data_manager import MissingDataStrategyManager
+from validazione import RandomSubsampling
+from dati_sintetici import generatore_e_classi
+
+
+class TestPartialDistance(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Dataset con valori mancanti lasciati come NaN (circa il 20% delle celle).
+        """
+        n = 50
+        rng, classi = generatore_e_classi(n)
+        X = np.column_stack([classi + rng.normal(0, 1, n) for _ in range(4)])
+        X[rng.random(X.shape) < 0.2] = np.nan
+        self.data = pd.DataFrame(X, columns=['f1', 'f2', 'f3', 'f4'])
+        self.labels = pd.Series(classi, name='classtype_v1')
+
+    def test_partial_distance_value(self):
+        """
+        Verifica la formula: somma sulle feature comuni riscalata per n_feature / n_comuni.
+        """
+        knn = CustomKNN(1, nan_aware=True)
+        a = np.array([1.0, np.nan, 3.0, 4.0])
+        b = np.array([2.0, 5.0, np.nan, 6.0])
+        # Feature comuni: 1 e 4 -> (1 + 4) * 4 / 2 = 10
+        self.assertAlmostEqual(knn._euclidean_distance(a, b), np.sqrt(10.0))
+        self.assertEqual(knn._euclidean_distance(a, np.array([np.nan, 1.0, np.nan, np.nan])), np.inf)
+        # Senza NaN coincide con la distanza euclidea
+        self.assertAlmostEqual(knn._euclidean_distance(np.zeros(2), np.array([3.0, 4.0])), 5.0)
+
+    def test_engine_matches_custom_knn(self):
+        """
+        Verifica che il motore a blocchi in modalità parziale produca le stesse predizioni di CustomKNN.
+        """
+        train, test = self.data.iloc[:35], self.data.iloc[35:]
+        y_train = self.labels.iloc[:35]
+
+        index = NeighborIndex(block_size=4).fit(train)
+        dist, vicini = index.kneighbors(test, 5)
+        self.assertFalse(np.isnan(dist).any())
+
+        knn = CustomKNN(5, nan_aware=True)
+        knn.fit(train, y_train)
+        self.assertTrue(knn._parziale)
+        for riga, (_, punto) in enumerate(test.iterrows()):
+            distanze = train.apply(lambda r: knn._euclidean_distance(r.values, punto.values), axis=1)
+            self.assertEqual(list(distanze.nsmallest(5).index), list(train.index[vicini[riga]]))
+            np.testing.assert_allclose(dist[riga], distanze.nsmallest(5).to_numpy())
+
+    def test_custom_knn_partial_mode_is_opt_in(self):
+        """
+        Verifica che CustomKNN non attivi da solo la distanza parziale: senza `nan_aware` i NaN
+        si propagano alla distanza, perché non vengono cercati coppia per coppia.
+        """
+        knn = CustomKNN(5)
+        knn.fit(self.data, self.labels)
+        self.assertFalse(knn._parziale)
+        a = np.array([1.0, np.nan, 3.0])
+        self.assertTrue(np.isnan(knn._euclidean_distance(a, np.zeros(3))))
+        knn.metric = 'manhattan'
+        self.assertTrue(np.isnan(knn._distance(a, np.zeros(3))))
+
+    def test_auto_mode_on_query_with_nan(self):
+        """
+        Verifica che la modalità automatica si attivi anche quando solo i punti di query hanno NaN.
+        """
+        completi = self.data.dropna()
+        index = NeighborIndex().fit(completi)
+        self.assertFalse(np.isnan(index.distances(self.data)).any())
+        self.assertTrue(np.isnan(NeighborIndex(nan_aware=False).fit(completi).distances(self.data)).any())
+
+    def test_keep_strategy_validation_without_imputation(self):
+        """
+        Verifica che con la strategia 'keep' la validazione funzioni senza imputare i dati.
+        """
+        dataset = self.data.assign(classtype_v1=self.labels)
+        pulito = MissingDataStrategyManager.handle_missing_data('keep', dataset, target_col='classtype_v1')
+        self.assertEqual(len(pulito), len(dataset))
+        self.assertTrue(pulito.isna().any().any())
+
+        np.random.seed(0)
+        risultati = RandomSubsampling(test_size=0.3, iterazioni=2).split_data(
+            pulito.drop(columns='classtype_v1'), pulito['classtype_v1'], 3
+        )
+        self.assertEqual(len(risultati), 2)
+        for y_real, y_pred, proba in risultati:
+            self.assertEqual(len(y_real), len(y_pred))
+            self.assertTrue(set(y_pred) <= {2.0, 4.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
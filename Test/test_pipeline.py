@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+from preprocesso import PreprocessingPipeline, MissingDataStrategyManager, FeatureTransformationManager
+from validazione import Holdout
+from dati_sintetici import generatore_e_classi, salva_csv
+
+
+class TestPreprocessingPipeline(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Crea un piccolo dataset CSV con la struttura di version_1.csv e un valore non numerico.
+        """
+        n = 30
+        rng, classi = generatore_e_classi(n)
+        df = pd.DataFrame({
+            'Sample code number': np.arange(n) + 1000,
+            'feature1': rng.integers(1, 10, n).astype(object),
+            'feature2': rng.integers(1, 10, n),
+            'classtype_v1': classi.astype(int),
+        })
+        df.loc[3, 'feature1'] = '?'
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.file_path = salva_csv(df, self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_matches_imperative_steps(self):
+        """
+        Verifica che la pipeline produca le stesse feature del percorso a passi separati.
+        """
+        pipeline = PreprocessingPipeline(self.file_path, missing_strategy='mean', scaling_strategy='standardize')
+        features, labels = pipeline.output('select')
+
+        raw = pd.read_csv(self.file_path).set_index('Sample code number')
+        cleaned = MissingDataStrategyManager.handle_missing_data('mean', raw, target_col='classtype_v1')
+        scaled = FeatureTransformationManager.apply_transformation('standardize', cleaned, skip_columns=['classtype_v1'])
+
+        np.testing.assert_allclose(features.to_numpy(), scaled.drop(columns='classtype_v1').to_numpy())
+        np.testing.assert_array_equal(labels.to_numpy(), scaled['classtype_v1'].to_numpy())
+        self.assertEqual(pipeline.eseguite, ['parse', 'coerce', 'impute', 'scale', 'select'])
+
+    def test_late_option_reruns_only_later_stages(self):
+        pipeline = PreprocessingPipeline(self.file_path)
+        pipeline.output('select')
+
+        pipeline.set(scaling_strategy='robust')
+        pipeline.output('select')
+        self.assertEqual(pipeline.eseguite, ['scale', 'select'])
+
+        pipeline.set(missing_strategy='median')
+        pipeline.output('scale')
+        self.assertEqual(pipeline.eseguite, ['impute', 'scale'])
+
+        # Tornando a un'opzione già vista non si ricalcola nulla
+        pipeline.set(missing_strategy='remove', scaling_strategy='normalize')
+        pipeline.output('select')
+        self.assertEqual(pipeline.eseguite, [])
+
+    def test_split_stage_and_file_change(self):
+        """
+        Verifica la fase 'split' e che la modifica del file invalidi l'intera catena.
+        """
+        pipeline = PreprocessingPipeline(self.file_path, validation_strategy=Holdout(test_size=0.25), random_state=0)
+        splits = pipeline.output('split')
+        self.assertEqual(len(splits), 1)
+        train_idx, test_idx = splits[0]
+        self.assertEqual(len(train_idx) + len(test_idx), len(pipeline.output('select')[0]))
+
+        # Una strategia equivalente ha la stessa impronta
+        pipeline.set(validation_strategy=Holdout(test_size=0.25))
+        pipeline.output('split')
+        self.assertEqual(pipeline.eseguite, [])
+
+        with open(self.file_path, 'a') as file:
+            file.write("2000,5,5,2\n")
+        os.utime(self.file_path, ns=(0, 10 ** 18))
+        pipeline.output('coerce')
+        self.assertEqual(pipeline.eseguite, ['parse', 'coerce'])
+
+    def test_invalid_usage(self):
+        pipeline = PreprocessingPipeline(self.file_path)
+        with self.assertRaises(ValueError):
+            pipeline.set(colore='rosso')
+        with self.assertRaises(ValueError):
+            pipeline.output('train')
+        with self.assertRaises(ValueError):
+            pipeline.output('split')
+
+
+if __name__ == '__main__':
+    unittest.main()
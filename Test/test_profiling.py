@@ -0,0 +1,119 @@
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+from preprocesso import DatasetProfiler, PreprocessingPipeline
+from dati_sintetici import generatore_e_classi
+
+
+class TestDatasetProfiler(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Dataset con valori mancanti, un valore non numerico, una riga duplicata e un ID ripetuto.
+        """
+        n = 200
+        rng, classi = generatore_e_classi(n)
+        self.data = pd.DataFrame({
+            'ID': np.arange(n),
+            'continua': rng.normal(0, 1, n),
+            'discreta': rng.integers(1, 11, n).astype(object),
+            'classtype_v1': classi,
+        })
+        self.data.loc[[5, 50], 'continua'] = np.nan
+        self.data.loc[7, 'discreta'] = '?'
+        self.data.loc[9, 'discreta'] = None
+        self.data.loc[150] = self.data.loc[20]  # riga duplicata (ID compreso)
+        self.data = self.data.set_index('ID')
+        self.chunks = [self.data.iloc[i:i + 33] for i in range(0, n, 33)]
+
+    def test_single_pass_matches_pandas(self):
+        report = DatasetProfiler().update(self.data).report()
+
+        self.assertEqual(report['righe'], 200)
+        self.assertEqual(report['righe_duplicate'], 1)
+        self.assertEqual(report['id_duplicati'], 1)
+
+        continua = report['colonne']['continua']
+        self.assertEqual(continua['mancanti'], 2)
+        self.assertAlmostEqual(continua['tasso_mancanti'], 0.01)
+        self.assertAlmostEqual(continua['media'], self.data['continua'].mean())
+        self.assertAlmostEqual(continua['std'], self.data['continua'].std())
+        self.assertEqual(continua['valori_distinti'], self.data['continua'].nunique())
+
+        discreta = report['colonne']['discreta']
+        self.assertEqual((discreta['mancanti'], discreta['non_numerici']), (1, 1))
+        self.assertAlmostEqual(discreta['tasso_mancanti'], 0.01)
+        self.assertEqual(discreta['valori_distinti'], self.data['discreta'].nunique())
+        self.assertEqual((discreta['min'], discreta['max']), (1.0, 10.0))
+        self.assertEqual(report['colonne']['classtype_v1']['valori_distinti'], 2)
+
+    def test_chunks_and_merge_match_single_pass(self):
+        """
+        Verifica che il profilo a blocchi e l'unione di profili parziali coincidano con una sola passata.
+        """
+        completo = DatasetProfiler().update(self.data).report()
+        self._assert_report_equal(DatasetProfiler.from_chunks(self.chunks).report(), completo)
+
+        unito = DatasetProfiler.from_chunks(self.chunks[:3]).merge(DatasetProfiler.from_chunks(self.chunks[3:]))
+        self._assert_report_equal(unito.report(), completo)
+
+    def test_duplicates_over_many_small_chunks(self):
+        """
+        Verifica il conteggio di righe e ID duplicati su molti blocchi piccoli e che gli hash visti
+        restino in O(log n) sequenze ordinate.
+        """
+        rng = np.random.default_rng(3)
+        righe = pd.DataFrame({'a': rng.integers(0, 40, 3000), 'b': rng.integers(0, 40, 3000)},
+                             index=pd.Index(rng.integers(0, 2000, 3000), name='ID'))
+        profiler = DatasetProfiler.from_chunks([righe.iloc[i:i + 10] for i in range(0, len(righe), 10)])
+
+        self.assertEqual(profiler.righe_duplicate, int(righe.duplicated().sum()))
+        self.assertEqual(profiler.id_duplicati, int(righe.index.duplicated().sum()))
+        for visti in (profiler._hash_righe, profiler._hash_id):
+            self.assertLessEqual(len(visti._sequenze), int(np.log2(len(visti))) + 1)
+
+    def _assert_report_equal(self, report, atteso):
+        for nome in ('righe', 'righe_duplicate', 'id_duplicati'):
+            self.assertEqual(report[nome], atteso[nome])
+        for col, statistiche in atteso['colonne'].items():
+            for nome, valore in statistiche.items():
+                if isinstance(valore, float):
+                    self.assertAlmostEqual(report['colonne'][col][nome], valore)
+                else:
+                    self.assertEqual(report['colonne'][col][nome], valore)
+
+    def test_estimated_cardinality(self):
+        valori = pd.DataFrame({'x': np.random.default_rng(1).random(20000)})
+        profiler = DatasetProfiler(max_distinct=512).update(valori)
+        stima = profiler.report()['colonne']['x']
+        self.assertTrue(stima['distinti_stimati'])
+        self.assertAlmostEqual(stima['valori_distinti'] / 20000, 1.0, delta=0.15)
+
+    def test_json_report_and_errors(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'profilo.json')
+            report = DatasetProfiler().update(self.data).save(path)
+            with open(path, encoding='utf-8') as file:
+                self.assertEqual(json.load(file), report)
+
+            # Profilo della pipeline: calcolato una sola volta per la stessa fase 'parse'
+            csv_path = os.path.join(tmpdir, 'dati.csv')
+            self.data.to_csv(csv_path)
+            pipeline = PreprocessingPipeline(csv_path)
+            self.assertEqual(pipeline.profile(os.path.join(tmpdir, 'pipeline.json'))['righe'], 199)
+            self.assertIn('profile', pipeline.eseguite)
+            pipeline.profile()
+            self.assertEqual(pipeline.eseguite, [])
+
+        with self.assertRaises(ValueError):
+            DatasetProfiler().report()
+        with self.assertRaises(ValueError):
+            DatasetProfiler().update(self.data).update(self.data[['continua']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+
+from preprocesso.quantile_sketch import KLLSketch
+
+
+class TestKLLSketch(unittest.TestCase):
+
+    def setUp(self):
+        self.values = np.random.default_rng(0).lognormal(size=200_000)
+        self.ordinati = np.sort(self.values)
+        self.quantili = np.linspace(0.01, 0.99, 99)
+
+    def _errore_rango(self, sketch):
+        stime = sketch.quantile(self.quantili)
+        ranghi = np.searchsorted(self.ordinati, stime) / len(self.values)
+        return np.abs(ranghi - self.quantili).max()
+
+    def test_rank_error_within_bound(self):
+        """
+        Verifica che l'errore di rango resti entro il limite atteso e che la memoria sia O(k).
+        """
+        sketch = KLLSketch(k=200, seed=0)
+        for blocco in np.array_split(self.values, 50):
+            sketch.update(blocco)
+
+        self.assertEqual(sketch.count, len(self.values))
+        self.assertLess(len(sketch), 10 * sketch.k)
+        self.assertLessEqual(self._errore_rango(sketch), sketch.errore_rango)
+        self.assertEqual(sketch.quantile(0.0), self.values.min())
+        self.assertEqual(sketch.quantile(1.0), self.values.max())
+
+    def test_merge_of_parallel_sketches(self):
+        parti = [KLLSketch(k=200, seed=i).update(blocco) for i, blocco in enumerate(np.array_split(self.values, 8))]
+        unito = KLLSketch(k=200, seed=0)
+        for parte in parti:
+            unito.merge(parte)
+
+        self.assertEqual(unito.count, len(self.values))
+        self.assertLessEqual(self._errore_rango(unito), unito.errore_rango)
+
+    def test_error_is_configurable(self):
+        k = KLLSketch.k_per_errore(0.005)
+        self.assertGreater(k, 200)
+        self.assertLessEqual(KLLSketch(k).errore_rango, 0.005)
+
+    def test_nan_and_invalid_parameters(self):
+        sketch = KLLSketch(k=16).update([1.0, np.nan, 3.0])
+        self.assertEqual(sketch.count, 2)
+        self.assertTrue(np.isnan(KLLSketch().quantile(0.5)))
+        with self.assertRaises(ValueError):
+            KLLSketch(k=4)
+        with self.assertRaises(ValueError):
+            sketch.quantile(1.5)
+        with self.assertRaises(ValueError):
+            sketch.merge(KLLSketch(k=32))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from models import CustomKNN, StreamScorer
+from models.neighbors import NeighborIndex, GrigliaUint8
+
+
+class TestQuantizedDistances(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Misure cellulari discrete (interi da 1 a 10, come in version_1.csv) e una colonna con passo diverso.
+        """
+        rng = np.random.default_rng(0)
+        self.train = rng.integers(1, 11, (300, 6)).astype(float)
+        self.test = rng.integers(1, 11, (40, 6)).astype(float)
+
+    def test_integer_features_match_float_path(self):
+        for metric in ('euclidean', 'manhattan'):
+            esatto = NeighborIndex(block_size=16, metric=metric).fit(self.train)
+            quantizzato = NeighborIndex(block_size=16, metric=metric, quantize=True).fit(self.train)
+            self.assertIsNone(quantizzato.data)
+            self.assertEqual(quantizzato.codici.dtype, np.uint8)
+            self.assertEqual(quantizzato.codici.nbytes * 8, self.train.nbytes)
+
+            np.testing.assert_array_equal(quantizzato.distances(self.test), esatto.distances(self.test))
+            for a, b in zip(quantizzato.kneighbors(self.test, 7), esatto.kneighbors(self.test, 7)):
+                np.testing.assert_array_equal(a, b)
+
+        manhattan = NeighborIndex(metric='manhattan').fit(np.array([[1.0, 2.0]]))
+        self.assertEqual(manhattan.distances(np.array([[4.0, 6.0]]))[0, 0], 7.0)
+
+    def test_scaled_grid_with_different_steps(self):
+        """
+        Verifica che i dati normalizzati (griglie con passi diversi per colonna) restino quantizzabili.
+        """
+        scalati = np.column_stack([(self.train[:, :5] - 1) / 9, self.train[:, 5] * 7 + 60])
+        query = np.column_stack([(self.test[:, :5] - 1) / 9, self.test[:, 5] * 7 + 60])
+        quantizzato = NeighborIndex(quantize=None).fit(pd.DataFrame(scalati))
+        self.assertIsNotNone(quantizzato.codici)
+        np.testing.assert_allclose(quantizzato.griglia.passo, [1 / 9] * 5 + [7.0])
+        np.testing.assert_allclose(quantizzato.distances(query), NeighborIndex().fit(scalati).distances(query))
+
+    def test_classifier_and_scorer_options(self):
+        """
+        Verifica che CustomKNN e StreamScorer espongano metrica manhattan e quantizzazione con gli
+        stessi vicini del calcolo in virgola mobile.
+        """
+        train = pd.DataFrame(self.train, columns=[f'f{j}' for j in range(6)])
+        query = pd.DataFrame(self.test, columns=train.columns)
+        labels = pd.Series(np.where(self.train[:, 0] > 5, 4.0, 2.0), name='classtype_v1')
+        for metric in ('euclidean', 'manhattan'):
+            # k dispari e due sole classi: nessuna parità nel voto
+            quantizzato = CustomKNN(5, metric=metric, quantize=True)
+            quantizzato.fit(train, labels)
+            self.assertIsNotNone(quantizzato._index.codici)
+            riga_per_riga = CustomKNN(5, metric=metric)
+            riga_per_riga.fit(train, labels)
+            attese = riga_per_riga.predict_batch(query)
+            pd.testing.assert_series_equal(quantizzato.predict_batch(query), attese, check_names=False)
+            self.assertEqual(quantizzato.predict(query.iloc[3]), attese.iloc[3])
+
+            scorer = StreamScorer(5, metric=metric, quantize=None).fit(train, labels)
+            self.assertIsNotNone(scorer.index.codici)
+            np.testing.assert_array_equal(scorer.score(query)['predizione'].to_numpy(), attese.to_numpy())
+
+        # Con quantize=None e dati continui il classificatore resta sul calcolo riga per riga
+        continuo = CustomKNN(5, quantize=None)
+        continuo.fit(train + 0.5 * np.random.default_rng(1).random(train.shape), labels)
+        self.assertIsNone(continuo._index)
+        with self.assertRaises(ValueError):
+            CustomKNN(5, metric='cosine', quantize=True)
+
+    def test_fallback_and_detection(self):
+        continui = self.train + np.random.default_rng(1).normal(0, 0.1, self.train.shape)
+        self.assertIsNone(GrigliaUint8.da_dati(continui))
+        self.assertIsNone(NeighborIndex(quantize=None).fit(continui).codici)
+        with self.assertRaises(ValueError):
+            NeighborIndex(quantize=True).fit(continui)
+        with self.assertRaises(ValueError):
+            NeighborIndex(quantize=True).fit(np.arange(300.0).reshape(-1, 1))
+        with self.assertRaises(ValueError):
+            NeighborIndex(quantize=True, nan_aware=True)
+
+        # Query fuori griglia o con NaN: distanze calcolate sui valori decodificati
+        index = NeighborIndex(quantize=True).fit(self.train)
+        query = self.test.copy()
+        query[0, 0] = 2.5
+        query[1, 1] = np.nan
+        np.testing.assert_allclose(index.distances(query), NeighborIndex().fit(self.train).distances(query))
+        # Valori poco oltre l'intervallo di addestramento restano codificabili
+        self.assertIsNotNone(index.griglia.codifica(np.full((1, 6), 11.0)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+from preprocesso import ShardedDatasetLoader, StreamingSchema
+
+
+class TestShardedDatasetLoader(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Crea tre shard (due CSV e un XLSX) con alcuni 'ID' ripetuti tra shard diversi.
+        """
+        self.tmpdir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.frames = []
+        for giorno, ids in enumerate([range(0, 10), range(8, 18), range(15, 25)]):
+            ids = np.array(list(ids))
+            df = pd.DataFrame({
+                'ID': ids,
+                'Sample code number': ids + 1000,
+                'feature1': rng.integers(1, 10, len(ids)),
+                'feature2': rng.integers(1, 10, len(ids)).astype(object),
+                'classtype_v1': np.where(ids % 2 == 0, 2, 4),
+            })
+            df.loc[0, 'feature2'] = '?'
+            self.frames.append(df)
+            nome = os.path.join(self.tmpdir.name, f"export_{giorno}")
+            if giorno == 2:
+                df.to_excel(nome + '.xlsx', index=False)
+            else:
+                df.to_csv(nome + '.csv', index=False)
+        with open(os.path.join(self.tmpdir.name, 'note.md'), 'w') as file:
+            file.write("non è uno shard")
+
+        self.schema = StreamingSchema(skip_columns=['Sample code number'])
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _atteso(self):
+        completo = pd.concat(self.frames).drop(columns='Sample code number')
+        completo = completo.drop_duplicates(subset='ID', keep='first').set_index('ID')
+        return self.schema.coerce(completo)
+
+    def test_directory_with_dedup_across_shards(self):
+        """
+        Verifica che gli 'ID' ripetuti tra shard vengano rimossi tenendo la prima occorrenza.
+        """
+        loader = ShardedDatasetLoader(schema=self.schema, n_jobs=2)
+        self.assertEqual(len(loader.shard_paths(self.tmpdir.name)), 3)
+
+        df = loader.load(self.tmpdir.name)
+        pd.testing.assert_frame_equal(df, self._atteso())
+        self.assertTrue(df.index.is_unique)
+        self.assertEqual(len(df), 25)
+
+    def test_preallocated_buffer_without_copies(self):
+        """
+        Verifica che le feature condividano un unico buffer e che l'etichetta resti un intero compatto.
+        """
+        df = ShardedDatasetLoader(schema=self.schema, n_jobs=1).load(os.path.join(self.tmpdir.name, '*.csv'))
+        self.assertEqual(list(df.columns), ['feature1', 'feature2', 'classtype_v1'])
+        self.assertEqual(df['classtype_v1'].dtype, np.int8)
+        # Un blocco float32 per le feature e uno int8 per l'etichetta: nessuna copia per colonna
+        self.assertEqual(df._mgr.nblocks, 2)
+        self.assertEqual(len(df), 18)
+
+    def test_process_pool(self):
+        df = ShardedDatasetLoader(schema=self.schema, n_jobs=2, executor='process').load(self.tmpdir.name)
+        pd.testing.assert_frame_equal(df, self._atteso())
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            ShardedDatasetLoader.shard_paths(os.path.join(self.tmpdir.name, '*.parquet'))
+        with self.assertRaises(ValueError):
+            ShardedDatasetLoader(executor='gpu')
+
+        pd.DataFrame({'ID': [1], 'altro': [1]}).to_csv(os.path.join(self.tmpdir.name, 'export_9.csv'), index=False)
+        with self.assertRaises(ValueError):
+            ShardedDatasetLoader(schema=self.schema).load(self.tmpdir.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
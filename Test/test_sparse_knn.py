@@ -0,0 +1,91 @@
+import importlib.util
+import unittest
+import numpy as np
+import pandas as pd
+
+from models.classifier import CustomKNN
+from models.neighbors import NeighborIndex
+from dati_sintetici import generatore_e_classi
+
+if importlib.util.find_spec('scipy'):
+    from scipy import sparse
+
+
+@unittest.skipUnless(importlib.util.find_spec('scipy'), "scipy non installato")
+class TestSparseKNN(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Feature indicatrici one-hot (strumento e sito) affiancate a due misure numeriche.
+        """
+        n, n_strumenti, n_siti = 120, 40, 25
+        rng, classi = generatore_e_classi(n)
+        strumenti = rng.integers(0, n_strumenti, n)
+        siti = rng.integers(0, n_siti, n)
+        righe = np.repeat(np.arange(n), 4)
+        colonne = np.column_stack([strumenti, n_strumenti + siti,
+                                   np.full(n, n_strumenti + n_siti), np.full(n, n_strumenti + n_siti + 1)]).ravel()
+        valori = np.column_stack([np.ones(n), np.ones(n), classi + rng.normal(0, 1, n), rng.normal(0, 1, n)]).ravel()
+        self.X = sparse.csr_matrix((valori, (righe, colonne)), shape=(n, n_strumenti + n_siti + 2))
+        self.labels = pd.Series(classi, name='classtype_v1')
+        self.dense = pd.DataFrame(self.X.toarray())
+
+    def test_sparse_kernel_matches_dense(self):
+        for metric in ('euclidean', 'cosine'):
+            sparso = NeighborIndex(block_size=16, metric=metric).fit(self.X[:80])
+            denso = NeighborIndex(metric=metric).fit(self.X[:80].toarray())
+            np.testing.assert_allclose(sparso.distances(self.X[80:]), denso.distances(self.X[80:].toarray()), atol=1e-10)
+        # Norme precalcolate sui soli valori non nulli
+        np.testing.assert_allclose(sparso._norme, (self.X[:80].toarray() ** 2).sum(axis=1))
+        # Un punto nullo è a distanza coseno 1 da tutti
+        self.assertTrue(np.all(sparso.distances(sparse.csr_matrix((1, self.X.shape[1]))) == 1.0))
+
+    def test_sparse_candidates_reranked_exactly(self):
+        """
+        Verifica che i candidati sparsi siano ordinati con le distanze esatte: con coordinate grandi
+        la scomposizione |q|² + |r|² - 2 q·r annulla le differenze e inverte i vicini.
+        """
+        riferimento = sparse.csr_matrix(np.array([[1e8, 0.6], [1e8, 0.5], [0.0, 3.0]]))
+        distanze, vicini = NeighborIndex().fit(riferimento).kneighbors(sparse.csr_matrix([[1e8, 0.0]]), 2)
+        np.testing.assert_array_equal(vicini, [[1, 0]])
+        np.testing.assert_allclose(distanze, [[0.5, 0.6]])
+
+    def test_custom_knn_on_csr(self):
+        """
+        Verifica che CustomKNN su matrice CSR dia le stesse predizioni della versione densa.
+        """
+        train, test = slice(0, 90), slice(90, 120)
+        y_train = self.labels.iloc[train]
+        for metric in ('euclidean', 'cosine'):
+            sparso = CustomKNN(3, metric=metric)
+            sparso.fit(self.X[train], y_train)
+            denso = CustomKNN(3, metric=metric)
+            denso.fit(self.dense.iloc[train], y_train)
+
+            predizioni = sparso.predict_batch(self.X[test])
+            self.assertEqual(len(predizioni), 30)
+            self.assertEqual(predizioni.tolist(), denso.predict_batch(self.dense.iloc[test]).tolist())
+            self.assertEqual(sparso.predict(self.X[95]), denso.predict(self.dense.iloc[95]))
+            self.assertEqual(sparso.predict_proba(self.X[95]), denso.predict_proba(self.dense.iloc[95]))
+
+    def test_invalid_inputs(self):
+        knn = CustomKNN(3)
+        knn.fit(self.X, self.labels)
+        with self.assertRaises(ValueError):
+            knn.predict(self.X[:2])
+        with self.assertRaises(ValueError):
+            knn.fit(self.X, self.labels.iloc[:10])
+        with self.assertRaises(ValueError):
+            CustomKNN(3, metric='chebyshev')
+        with self.assertRaises(ValueError):
+            CustomKNN(3, metric='manhattan').fit(self.X, self.labels)
+        with self.assertRaises(ValueError):
+            NeighborIndex(metric='manhattan').fit(self.X)
+        with_nan = self.X.copy()
+        with_nan.data[0] = np.nan
+        with self.assertRaises(ValueError):
+            NeighborIndex().fit(with_nan)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+from models import CustomKNN, StreamScorer
+from preprocesso.feature_transformer import FittedNormalizer
+from preprocesso.file_parser import NDJSONFileParser, StreamingSchema
+from dati_sintetici import generatore_e_classi
+
+
+class TestStreamScorer(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Dati di riferimento con due classi ben separate e un log NDJSON di nuovi record non etichettati.
+        """
+        n = 40
+        rng, classi = generatore_e_classi(n)
+        grezzi = pd.DataFrame({f'f{i}': classi * 2 + rng.normal(0, 1, n) for i in range(3)})
+        self.scaler = FittedNormalizer().fit(grezzi)
+        self.features = self.scaler.transform(grezzi)
+        self.labels = pd.Series(classi)
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'strumento.jsonl')
+        self.nuovi = pd.DataFrame({f'f{i}': [4.0, 8.0, 4.5, 7.5] for i in range(3)}, index=[100, 101, 102, 103])
+        self._aggiungi(self.nuovi.iloc[:2])
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _aggiungi(self, righe: pd.DataFrame):
+        with open(self.path, 'a') as file:
+            for id_, riga in righe.iterrows():
+                file.write(json.dumps({'ID': int(id_), **riga.to_dict()}) + '\n')
+
+    def test_score_matches_custom_knn(self):
+        scorer = StreamScorer(5, scaler=self.scaler).fit(self.features, self.labels)
+        risultato = scorer.score(self.nuovi)
+
+        knn = CustomKNN(5)
+        knn.fit(self.features, self.labels)
+        attese = knn.predict_batch(self.scaler.transform(self.nuovi))
+        np.testing.assert_array_equal(risultato['predizione'].to_numpy(), attese.to_numpy())
+        self.assertEqual(list(risultato.index), [100, 101, 102, 103])
+        self.assertTrue(((risultato['probabilita'] >= 0) & (risultato['probabilita'] <= 1)).all())
+
+    def test_follow_scores_only_appended_records(self):
+        """
+        Verifica che a ogni chiamata di `follow` vengano classificati solo i record aggiunti al log.
+        """
+        scorer = StreamScorer(3, scaler=self.scaler).fit(self.features, self.labels)
+        parser = NDJSONFileParser()
+        schema = StreamingSchema(target_col=None)
+
+        primi = pd.concat(scorer.follow(parser, self.path, schema=schema))
+        self.assertEqual(list(primi.index), [100, 101])
+        self.assertEqual(list(scorer.follow(parser, self.path, schema=schema)), [])
+
+        self._aggiungi(self.nuovi.iloc[2:])
+        successivi = pd.concat(scorer.follow(parser, self.path, schema=schema, chunksize=1))
+        self.assertEqual(list(successivi.index), [102, 103])
+        np.testing.assert_array_equal(successivi['predizione'].to_numpy(), [2.0, 4.0])
+
+    def test_missing_features_and_errors(self):
+        # Una feature assente nei record resta NaN e viene gestita dalla distanza parziale
+        scorer = StreamScorer(3).fit(self.features, self.labels)
+        risultato = scorer.score(self.features.iloc[:4].drop(columns='f2'))
+        self.assertFalse(risultato['predizione'].isna().any())
+
+        with self.assertRaises(ValueError):
+            StreamScorer(3).score(self.nuovi)
+        with self.assertRaises(ValueError):
+            StreamScorer(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
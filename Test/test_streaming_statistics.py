@@ -0,0 +1,84 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from preprocesso.streaming_statistics import StreamingStatistics
+from preprocesso.feature_transformer import FittedNormalizer, FittedStandardizer
+from dati_sintetici import classi_alternate
+
+
+class TestStreamingStatistics(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Dataset con colonne su scale diverse, alcuni NaN e un'etichetta intera.
+        """
+        rng = np.random.default_rng(0)
+        n = 1000
+        self.data = pd.DataFrame({
+            'a': rng.normal(1e6, 1.0, n),  # media grande e varianza piccola: verifica la stabilità numerica
+            'b': rng.uniform(-5, 5, n),
+            'label': classi_alternate(n).astype(int),
+        })
+        self.data.loc[[3, 70, 500], 'b'] = np.nan
+        self.chunks = [self.data.iloc[i:i + 137] for i in range(0, n, 137)]
+
+    def test_chunked_statistics_match_full_pass(self):
+        stats = StreamingStatistics.from_chunks(self.chunks)
+
+        self.assertEqual(stats.columns, ['a', 'b', 'label'])
+        np.testing.assert_array_equal(stats.count, self.data.count().to_numpy())
+        np.testing.assert_allclose(stats.mean, self.data.mean().to_numpy())
+        np.testing.assert_allclose(stats.std(), self.data.std().to_numpy(), rtol=1e-9)
+        np.testing.assert_array_equal(stats.min, self.data.min().to_numpy())
+        np.testing.assert_array_equal(stats.max, self.data.max().to_numpy())
+
+    def test_merge_of_partial_results(self):
+        """
+        Verifica che unire accumulatori calcolati su parti diverse equivalga a una sola passata.
+        """
+        parziali = [StreamingStatistics.from_chunks(self.chunks[i::3]) for i in range(3)]
+        unite = StreamingStatistics()
+        for parziale in parziali:
+            unite.merge(parziale)
+
+        completa = StreamingStatistics.from_chunks(self.chunks)
+        np.testing.assert_array_equal(unite.count, completa.count)
+        np.testing.assert_allclose(unite.mean, completa.mean)
+        np.testing.assert_allclose(unite.variance(), completa.variance(), rtol=1e-9)
+        np.testing.assert_array_equal(unite.min, completa.min)
+
+    def test_quantile_sketches_follow_merge(self):
+        parziali = [StreamingStatistics.from_chunks(self.chunks[i::2], quantile_k=200, seed=i) for i in range(2)]
+        unite = StreamingStatistics().merge(parziali[0]).merge(parziali[1])
+        # Solo le colonne continue: per l'etichetta la mediana di pandas interpola tra 2 e 4
+        np.testing.assert_allclose(unite.quantile(0.5)[:2], self.data[['a', 'b']].median().to_numpy(), rtol=1e-3, atol=0.1)
+
+        # Se una parte non ha gli sketch, i quantili dell'unione non sarebbero corretti
+        unite.merge(StreamingStatistics.from_chunks(self.chunks[:1]))
+        with self.assertRaises(ValueError):
+            unite.quantile(0.5)
+
+    def test_scalers_fit_from_statistics(self):
+        """
+        Verifica che gli scaler addestrati dalle statistiche coincidano con quelli addestrati sul DataFrame.
+        """
+        stats = StreamingStatistics.from_chunks(self.chunks)
+        for scaler in (FittedNormalizer, FittedStandardizer):
+            da_stats = scaler().fit_from_statistics(stats, skip_columns=['label'])
+            da_dati = scaler().fit(self.data, skip_columns=['label'])
+            self.assertEqual(da_stats.columns, ['a', 'b'])
+            np.testing.assert_allclose(da_stats.offset, da_dati.offset)
+            np.testing.assert_allclose(da_stats.scale, da_dati.scale, rtol=1e-9)
+
+    def test_arrays_and_errors(self):
+        stats = StreamingStatistics().update(np.array([1.0, 2.0, 3.0]))
+        np.testing.assert_allclose(stats.mean, [2.0])
+        with self.assertRaises(ValueError):
+            stats.update(np.ones((2, 2)))
+        with self.assertRaises(ValueError):
+            FittedNormalizer().fit_from_statistics(StreamingStatistics())
+
+
+if __name__ == '__main__':
+    unittest.main()
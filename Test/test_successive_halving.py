@@ -0,0 +1,86 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from validazione import SuccessiveHalvingSearch, Holdout
+from validazione.grid_search import valuta_k
+from dati_sintetici import dataset_cellule, salva_csv
+
+
+class TestSuccessiveHalving(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Crea un piccolo dataset CSV con la struttura di version_1.csv (classi 2/4).
+        """
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.file_path = salva_csv(dataset_cellule(40), self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_budget_goes_to_best_fraction(self):
+        """
+        Verifica che solo 1/eta dei candidati passi al livello successivo
+        e che le iterazioni crescano di un fattore eta.
+        """
+        search = SuccessiveHalvingSearch(
+            self.file_path, k_values=[1, 3, 5, 7, 9, 11, 13, 15, 17],
+            min_iterazioni=1, max_iterazioni=9, eta=3, n_jobs=1, random_state=0
+        )
+        classifica = search.run()
+
+        self.assertEqual(len(classifica), 9)
+        self.assertEqual((classifica['rung'] == 2).sum(), 1)
+        self.assertEqual((classifica['rung'] >= 1).sum(), 3)
+        # Le iterazioni già svolte vengono conservate: 1, poi 3, poi 9
+        self.assertEqual(classifica.loc[0, 'n_split'], 9)
+        self.assertEqual(set(classifica.loc[classifica['rung'] == 0, 'n_split']), {1})
+        # Il vincitore è in cima alla classifica
+        self.assertEqual(classifica.loc[0, 'rung'], 2)
+
+    def test_distinct_seeds_per_rung_and_job(self):
+        """
+        Verifica che ogni job di ogni livello riceva un seme esplicito e distinto, anche con
+        random_state=None, così le iterazioni aggiuntive valutano split nuovi.
+        """
+        for random_state in (None, 0):
+            semi = []
+
+            def registra(*argomenti):
+                semi.append(argomenti[-1])
+                return valuta_k(*argomenti)
+
+            search = SuccessiveHalvingSearch(
+                self.file_path, k_values=[1, 3, 5, 7, 9], missing_strategies=['remove', 'mean'],
+                min_iterazioni=1, max_iterazioni=9, eta=3, n_jobs=1, random_state=random_state
+            )
+            with patch('validazione.successive_halving.valuta_k', side_effect=registra):
+                search.run()
+            self.assertGreater(len(semi), 2)
+            self.assertNotIn(None, semi)
+            self.assertEqual(len(set(semi)), len(semi))
+
+    def test_process_pool(self):
+        """
+        Verifica che la valutazione nel pool di processi produca una classifica completa.
+        """
+        search = SuccessiveHalvingSearch(
+            self.file_path, k_values=[1, 3, 5], missing_strategies=['remove', 'mean'],
+            max_iterazioni=3, n_jobs=2, random_state=0
+        )
+        classifica = search.run()
+        self.assertEqual(len(classifica), 6)
+        self.assertFalse(classifica['Accuracy Rate'].isna().any())
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            SuccessiveHalvingSearch(self.file_path, k_values=[1], eta=1)
+        with self.assertRaises(ValueError):
+            SuccessiveHalvingSearch(self.file_path, k_values=[1], min_iterazioni=5, max_iterazioni=2)
+        with self.assertRaises(ValueError):
+            SuccessiveHalvingSearch(self.file_path, k_values=[1], validation_strategies=[Holdout(test_size=0.2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import traceback
 from validazione.validazione_main import setup_knn_validation
 from preprocesso.preprocesso_main import preprocess_data
+from preprocesso.dataset_cache import DatasetCache
+from preprocesso.deduplication import StreamingDeduplicator
 from preprocesso.mapped_dati import ValidationMapper
 from metriche import Metrics
 from metriche import Visualizer
@@ -15,9 +17,14 @@ def main():
             print("Percorso non fornito. Utilizzo del file di default: 'Data/version_1.csv'")
             file_path = 'Data/version_1.csv'
         
+        # Ingestione incrementale (facoltativa): file con le chiavi dei campioni già letti
+        chiavi_path = input("File delle chiavi già viste per rimuovere i duplicati (invio per saltare): ").strip()
+        deduplicator = StreamingDeduplicator(path=chiavi_path) if chiavi_path else None
+
         # 2 Preprocessing dei dati (lettura, pulizia, scaling)
         print("Sto analizzando il dataset...")
-        success, features, labels, scaled_data = preprocess_data(file_path)
+        success, features, labels, scaled_data = preprocess_data(file_path, cache=DatasetCache(), report_path="profilo_dataset.json",
+                                                                 deduplicator=deduplicator)
 
         # Se il preprocessing non ha avuto successo, solleva un'eccezione
         if not success:
@@ -40,9 +47,10 @@ def main():
         visualizzatore = Visualizer(mapped_data, metriche_selezionate)
 
         # 8 Calcolo metriche in base alla strategy scelta
-        if strategy.__class__.__name__ == "RandomSubsampling" or strategy.__class__.__name__ == "StratifiedValidation":
+        if strategy.__class__.__name__ in ("RandomSubsampling", "StratifiedValidation", "Bootstrap", "AdaptiveValidation"):
             print("Viene svolta la media dei valori delle metriche dei singoli gruppi")
-            visualizzatore.media(K)
+            # In modalità adattiva il numero di gruppi è noto solo dopo la validazione
+            visualizzatore.media(len(validation_data))
             
         else:
             print("Calcolo metriche...")
@@ -142,6 +142,31 @@ class Metrics:
 
         return avg_metrics
 
+    def valuta(self, y_real: np.ndarray, y_pred: np.ndarray, predicted_proba: np.ndarray, metriche_selezionate: List[str]) -> Dict[str, float]:
+        """
+        Calcola le metriche selezionate senza stampe intermedie, con una matrice di confusione vettoriale.
+        Pensato per le valutazioni ripetute su molte configurazioni (es. ricerca degli iperparametri).
+        """
+        y_real = np.asarray(y_real)
+        y_pred = np.asarray(y_pred)
+        tp = int(np.sum((y_real == 1) & (y_pred == 1)))
+        tn = int(np.sum((y_real == 0) & (y_pred == 0)))
+        fp = int(np.sum((y_real == 0) & (y_pred == 1)))
+        fn = int(np.sum((y_real == 1) & (y_pred == 0)))
+
+        calcolatori = {
+            "Accuracy Rate": lambda: self._accuracy_rate(tp, tn, fp, fn),
+            "Error Rate": lambda: self._error_rate(tp, tn, fp, fn),
+            "Sensitivity": lambda: self._sensitivity(tp, fn),
+            "Specificity": lambda: self._specificity(tn, fp),
+            "Geometric Mean": lambda: self._geometric_mean(tp, tn, fp, fn),
+            "Area Under Curve": lambda: self._area_under_curve(y_real, predicted_proba),
+        }
+        for metrica in metriche_selezionate:
+            if metrica not in calcolatori:
+                raise ValueError(f"Metrica non supportata: {metrica}")
+        return {metrica: float(calcolatori[metrica]()) for metrica in metriche_selezionate}
+
     def _matrix_confusion(self, y_real: List[int], y_pred: List[int]) -> Tuple[int, int, int, int]:
         tp = sum(1 for r, p in zip(y_real, y_pred) if r == 1 and p == 1)
         tn = sum(1 for r, p in zip(y_real, y_pred) if r == 0 and p == 0)
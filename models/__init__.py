@@ -1 +1,3 @@
-from .classifier import CustomKNN
\ No newline at end of file
+from .classifier import CustomKNN
+from .neighbors import NeighborIndex, vote_neighbors
+from .stream_scorer import StreamScorer
@@ -2,44 +2,116 @@ import random
 import pandas as pd
 import numpy as np
 from collections import Counter
+from .neighbors import NeighborIndex, _is_sparse
 
 class CustomKNN:
-    def __init__(self, k:int):
+    def __init__(self, k:int, nan_aware: bool = False, metric: str = 'euclidean', quantize: bool = False):
         """
         Costruttore della classe che imposta il numero di vicini da considerare.
+
+        Con `nan_aware` la distanza è calcolata sulle sole feature presenti in entrambi i punti
+        (riscalata per la frazione di feature presenti), così i dati possono contenere NaN senza
+        essere imputati. La modalità va richiesta esplicitamente (ad es. con la strategia 'keep'):
+        senza, le distanze non controllano la presenza di NaN coppia per coppia.
+
+        `metric` può essere 'euclidean', 'manhattan' oppure 'cosine' (1 - similarità del coseno).
+
+        Con `quantize` i dati di riferimento sono conservati come codici uint8 in un `NeighborIndex`
+        (ad es. le misure intere da 1 a 10 di version_1.csv): True richiede dati quantizzabili, None
+        attiva la modalità solo se lo sono e altrimenti usa il calcolo in virgola mobile.
         """
+        if metric not in NeighborIndex.METRICHE:
+            raise ValueError("Metrica non supportata. Usa 'euclidean', 'manhattan' o 'cosine'.")
+        if quantize and (nan_aware or metric == 'cosine'):
+            raise ValueError("La modalità quantizzata non supporta la distanza parziale sui NaN né la distanza coseno")
         self.k = k
+        self.nan_aware = nan_aware
+        self.metric = metric
+        self.quantize = quantize
         self.data = None
         self.labels = None
+        self._parziale = bool(nan_aware)
+        self._index = None
 
-    def fit(self, data: pd.DataFrame, labels: pd.Series) -> None:
+    def fit(self, data, labels: pd.Series) -> None:
         """
         Salva i dati di riferimento per la classificazione.
 
+        Le matrici sparse SciPy (ad es. feature indicatrici one-hot) non vengono convertite in dense:
+        restano in formato CSR in un `NeighborIndex`, che calcola le distanze a blocchi sui soli
+        valori non nulli. Lo stesso vale per i dati quantizzati in uint8 (`quantize`). In questi casi
+        le etichette sono associate alle righe per posizione.
+
         Args:
-            data (pd.DataFrame): Il dataset che contiene le caratteristiche.
+            data (pd.DataFrame or scipy.sparse matrix): Il dataset che contiene le caratteristiche.
             labels (pd.Series): Le etichette associate ai dati.
         """
-        if not isinstance(data, pd.DataFrame):
-            raise ValueError("I dati devono essere sotto forma di DataFrame di Pandas.")
+        sparsa = _is_sparse(data)
+        if not isinstance(data, pd.DataFrame) and not sparsa:
+            raise ValueError("I dati devono essere sotto forma di DataFrame di Pandas o di matrice sparsa SciPy.")
         if not isinstance(labels, pd.Series):
             raise ValueError("Le etichette devono essere fornite come Serie di Pandas.")
+        if sparsa and data.shape[0] != len(labels):
+            raise ValueError("Dati ed etichette devono avere lo stesso numero di righe.")
         
         self.data = data
         self.labels = labels
+        self._index = None
+        if sparsa:
+            self._index = NeighborIndex(metric=self.metric).fit(data)
+            self._parziale = False
+        elif self.quantize is not False:
+            index = NeighborIndex(metric=self.metric, nan_aware=self.nan_aware, quantize=self.quantize).fit(data)
+            # Con quantize=None e dati non quantizzabili resta il calcolo riga per riga
+            self._index = index if index.codici is not None else None
+        if self._index is None and not sparsa:
+            self._parziale = bool(self.nan_aware)
+
+    def _distance(self, point1, point2):
+        """
+        Calcola la distanza tra due punti secondo la metrica scelta.
+        """
+        if self.metric == 'cosine':
+            if np.isnan(point1).any() or np.isnan(point2).any():
+                raise ValueError("La distanza coseno non supporta valori mancanti: imputali prima")
+            norme = np.linalg.norm(point1) * np.linalg.norm(point2)
+            return 1.0 - np.clip(np.dot(point1, point2) / norme, -1.0, 1.0) if norme > 0 else 1.0
+        if self.metric == 'manhattan':
+            diff = point1 - point2
+            if self._parziale:
+                return self._partial_distance(diff)
+            return np.sum(np.abs(diff))
+        return self._euclidean_distance(point1, point2)
 
     def _euclidean_distance(self, point1, point2):
         """
         Calcola la distanza tra due punti nello spazio n-dimensionale.
         """
-        return np.sqrt(np.sum((point1 - point2) ** 2))
+        diff = point1 - point2
+        if self._parziale:
+            return self._partial_distance(diff)
+        return np.sqrt(np.sum(diff ** 2))
 
-    def predict(self, point: pd.Series) -> int:
+    def _partial_distance(self, diff):
+        """
+        Calcola la distanza sulle sole feature presenti in entrambi i punti, riscalata per la
+        frazione di feature presenti; infinita se i punti non hanno feature in comune.
+        """
+        comuni = ~np.isnan(diff)
+        n_comuni = comuni.sum()
+        if n_comuni == 0:
+            return np.inf
+        if self.metric == 'manhattan':
+            return np.sum(np.abs(diff[comuni])) * len(diff) / n_comuni
+        return np.sqrt(np.sum(diff[comuni] ** 2) * len(diff) / n_comuni)
+
+    def predict(self, point) -> int:
         """
         Determina la categoria di un nuovo punto basandosi sui dati di riferimento.
 
         Args:
-            point (pd.Series): Punto da classificare.
+            point (pd.Series or scipy.sparse matrix): Punto da classificare (una riga sparsa se il
+                classificatore è addestrato su una matrice sparsa).
 
         Returns:
             int: Etichetta predetta per il punto.
@@ -47,17 +119,36 @@ class CustomKNN:
         if self.data is None or self.labels is None:
             raise ValueError("Il classificatore non è stato addestrato. Esegui 'fit' prima di usare 'predict'.")
         
+        return self._vote(self._nearest_labels(point))
+
+    def _nearest_labels(self, point) -> pd.Series:
+        """
+        Etichette dei k vicini più prossimi di un punto.
+        """
+        if self._index is not None:
+            if not _is_sparse(point) and not isinstance(point, pd.Series):
+                raise ValueError("Il punto da classificare deve essere una riga di matrice sparsa o una Serie di Pandas.")
+            if _is_sparse(point) and (point.shape[0] != 1 or not self._index._sparse):
+                raise ValueError("Il punto da classificare deve essere una sola riga della matrice sparsa di addestramento.")
+            _, vicini = self._index.kneighbors(point, self.k)
+            return self.labels.iloc[vicini[0]]
+
         if not isinstance(point, pd.Series):
             raise ValueError("Il punto da classificare deve essere una Serie di Pandas.")
         
         # Calcola le distanze tra il punto e tutti gli altri dati registrati
-        distances = self.data.apply(lambda row: self._euclidean_distance(row.values, point.values), axis=1)
+        distances = self.data.apply(lambda row: self._distance(row.values, point.values), axis=1)
         
         # Seleziona gli indici dei punti più vicini
         nearest_neighbors = distances.nsmallest(self.k).index
-        
+        return self.labels.loc[nearest_neighbors]
+
+    @staticmethod
+    def _vote(nearest_labels: pd.Series):
+        """
+        Voto di maggioranza sulle etichette dei vicini.
+        """
         # Conta le occorrenze delle etichette dei vicini più vicini
-        nearest_labels = self.labels.loc[nearest_neighbors]
         label_count = Counter(nearest_labels)
         most_common = label_count.most_common()
         max_count = most_common[0][1]  # Frequenza maggiore tra le etichette
@@ -69,41 +160,44 @@ class CustomKNN:
         else:
             return tied_classes[0]
 
-    def predict_batch(self, points: pd.DataFrame) -> pd.Series:
+    def predict_batch(self, points) -> pd.Series:
         """
         Classifica un insieme di punti contemporaneamente.
 
+        Con una matrice sparsa, o con i dati quantizzati, i vicini di tutti i punti sono cercati a
+        blocchi con `NeighborIndex`.
+
         Args:
-            points (pd.DataFrame): Un insieme di punti da classificare.
+            points (pd.DataFrame or scipy.sparse matrix): Un insieme di punti da classificare.
 
         Returns:
             pd.Series: Etichette predette per ciascun punto del dataset.
         """
-        if not isinstance(points, pd.DataFrame):
-            raise ValueError("I dati in ingresso devono essere un DataFrame di Pandas.")
+        if _is_sparse(points) and (self._index is None or not self._index._sparse):
+            raise ValueError("Il classificatore non è stato addestrato su una matrice sparsa.")
+        if not _is_sparse(points) and not isinstance(points, pd.DataFrame):
+            raise ValueError("I dati in ingresso devono essere un DataFrame di Pandas o una matrice sparsa SciPy.")
+
+        if self._index is not None:
+            _, vicini = self._index.kneighbors(points, self.k)
+            etichette = self.labels.to_numpy()
+            index = points.index if isinstance(points, pd.DataFrame) else None
+            return pd.Series([self._vote(etichette[riga]) for riga in vicini], index=index, name=self.labels.name)
         
         predictions = points.apply(self.predict, axis=1)
         return predictions
     
-    def predict_proba(self, point: pd.Series) -> dict:
+    def predict_proba(self, point) -> dict:
         """
         Calcola la probabilità di ciascuna classe per un nuovo punto basandosi sui dati di riferimento.
         """
         if self.data is None or self.labels is None:
             raise ValueError("Il classificatore non è stato addestrato. Esegui 'fit' prima di usare 'predict_proba'.")
         
-        if not isinstance(point, pd.Series):
-            raise ValueError("Il punto da classificare deve essere una Serie di Pandas.")
-        
-        # Calcola le distanze tra il punto e tutti gli altri dati registrati
-        distances = self.data.apply(lambda row: self._euclidean_distance(row.values, point.values), axis=1)
-        
-        # Seleziona gli indici dei punti più vicini
-        nearest_neighbors = distances.nsmallest(self.k).index
-        # print(f"Indici dei {self.k} vicini più prossimi: {nearest_neighbors}")
+        # Etichette dei vicini più prossimi (distanze calcolate su tutti i dati registrati)
+        nearest_labels = self._nearest_labels(point)
         
         # Conta le occorrenze delle etichette dei vicini più vicini
-        nearest_labels = self.labels.loc[nearest_neighbors]
         label_count = Counter(nearest_labels)
         # print(f"Conteggio delle etichette nei vicini: {label_count}")
         
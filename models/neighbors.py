@@ -0,0 +1,602 @@
+import sys
+import numpy as np
+import pandas as pd
+
+
+class NeighborIndex:
+    """
+    Struttura condivisa per la ricerca dei vicini più prossimi.
+
+    Le distanze vengono calcolate a blocchi di query in un'unica operazione vettoriale
+    e i vicini restano ordinati per distanza crescente: in questo modo una sola ricerca
+    con il k massimo serve tutte le votazioni con k minori.
+
+    In modalità parziale (NaN-aware) i valori mancanti restano NaN nella matrice: la distanza è
+    calcolata sulle sole feature presenti in entrambi i punti e riscalata per la frazione di feature
+    presenti, sqrt(n_feature / n_comuni * somma), così non serve imputare l'intero dataset.
+
+    In modalità quantizzata le feature discrete (ad es. le misure cellulari intere da 1 a 10, anche
+    dopo uno scaling lineare) sono conservate come codici `uint8` su una griglia per colonna,
+    `offset + passo * codice`: i punti di riferimento occupano 1 byte per valore invece di 8 e le
+    distanze si calcolano in aritmetica intera, esatta, sui codici.
+
+    Le matrici sparse SciPy (ad es. feature indicatrici one-hot di strumenti e siti) restano in formato
+    CSR: le distanze euclidee e coseno si ricavano dai prodotti scalari riga per riga e dalle norme
+    delle righe calcolate in `fit`, quindi memoria e calcolo dipendono dal numero di valori non nulli
+    e non dal numero di colonne.
+    """
+
+    METRICHE = ('euclidean', 'manhattan', 'cosine')
+    BLOCCO_RIFERIMENTO = 4096
+
+    def __init__(self, block_size: int = 256, nan_aware: bool = None, metric: str = 'euclidean',
+                 quantize: bool = False):
+        """
+        Args:
+            block_size (int): Numero di punti di query elaborati per blocco (limita la memoria usata).
+            nan_aware (bool, optional): Usa la distanza parziale sui valori presenti. Con None viene
+                attivata automaticamente quando i punti di riferimento o di query contengono NaN.
+            metric (str): 'euclidean', 'manhattan' o 'cosine' (1 - similarità del coseno).
+            quantize (bool, optional): Conserva i punti di riferimento come codici uint8. Con None la
+                modalità si attiva solo se tutte le colonne sono discrete (al più 256 livelli su una
+                griglia regolare) e senza NaN; con True i dati devono esserlo.
+
+        Raises:
+            ValueError: Se i parametri non sono validi.
+        """
+        if block_size <= 0:
+            raise ValueError("Il block_size deve essere un intero positivo")
+        if metric not in self.METRICHE:
+            raise ValueError("Metrica non supportata. Usa 'euclidean', 'manhattan' o 'cosine'.")
+        if quantize and (nan_aware or metric == 'cosine'):
+            raise ValueError("La modalità quantizzata non supporta la distanza parziale sui NaN né la distanza coseno")
+
+        self.block_size = block_size
+        self.nan_aware = nan_aware
+        self.metric = metric
+        self.quantize = quantize
+        self.data = None
+        self.griglia = None
+        self.codici = None
+        self._gruppi = []
+        self._sparse = False
+        self._norme = None
+        self._trasposta = None
+        self._ausiliari = None
+        self._data_con_nan = False
+
+    def fit(self, data) -> "NeighborIndex":
+        """
+        Memorizza i punti di riferimento come matrice numpy contigua (di codici uint8 in modalità quantizzata).
+
+        Args:
+            data (pd.DataFrame, np.ndarray or scipy.sparse matrix): I punti di riferimento.
+
+        Raises:
+            ValueError: Se `quantize=True` e i dati non sono rappresentabili in uint8, oppure se la
+                matrice sparsa contiene NaN o la metrica non è supportata in formato sparso.
+        """
+        self.data, self.griglia, self.codici = None, None, None
+        self._norme, self._ausiliari = None, None
+        self._sparse = _is_sparse(data)
+        if self._sparse:
+            return self._fit_sparse(data)
+
+        data = np.ascontiguousarray(_to_array(data), dtype=float)
+        self._data_con_nan = bool(np.isnan(data).any())
+
+        if self.quantize is not False and not self.nan_aware and self.metric != 'cosine':
+            self.griglia = GrigliaUint8.da_dati(data)
+            if self.griglia is None and self.quantize:
+                raise ValueError("I dati non sono quantizzabili: servono colonne senza NaN con al più "
+                                 "256 livelli su una griglia regolare")
+        if self.griglia is not None:
+            self.codici = self.griglia.codifica(data)
+            self._gruppi = self._prepara_gruppi()
+        else:
+            self.data = data
+            self._norme = _norme_quadrate(data)
+        return self
+
+    def _fit_sparse(self, data) -> "NeighborIndex":
+        if self.metric == 'manhattan':
+            raise ValueError("Con matrici sparse sono supportate le metriche 'euclidean' e 'cosine'")
+        if self.quantize:
+            raise ValueError("La modalità quantizzata non è disponibile per le matrici sparse")
+        self.data = _to_csr(data)
+        if np.isnan(self.data.data).any():
+            raise ValueError("Le matrici sparse non possono contenere NaN: imputali prima")
+        self._data_con_nan = False
+        self._norme = _norme_righe(self.data)
+        # Trasposta in CSR calcolata una volta: il prodotto con ogni blocco di query resta CSR x CSR
+        self._trasposta = self.data.T.tocsr()
+        return self
+
+    @property
+    def n_samples(self) -> int:
+        """Numero di punti di riferimento."""
+        if self.data is None and self.codici is None:
+            raise ValueError("L'indice non è stato costruito. Esegui 'fit' prima di usarlo.")
+        return self.data.shape[0] if self.data is not None else len(self.codici)
+
+    def distances(self, points) -> np.ndarray:
+        """
+        Calcola la matrice delle distanze (euclidee, manhattan o coseno) tra i punti di query e quelli di riferimento.
+
+        Sul percorso denso le distanze euclidee e coseno si ricavano da |q|² + |r|² - 2 q·r, con le
+        norme di riferimento calcolate in `fit`: ogni blocco richiede solo un prodotto matriciale e
+        una matrice (blocco, n_riferimento), senza il tensore delle differenze (blocco, n_riferimento,
+        n_feature). La distanza manhattan, che non si scompone così, usa le differenze su blocchi
+        limitati anche di punti di riferimento.
+
+        In modalità quantizzata le query vengono codificate sulla griglia appresa; se non vi cadono
+        (valori fuori griglia o NaN) le distanze sono calcolate in virgola mobile sui valori decodificati.
+
+        Returns:
+            np.ndarray: Matrice (n_query, n_riferimento) delle distanze.
+        """
+        modo, query, riferimento, parziale = self._prepara_query(points)
+        risultato = np.empty((query.shape[0], self.n_samples))
+        for start in range(0, query.shape[0], self.block_size):
+            blocco = query[start:start + self.block_size]
+            risultato[start:start + blocco.shape[0]] = self._distanze_blocco(modo, blocco, riferimento, parziale)
+        return risultato
+
+    def _prepara_query(self, points) -> tuple:
+        """
+        Converte le query e sceglie il calcolo: 'sparso', 'quantizzato' o 'denso' (con i punti di
+        riferimento in virgola mobile e l'eventuale modalità parziale).
+        """
+        if self.data is None and self.codici is None:
+            raise ValueError("L'indice non è stato costruito. Esegui 'fit' prima di calcolare le distanze.")
+        if self._sparse:
+            query = _to_csr(points)
+            if query.shape[1] != self.data.shape[1]:
+                raise ValueError("Le query devono avere lo stesso numero di colonne dei dati di riferimento")
+            if np.isnan(query.data).any():
+                raise ValueError("Le matrici sparse non possono contenere NaN: imputali prima")
+            return 'sparso', query, self.data, False
+
+        query = _to_array(points).astype(float, copy=False)
+        if self.griglia is not None:
+            codici = self.griglia.codifica(query)
+            if codici is not None:
+                return 'quantizzato', codici, None, False
+            riferimento = self.griglia.decodifica(self.codici)
+        else:
+            riferimento = self.data
+
+        parziale = self.nan_aware
+        if parziale is None:
+            parziale = self._data_con_nan or bool(np.isnan(query).any())
+        if parziale and self.metric == 'cosine':
+            raise ValueError("La distanza coseno non supporta valori mancanti: imputali prima")
+        return 'denso', query, riferimento, bool(parziale)
+
+    def _distanze_blocco(self, modo: str, blocco, riferimento, parziale: bool) -> np.ndarray:
+        if modo == 'sparso':
+            return self._distanze_sparse(blocco)
+        if modo == 'quantizzato':
+            return self._distanze_quantizzate(blocco)
+        if self.metric == 'manhattan':
+            risultato = np.empty((len(blocco), len(riferimento)))
+            passo = _righe_per_blocco(len(blocco), riferimento.shape[1])
+            for r0 in range(0, len(riferimento), passo):
+                diff = blocco[:, None, :] - riferimento[None, r0:r0 + passo, :]
+                risultato[:, r0:r0 + passo] = _distanza_parziale(diff, self.metric) if parziale else np.abs(diff).sum(axis=-1)
+            return risultato
+        if parziale:
+            return self._distanza_parziale_gram(blocco, riferimento)
+
+        norme = self._norme if riferimento is self.data else _norme_quadrate(riferimento)
+        prodotti = blocco @ riferimento.T
+        norme_blocco = np.einsum('bd,bd->b', blocco, blocco)
+        if self.metric == 'cosine':
+            return _distanza_coseno(prodotti, np.sqrt(norme_blocco), np.sqrt(norme))
+        # Operazioni sul posto: l'unica matrice (blocco, n_riferimento) allocata è quella dei prodotti
+        prodotti *= -2.0
+        prodotti += norme_blocco[:, None]
+        prodotti += norme[None, :]
+        # Gli errori di arrotondamento possono dare valori appena negativi per punti coincidenti
+        np.maximum(prodotti, 0.0, out=prodotti)
+        return np.sqrt(prodotti, out=prodotti)
+
+    def _distanza_parziale_gram(self, blocco: np.ndarray, riferimento: np.ndarray) -> np.ndarray:
+        """
+        Distanza euclidea parziale con soli prodotti matriciali: indicando con m le maschere dei valori
+        presenti e con q, r i valori con NaN sostituiti da 0, la somma sulle feature comuni è
+        (m_q q²)·m_r + m_q·(m_r r²) - 2 q·r e il numero di feature comuni è m_q·m_r.
+        """
+        presenti_r, valori_r, quadrati_r = self._statistiche_parziali(riferimento)
+        presenti = ~np.isnan(blocco)
+        valori = np.where(presenti, blocco, 0.0)
+        presenti = presenti.astype(float)
+        somma = (valori * valori) @ presenti_r.T + presenti @ quadrati_r.T - 2.0 * (valori @ valori_r.T)
+        n_comuni = presenti @ presenti_r.T
+        with np.errstate(invalid='ignore', divide='ignore'):
+            distanze = np.sqrt(np.maximum(somma, 0.0) * blocco.shape[1] / n_comuni)
+        return np.where(n_comuni > 0, distanze, np.inf)
+
+    def _statistiche_parziali(self, riferimento: np.ndarray) -> tuple:
+        """Maschera dei valori presenti, valori e quadrati (0 dove mancano) dei punti di riferimento."""
+        if riferimento is self.data and self._ausiliari is not None:
+            return self._ausiliari
+        presenti = ~np.isnan(riferimento)
+        valori = np.where(presenti, riferimento, 0.0)
+        statistiche = (presenti.astype(float), valori, valori * valori)
+        if riferimento is self.data:
+            self._ausiliari = statistiche
+        return statistiche
+
+    def _distanze_coppie(self, blocco: np.ndarray, riferimento: np.ndarray, candidati: np.ndarray,
+                         parziale: bool) -> np.ndarray:
+        """
+        Distanze calcolate direttamente dalle differenze tra ogni query e i soli punti di riferimento
+        candidati (forma (blocco, m)), per ordinare i vicini senza gli errori di arrotondamento
+        della scomposizione |q|² + |r|² - 2 q·r.
+        """
+        risultato = np.empty(candidati.shape)
+        passo = _righe_per_blocco(len(blocco), riferimento.shape[1])
+        for c0 in range(0, candidati.shape[1], passo):
+            vicini = riferimento[candidati[:, c0:c0 + passo]]
+            if self.metric == 'cosine':
+                prodotti = np.einsum('bd,bmd->bm', blocco, vicini)
+                denominatore = np.linalg.norm(blocco, axis=1)[:, None] * np.linalg.norm(vicini, axis=2)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    similarita = np.where(denominatore > 0, prodotti / denominatore, 0.0)
+                risultato[:, c0:c0 + passo] = 1.0 - np.clip(similarita, -1.0, 1.0)
+                continue
+            diff = blocco[:, None, :] - vicini
+            if parziale:
+                risultato[:, c0:c0 + passo] = _distanza_parziale(diff, self.metric)
+            elif self.metric == 'manhattan':
+                risultato[:, c0:c0 + passo] = np.abs(diff).sum(axis=-1)
+            else:
+                # Stessa somma riga per riga di `CustomKNN`, così le parità coincidono bit per bit
+                risultato[:, c0:c0 + passo] = np.sqrt((diff * diff).sum(axis=-1))
+        return risultato
+
+    def _distanze_sparse(self, blocco) -> np.ndarray:
+        """
+        Distanze tra un blocco di query e il riferimento in formato CSR: il prodotto scalare q·r è un
+        prodotto tra matrici sparse (costo proporzionale ai valori non nulli) e la distanza euclidea
+        è sqrt(|q|² + |r|² - 2 q·r), con le norme di riferimento precalcolate in `fit`.
+        """
+        prodotti = (blocco @ self._trasposta).toarray()
+        norme_blocco = _norme_righe(blocco)
+        if self.metric == 'cosine':
+            return _distanza_coseno(prodotti, np.sqrt(norme_blocco), np.sqrt(self._norme))
+        distanze = norme_blocco[:, None] + self._norme[None, :] - 2.0 * prodotti
+        # Gli errori di arrotondamento possono dare valori appena negativi per punti coincidenti
+        return np.sqrt(np.maximum(distanze, 0.0))
+
+    def _distanze_coppie_sparse(self, blocco, candidati: np.ndarray) -> np.ndarray:
+        """
+        Come `_distanze_coppie`, per il riferimento in formato CSR: per ogni coppia (query, candidato)
+        la differenza delle due righe sparse dà la distanza euclidea esatta e il prodotto elemento
+        per elemento la similarità del coseno, con costo proporzionale ai valori non nulli.
+        """
+        risultato = np.empty(candidati.shape)
+        # Valori non nulli attesi per coppia: limitano le righe copiate a ogni passo come `_righe_per_blocco`
+        non_nulli = blocco.nnz // max(1, blocco.shape[0]) + self.data.nnz // max(1, self.data.shape[0])
+        passo = _righe_per_blocco(blocco.shape[0], max(1, non_nulli))
+        for c0 in range(0, candidati.shape[1], passo):
+            colonne = candidati[:, c0:c0 + passo]
+            query = blocco[np.repeat(np.arange(blocco.shape[0]), colonne.shape[1])]
+            vicini = self.data[colonne.ravel()]
+            if self.metric == 'cosine':
+                prodotti = np.asarray(query.multiply(vicini).sum(axis=1)).ravel()
+                denominatore = np.sqrt(_norme_righe(query) * _norme_righe(vicini))
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    similarita = np.where(denominatore > 0, prodotti / denominatore, 0.0)
+                risultato[:, c0:c0 + passo] = (1.0 - np.clip(similarita, -1.0, 1.0)).reshape(colonne.shape)
+            else:
+                risultato[:, c0:c0 + passo] = np.sqrt(_norme_righe(query - vicini)).reshape(colonne.shape)
+        return risultato
+
+    def _prepara_gruppi(self) -> list:
+        """
+        Gruppi di colonne con lo stesso passo di griglia: (colonne, peso, norme), con peso il passo al
+        quadrato (euclidea) o il passo (manhattan) e norme la somma dei quadrati dei codici di
+        riferimento del gruppo, calcolata una sola volta.
+        """
+        passi = np.unique(self.griglia.passo)
+        gruppi = []
+        for passo in passi:
+            colonne = np.flatnonzero(self.griglia.passo == passo) if len(passi) > 1 else slice(None)
+            peso = passo ** 2 if self.metric == 'euclidean' else passo
+            norme = None
+            if self.metric == 'euclidean':
+                r = self.codici[:, colonne].astype(np.int64)
+                norme = np.einsum('nd,nd->n', r, r).astype(float)
+            gruppi.append((colonne, float(peso), norme))
+        return gruppi
+
+    def _distanze_quantizzate(self, codici: np.ndarray) -> np.ndarray:
+        """
+        Distanze di un blocco di query sui codici uint8, sommate per gruppi di colonne con lo stesso passo di griglia.
+
+        Per la distanza euclidea la somma dei quadrati di ogni gruppo è |q|² + |r|² - 2 q·r, con il
+        prodotto q·r calcolato come prodotto matriciale su blocchi di codici convertiti: i prodotti e le
+        somme di interi piccoli sono esatti in virgola mobile, quindi il risultato è intero e identico
+        alla somma dei quadrati delle differenze. Per la distanza manhattan le differenze dei codici
+        si calcolano in int16 (2 byte invece di 8 per elemento temporaneo).
+        """
+        n_riferimento = len(self.codici)
+        blocco = codici
+        somma = np.zeros((len(blocco), n_riferimento))
+        for colonne, peso, norme in self._gruppi:
+            q = blocco[:, colonne]
+            if self.metric == 'euclidean':
+                q = q.astype(float)
+                parziale = np.einsum('bd,bd->b', q, q)[:, None] + norme[None, :]
+                for r0 in range(0, n_riferimento, self.BLOCCO_RIFERIMENTO):
+                    r = self.codici[r0:r0 + self.BLOCCO_RIFERIMENTO, colonne].astype(float)
+                    parziale[:, r0:r0 + len(r)] -= 2.0 * (q @ r.T)
+            else:
+                parziale = np.empty((len(blocco), n_riferimento))
+                q = q.astype(np.int16)
+                for r0 in range(0, n_riferimento, self.BLOCCO_RIFERIMENTO):
+                    r = self.codici[r0:r0 + self.BLOCCO_RIFERIMENTO, colonne]
+                    parziale[:, r0:r0 + len(r)] = np.abs(q[:, None, :] - r[None, :, :]).sum(axis=-1, dtype=np.int32)
+            somma += peso * parziale if peso != 1.0 else parziale
+        return np.sqrt(somma) if self.metric == 'euclidean' else somma
+
+    def kneighbors(self, points, n_neighbors: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Restituisce distanze e indici (posizionali) dei vicini più prossimi di ciascun punto.
+
+        Per ogni blocco di query i candidati vengono isolati con `argpartition` (costo lineare nel
+        numero di punti di riferimento) e solo questi vengono ordinati. Sui percorsi denso e sparso
+        le loro distanze sono ricalcolate dalle differenze, così l'ordine non dipende dagli errori
+        di arrotondamento del prodotto matriciale. A parità di distanza viene preferito il punto di
+        riferimento con indice minore, come fa `nsmallest` in `CustomKNN`.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Distanze e indici, entrambi di forma (n_query, n_neighbors).
+        """
+        return self.kneighbors_prefixes(points, [(self.n_samples, n_neighbors)])[0]
+
+    def kneighbors_prefixes(self, points, richieste: list) -> list:
+        """
+        Vicini più prossimi tra i soli primi `n_riferimento` punti di riferimento, per più richieste
+        (n_riferimento, n_neighbors) insieme: le distanze di ogni blocco di query sono calcolate una
+        sola volta e ogni richiesta seleziona i propri vicini dalle prime colonne. La memoria usata è
+        quella di un blocco di distanze più i vicini restituiti.
+
+        Args:
+            points: Punti di query.
+            richieste (list[tuple[int, int]]): Coppie (n_riferimento, n_neighbors).
+
+        Returns:
+            list[tuple[np.ndarray, np.ndarray]]: Distanze e indici per ogni richiesta, come `kneighbors`.
+        """
+        modo, query, riferimento, parziale = self._prepara_query(points)
+        n_query = query.shape[0]
+        richieste = [(min(n_rif, self.n_samples), min(k, n_rif, self.n_samples)) for n_rif, k in richieste]
+        risultati = [(np.empty((n_query, k)), np.empty((n_query, k), dtype=np.intp)) for _, k in richieste]
+        for start in range(0, n_query, self.block_size):
+            blocco = query[start:start + self.block_size]
+            distanze = self._distanze_blocco(modo, blocco, riferimento, parziale)
+            tolleranza = self._tolleranza(blocco, riferimento, parziale) if modo != 'quantizzato' else 0.0
+            for (n_rif, k), (dist, indici) in zip(richieste, risultati):
+                candidati = _candidati(distanze[:, :n_rif], k, tolleranza)
+                if modo == 'denso':
+                    valori = self._distanze_coppie(blocco, riferimento, candidati, parziale)
+                elif modo == 'sparso':
+                    valori = self._distanze_coppie_sparse(blocco, candidati)
+                else:
+                    valori = np.take_along_axis(distanze, candidati, axis=1)
+                ordine = np.lexsort((candidati, valori), axis=1)[:, :k]
+                indici[start:start + len(ordine)] = np.take_along_axis(candidati, ordine, axis=1)
+                dist[start:start + len(ordine)] = np.take_along_axis(valori, ordine, axis=1)
+        return risultati
+
+    def _tolleranza(self, blocco: np.ndarray, riferimento: np.ndarray, parziale: bool) -> np.ndarray:
+        """
+        Margine (per riga) entro cui le distanze del prodotto matriciale possono differire da quelle
+        calcolate dalle differenze: i punti entro il margine dal k-esimo sono tutti candidati.
+        """
+        if self.metric == 'manhattan':
+            return np.zeros(blocco.shape[0])
+        if self.metric == 'cosine':
+            return np.full(blocco.shape[0], 1e-6)
+        norme = self._norme if riferimento is self.data else _norme_quadrate(riferimento)
+        norme_blocco = _norme_righe(blocco) if _is_sparse(blocco) else _norme_quadrate(blocco)
+        scala = np.sqrt(norme_blocco + norme.max(initial=0.0))
+        return 1e-6 * scala * (np.sqrt(blocco.shape[1]) if parziale else 1.0)
+
+
+class GrigliaUint8:
+    """
+    Griglia di quantizzazione per colonna: il valore `x` della colonna j ha codice
+    (x - offset[j]) / passo[j], intero tra 0 e 255.
+
+    Il passo è il massimo comune divisore delle differenze tra valori distinti (per colonne intere)
+    oppure la differenza minima; l'offset lascia un margine simmetrico di codici liberi, così anche
+    le query leggermente fuori dall'intervallo di addestramento restano codificabili.
+    """
+
+    LIVELLI = 256
+
+    def __init__(self, offset: np.ndarray, passo: np.ndarray):
+        self.offset = np.asarray(offset, dtype=float)
+        self.passo = np.asarray(passo, dtype=float)
+
+    @classmethod
+    def da_dati(cls, data: np.ndarray) -> "GrigliaUint8":
+        """
+        Ricava la griglia dai dati, oppure restituisce None se una colonna non è quantizzabile
+        (NaN, più di 256 livelli o valori non allineati a una griglia regolare).
+        """
+        if data.ndim != 2 or data.size == 0 or np.isnan(data).any():
+            return None
+
+        offset, passo = np.empty(data.shape[1]), np.ones(data.shape[1])
+        for j in range(data.shape[1]):
+            livelli = np.unique(data[:, j])
+            if len(livelli) > cls.LIVELLI:
+                return None
+            differenze = np.diff(livelli)
+            if len(differenze):
+                if np.all(livelli == np.round(livelli)):
+                    passo[j] = float(np.gcd.reduce(differenze.astype(np.int64)))
+                else:
+                    passo[j] = differenze.min()
+            ampiezza = round((livelli[-1] - livelli[0]) / passo[j])
+            if ampiezza >= cls.LIVELLI:
+                return None
+            offset[j] = livelli[0] - (cls.LIVELLI - 1 - ampiezza) // 2 * passo[j]
+
+        griglia = cls(offset, passo)
+        return griglia if griglia.codifica(data) is not None else None
+
+    def codifica(self, data: np.ndarray) -> np.ndarray:
+        """
+        Codici uint8 dei valori, oppure None se qualche valore non cade sulla griglia.
+        """
+        with np.errstate(invalid='ignore'):
+            posizioni = (data - self.offset) / self.passo
+            codici = np.rint(posizioni)
+            validi = (np.abs(posizioni - codici) <= 1e-6) & (codici >= 0) & (codici < self.LIVELLI)
+        if not validi.all():
+            return None
+        return np.ascontiguousarray(codici, dtype=np.uint8)
+
+    def decodifica(self, codici: np.ndarray) -> np.ndarray:
+        """Valori corrispondenti ai codici."""
+        return self.offset + self.passo * codici
+
+
+def vote_neighbors(neighbor_labels: np.ndarray, k: int, positive_label=4.0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Applica il voto di maggioranza sui primi k vicini di ciascun punto.
+
+    Le parità vengono risolte scegliendo casualmente tra le classi più votate,
+    come in `CustomKNN.predict`.
+
+    Args:
+        neighbor_labels (np.ndarray): Etichette dei vicini ordinati, forma (n_query, k_max).
+        k (int): Numero di vicini da considerare (k <= k_max).
+        positive_label: Etichetta della classe di cui restituire la probabilità.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Etichette predette e probabilità della classe positiva.
+    """
+    vicini = np.asarray(neighbor_labels)[:, :k]
+    classi, codici = np.unique(vicini, return_inverse=True)
+    codici = codici.reshape(vicini.shape)
+
+    # Conteggio dei voti per classe: forma (n_query, n_classi)
+    conteggi = np.zeros((len(vicini), len(classi)), dtype=np.intp)
+    for c in range(len(classi)):
+        conteggi[:, c] = (codici == c).sum(axis=1)
+
+    # Parità risolte con un'estrazione casuale tra le classi a pari merito
+    pari_merito = conteggi == conteggi.max(axis=1, keepdims=True)
+    scelta = np.argmax(np.where(pari_merito, np.random.random(conteggi.shape), -1.0), axis=1)
+    predizioni = classi[scelta]
+
+    posizione = np.flatnonzero(classi == positive_label)
+    if len(posizione):
+        probabilita = conteggi[:, posizione[0]] / vicini.shape[1]
+    else:
+        probabilita = np.zeros(len(vicini))
+    return predizioni, probabilita
+
+
+def _distanza_parziale(diff: np.ndarray, metric: str = 'euclidean') -> np.ndarray:
+    """
+    Distanza (euclidea o manhattan) sulle sole feature presenti in entrambi i punti, riscalata per la
+    frazione di feature presenti. I punti senza feature in comune sono a distanza infinita.
+
+    Args:
+        diff (np.ndarray): Differenze (con NaN dove manca almeno uno dei due valori), forma (..., n_feature).
+        metric (str): 'euclidean' o 'manhattan'.
+    """
+    comuni = ~np.isnan(diff)
+    diff = np.where(comuni, diff, 0.0)
+    n_comuni = comuni.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if metric == 'manhattan':
+            distanze = np.abs(diff).sum(axis=-1) * diff.shape[-1] / n_comuni
+        else:
+            distanze = np.sqrt((diff * diff).sum(axis=-1) * diff.shape[-1] / n_comuni)
+    return np.where(n_comuni > 0, distanze, np.inf)
+
+
+def _candidati(distanze: np.ndarray, k: int, tolleranza) -> np.ndarray:
+    """
+    Indici (per riga) di un insieme di punti che contiene i k più vicini e tutti quelli a distanza
+    non superiore al k-esimo più la tolleranza, così le parità al confine non vengono perse.
+    """
+    n = distanze.shape[1]
+    if k < n:
+        kesimo = np.partition(distanze, k - 1, axis=1)[:, k - 1]
+        entro = distanze <= (kesimo + np.broadcast_to(tolleranza, kesimo.shape))[:, None]
+        conteggi = entro.sum(axis=1)
+        if np.all(conteggi == conteggi[0]):
+            # Caso comune: lo stesso numero di candidati per ogni riga, letti direttamente dalla maschera
+            return np.nonzero(entro)[1].reshape(len(distanze), -1)
+        m = int(conteggi.max())
+        if m < n:
+            return np.argpartition(distanze, m - 1, axis=1)[:, :m]
+    return np.tile(np.arange(n), (len(distanze), 1))
+
+
+def _righe_per_blocco(n_query: int, n_feature: int, elementi: int = 1 << 22) -> int:
+    """Punti di riferimento per blocco tali che il tensore delle differenze resti sotto `elementi` valori."""
+    return max(1, elementi // max(1, n_query * n_feature))
+
+
+def _distanza_coseno(prodotti: np.ndarray, norme_query: np.ndarray, norme_riferimento: np.ndarray) -> np.ndarray:
+    """
+    1 - similarità del coseno dai prodotti scalari (n_query, n_riferimento) e dalle norme delle righe.
+    Un punto nullo non ha direzione: la sua distanza da ogni altro punto è 1.
+    """
+    denominatore = norme_query[:, None] * norme_riferimento[None, :]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        similarita = np.where(denominatore > 0, prodotti / denominatore, 0.0)
+    return 1.0 - np.clip(similarita, -1.0, 1.0)
+
+
+def _is_sparse(data) -> bool:
+    """
+    Verifica se `data` è una matrice sparsa SciPy, senza importare SciPy (dipendenza opzionale):
+    se il modulo non è già stato caricato, `data` non può esserne un'istanza.
+    """
+    sparse = sys.modules.get('scipy.sparse')
+    return sparse is not None and sparse.issparse(data)
+
+
+def _to_csr(data):
+    """Converte una matrice sparsa (o densa) in CSR float con indici ordinati."""
+    from scipy import sparse
+    matrice = sparse.csr_matrix(data if _is_sparse(data) else _to_array(data), dtype=float)
+    if not matrice.has_canonical_format:
+        # Copia prima di sommare i duplicati: la matrice dell'utente non viene modificata
+        matrice = matrice.copy()
+        matrice.sum_duplicates()
+    return matrice
+
+
+def _norme_quadrate(valori: np.ndarray) -> np.ndarray:
+    """Norme al quadrato delle righe di una matrice densa (i NaN contano come 0)."""
+    valori = np.nan_to_num(valori)
+    return np.einsum('nd,nd->n', valori, valori)
+
+
+def _norme_righe(matrice) -> np.ndarray:
+    """Norme al quadrato delle righe di una matrice CSR, calcolate sui soli valori non nulli."""
+    righe = np.repeat(np.arange(matrice.shape[0]), np.diff(matrice.indptr))
+    return np.bincount(righe, weights=matrice.data ** 2, minlength=matrice.shape[0])
+
+
+def _to_array(data) -> np.ndarray:
+    """Converte DataFrame/Series in array numpy bidimensionale."""
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        data = data.to_numpy()
+    data = np.asarray(data)
+    if data.ndim == 1:
+        data = data.reshape(1, -1)
+    return data
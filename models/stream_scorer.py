@@ -0,0 +1,95 @@
+from typing import Iterator
+import numpy as np
+import pandas as pd
+from .neighbors import NeighborIndex, vote_neighbors
+
+
+class StreamScorer:
+    """
+    Classificazione k-NN incrementale di nuovi record, ad es. i log degli strumenti che vengono
+    aggiunti in continuazione a un file NDJSON.
+
+    L'indice dei vicini viene costruito una sola volta sui dati di riferimento; ogni blocco in arrivo
+    viene allineato alle stesse feature, scalato con lo scaler già addestrato e classificato, senza
+    rileggere né rielaborare i dati precedenti. Le feature assenti nei record restano NaN e vengono
+    gestite dalla distanza parziale di `NeighborIndex`.
+    """
+
+    def __init__(self, k: int, scaler=None, reducer=None, block_size: int = 256, metric: str = 'euclidean',
+                 quantize: bool = False):
+        """
+        Args:
+            k (int): Numero di vicini da considerare.
+            scaler (FittedTransformer, optional): Scaler già addestrato da applicare ai nuovi record.
+            reducer (FittedReducer, optional): Riduzione di dimensionalità già addestrata, applicata dopo
+                lo scaling; in questo caso `fit` riceve le feature già ridotte e i record devono
+                contenere tutte le feature originali (la proiezione non ammette valori mancanti).
+            block_size (int): Punti di query elaborati per blocco nella ricerca dei vicini.
+            metric (str): 'euclidean', 'manhattan' o 'cosine' (vedi `NeighborIndex`).
+            quantize (bool, optional): Conserva i dati di riferimento come codici uint8 (True), solo se
+                quantizzabili (None) oppure in virgola mobile (False); vedi `NeighborIndex`.
+
+        Raises:
+            ValueError: Se k non è un intero positivo o la combinazione di metrica e quantizzazione non è valida.
+        """
+        if k <= 0:
+            raise ValueError("Il valore di k deve essere un intero positivo")
+
+        self.k = k
+        self.scaler = scaler
+        self.reducer = reducer
+        self.index = NeighborIndex(block_size=block_size, metric=metric, quantize=quantize)
+        self.columns = None
+        self.labels = None
+
+    def fit(self, features: pd.DataFrame, labels: pd.Series) -> "StreamScorer":
+        """
+        Memorizza i dati di riferimento (già preprocessati) e costruisce l'indice dei vicini.
+
+        Args:
+            features (pd.DataFrame): Feature di riferimento, già scalate.
+            labels (pd.Series): Etichette associate.
+        """
+        if not isinstance(features, pd.DataFrame):
+            raise ValueError("I dati devono essere sotto forma di DataFrame di Pandas.")
+        if len(features) != len(labels):
+            raise ValueError("Feature ed etichette devono avere lo stesso numero di righe.")
+
+        self.columns = list(features.columns)
+        self.labels = np.asarray(labels)
+        self.index.fit(features)
+        return self
+
+    def score(self, batch: pd.DataFrame) -> pd.DataFrame:
+        """
+        Classifica un blocco di nuovi record.
+
+        Returns:
+            pd.DataFrame: Colonne 'predizione' e 'probabilita' (della classe 4.0), con l'indice del blocco.
+        """
+        if self.columns is None:
+            raise ValueError("Lo scorer non è stato addestrato. Esegui 'fit' prima di usare 'score'.")
+
+        # Con la riduzione i record vanno allineati alle feature originali, non alle componenti
+        colonne = self.reducer.columns if self.reducer is not None else self.columns
+        X = batch.reindex(columns=colonne).astype(float)
+        if self.scaler is not None:
+            # X è già una copia allineata alle feature: lo scaling può avvenire in place
+            X = self.scaler.transform(X, inplace=True)
+        if self.reducer is not None and len(X):
+            X = self.reducer.transform(X)[self.columns]
+        if len(X) == 0:
+            return pd.DataFrame({'predizione': [], 'probabilita': []}, index=batch.index)
+
+        _, vicini = self.index.kneighbors(X, self.k)
+        predizioni, probabilita = vote_neighbors(self.labels[vicini], self.k)
+        return pd.DataFrame({'predizione': predizioni, 'probabilita': probabilita}, index=batch.index)
+
+    def follow(self, parser, file_path: str, schema=None, chunksize: int = 10_000) -> Iterator[pd.DataFrame]:
+        """
+        Classifica i record aggiunti al file dopo l'ultima lettura del parser (vedi `NDJSONFileParser.read_new`).
+        Richiamandolo periodicamente vengono elaborati solo i nuovi record.
+        """
+        for batch in parser.read_new(file_path, schema=schema, chunksize=chunksize):
+            if len(batch):
+                yield self.score(batch)
@@ -1,5 +1,15 @@
-from preprocesso.file_parser import ParserDispatcher
-from preprocesso.feature_transformer import FeatureTransformerInterface, FeatureTransformationManager
+from preprocesso.file_parser import ParserDispatcher, StreamingSchema
+from preprocesso.sharded_loader import ShardedDatasetLoader
+from preprocesso.quantile_sketch import KLLSketch
+from preprocesso.streaming_statistics import StreamingStatistics
+from preprocesso.profiling import DatasetProfiler
+from preprocesso.deduplication import StreamingDeduplicator
+from preprocesso.feature_selection import FeatureSelector, mutual_information
+from preprocesso.feature_transformer import FeatureTransformerInterface, FittedTransformer, FeatureTransformationManager
+from preprocesso.dimensionality_reduction import FittedReducer, DimensionalityReductionManager
 from preprocesso.missing_data_manager import MissingDataHandler, MissingDataStrategyManager
 from preprocesso.mapped_dati import ValidationMapper
+from preprocesso.stage_cache import StageCache
+from preprocesso.dataset_cache import DatasetCache
+from preprocesso.pipeline import PreprocessingPipeline
 from preprocesso.preprocesso_main import DataPreprocessor
\ No newline at end of file
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+
+class DatasetCache:
+    """
+    Cache su disco dei dataset già preprocessati, indicizzata per contenuto.
+
+    La chiave è l'hash SHA-256 del contenuto del file unito alle strategie di gestione dei valori
+    mancanti e di scaling, alla lettura a blocchi (`chunksize`, che cambia i tipi delle colonne) e
+    all'impronta del codice del package `preprocesso`: se il file, una delle scelte o il codice del
+    preprocessing cambiano, cambia anche la chiave e una voce non più valida non viene riusata.
+    Ogni voce è una cartella con feature, etichette, colonne escluse dalle feature (ad es.
+    'Sample code number') e indice in formato `.npy`, più un file `meta.json` con i nomi delle colonne
+    e, se disponibile, il profilo del dataset letto (`report.json`).
+    I dati vengono riletti in memory-mapping copy-on-write: nessuna copia finché non vengono modificati,
+    e le modifiche restano in memoria senza alterare la voce su disco.
+    Quando la dimensione totale supera `max_bytes` vengono eliminate le voci usate meno di recente.
+    """
+
+    BLOCCO_HASH = 1 << 20
+    _impronta_codice = None
+
+    def __init__(self, directory: str = '.preprocesso_cache', max_bytes: int = 512 * 1024 * 1024):
+        """
+        Args:
+            directory (str): Cartella in cui salvare le voci della cache.
+            max_bytes (int): Dimensione massima complessiva della cache in byte.
+
+        Raises:
+            ValueError: Se `max_bytes` non è positivo.
+        """
+        if not (max_bytes > 0):
+            raise ValueError("La dimensione massima della cache deve essere positiva")
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, file_path: str, missing_strategy: str, scaling_strategy: str, chunksize: int = None) -> str:
+        """
+        Calcola la chiave di una voce leggendo il file a blocchi.
+
+        Returns:
+            str: Digest esadecimale del contenuto del file, delle opzioni scelte e del codice del preprocessing.
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for blocco in iter(lambda: file.read(self.BLOCCO_HASH), b''):
+                digest.update(blocco)
+        digest.update(f"\0{missing_strategy}\0{scaling_strategy}\0{chunksize}\0".encode())
+        digest.update(self.impronta_codice().encode())
+        return digest.hexdigest()
+
+    @classmethod
+    def impronta_codice(cls) -> str:
+        """
+        Hash dei sorgenti del package `preprocesso`, calcolato una volta per processo: ogni modifica
+        al codice di lettura, pulizia o scaling invalida le voci create in precedenza.
+        """
+        if cls._impronta_codice is None:
+            cartella = os.path.dirname(os.path.abspath(__file__))
+            digest = hashlib.sha256()
+            for nome in sorted(os.listdir(cartella)):
+                if nome.endswith('.py'):
+                    with open(os.path.join(cartella, nome), 'rb') as file:
+                        digest.update(nome.encode() + b'\0' + file.read())
+            cls._impronta_codice = digest.hexdigest()
+        return cls._impronta_codice
+
+    def load(self, key: str):
+        """
+        Legge una voce dalla cache.
+
+        Returns:
+            tuple | None: (features, labels, data) con feature ed etichette mappate in memoria
+            (copy-on-write) e `data` il dataset completo nell'ordine di colonne originale (feature,
+            etichetta e colonne escluse), oppure None se la voce non esiste.
+        """
+        voce = os.path.join(self.directory, key)
+        meta_path = os.path.join(voce, 'meta.json')
+        if not os.path.exists(meta_path):
+            self.misses += 1
+            return None
+
+        with open(meta_path, encoding='utf-8') as file:
+            meta = json.load(file)
+        features = np.load(os.path.join(voce, 'features.npy'), mmap_mode='c')
+        labels = np.load(os.path.join(voce, 'labels.npy'), mmap_mode='c')
+        index = pd.Index(np.load(os.path.join(voce, 'index.npy')), name=meta['index_name'])
+
+        # Aggiorna la data di accesso usata per l'eviction LRU
+        os.utime(meta_path)
+        self.hits += 1
+        features = pd.DataFrame(features, index=index, columns=meta['columns'], copy=False)
+        labels = pd.Series(labels, index=index, name=meta['label_name'], copy=False)
+
+        parti = [features, labels]
+        if meta.get('extra_columns'):
+            extra = np.load(os.path.join(voce, 'extra.npy'), mmap_mode='c')
+            parti.append(pd.DataFrame(extra, index=index, columns=meta['extra_columns'], copy=False))
+        data = pd.concat(parti, axis=1)
+        return features, labels, data[meta.get('data_columns') or list(data.columns)]
+
+    def report_path(self, key: str):
+        """Percorso del profilo del dataset salvato con la voce, oppure None."""
+        path = os.path.join(self.directory, key, 'report.json')
+        return path if os.path.exists(path) else None
+
+    def store(self, key: str, features: pd.DataFrame, labels: pd.Series, data: pd.DataFrame = None,
+              report: dict = None) -> None:
+        """
+        Salva feature ed etichette preprocessate e applica il limite di dimensione.
+        La voce viene scritta in una cartella temporanea e poi rinominata, così che una scrittura
+        interrotta non lasci mai una voce incompleta.
+
+        Args:
+            key (str): Chiave della voce.
+            features (pd.DataFrame): Feature preprocessate.
+            labels (pd.Series): Etichette.
+            data (pd.DataFrame, optional): Dataset completo: le colonne che non sono né feature né
+                etichetta (ad es. 'Sample code number') vengono salvate insieme, con l'ordine delle colonne.
+            report (dict, optional): Profilo del dataset letto, restituito da `report_path`.
+        """
+        voce = os.path.join(self.directory, key)
+        if os.path.exists(voce):
+            return
+
+        index = features.index.to_numpy()
+        if index.dtype == object:
+            index = index.astype(str)
+
+        temporanea = tempfile.mkdtemp(dir=self.directory, prefix='.tmp-')
+        try:
+            np.save(os.path.join(temporanea, 'features.npy'), np.ascontiguousarray(features.to_numpy()))
+            np.save(os.path.join(temporanea, 'labels.npy'), labels.to_numpy())
+            np.save(os.path.join(temporanea, 'index.npy'), index)
+            meta = {'columns': list(features.columns), 'label_name': labels.name,
+                    'index_name': features.index.name}
+            if data is not None:
+                extra = [col for col in data.columns if col not in features.columns and col != labels.name]
+                if extra:
+                    np.save(os.path.join(temporanea, 'extra.npy'), np.ascontiguousarray(data[extra].to_numpy()))
+                meta.update(extra_columns=extra, data_columns=list(data.columns))
+            if report is not None:
+                with open(os.path.join(temporanea, 'report.json'), 'w', encoding='utf-8') as file:
+                    json.dump(report, file, ensure_ascii=False, indent=2)
+            with open(os.path.join(temporanea, 'meta.json'), 'w', encoding='utf-8') as file:
+                json.dump(meta, file)
+            os.replace(temporanea, voce)
+        except OSError:
+            shutil.rmtree(temporanea, ignore_errors=True)
+            if not os.path.exists(voce):
+                raise
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Elimina le voci usate meno di recente finché la cache non rientra in `max_bytes`."""
+        voci = []
+        for nome in os.listdir(self.directory):
+            meta_path = os.path.join(self.directory, nome, 'meta.json')
+            if os.path.exists(meta_path):
+                voci.append((os.path.getmtime(meta_path), nome, self._dimensione(nome)))
+
+        totale = sum(dimensione for _, _, dimensione in voci)
+        for _, nome, dimensione in sorted(voci):
+            if totale <= self.max_bytes:
+                break
+            shutil.rmtree(os.path.join(self.directory, nome), ignore_errors=True)
+            totale -= dimensione
+
+    def size(self) -> int:
+        """Dimensione complessiva delle voci in byte."""
+        return sum(self._dimensione(nome) for nome in os.listdir(self.directory) if not nome.startswith('.tmp-'))
+
+    def clear(self) -> None:
+        """Elimina tutte le voci e azzera i contatori."""
+        for nome in os.listdir(self.directory):
+            shutil.rmtree(os.path.join(self.directory, nome), ignore_errors=True)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return sum(os.path.exists(os.path.join(self.directory, nome, 'meta.json')) for nome in os.listdir(self.directory))
+
+    def _dimensione(self, nome: str) -> int:
+        voce = os.path.join(self.directory, nome)
+        return sum(os.path.getsize(os.path.join(voce, f)) for f in os.listdir(voce))
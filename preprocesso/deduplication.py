@@ -0,0 +1,243 @@
+import math
+import os
+import tempfile
+from typing import Iterator
+import numpy as np
+import pandas as pd
+
+
+class StreamingDeduplicator:
+    """
+    De-duplicazione a blocchi che vale anche tra file e ingestioni diverse.
+
+    Ogni riga è identificata da un hash a 64 bit della chiave: una o più colonne (ad es.
+    'Sample code number'), l'indice 'ID' oppure, con `key=None`, l'intera riga. Le chiavi già viste
+    sono conservate come array ordinato di uint64 (8 byte per chiave) e, se indicato `path`, salvate
+    su disco e riaperte in memory-mapping alla successiva ingestione. Le chiavi della sessione
+    corrente sono tenute in poche sequenze ordinate (`_SequenzeOrdinate`), così ogni blocco costa
+    in proporzione alle sue chiavi e non a tutte quelle viste finora.
+
+    Con `bloom_bits` un filtro di Bloom in memoria scarta subito le chiavi sicuramente nuove; solo le
+    chiavi che il filtro segnala come "forse già viste" vengono cercate nell'insieme esatto, quindi
+    il filtro non introduce falsi positivi nel risultato.
+    """
+
+    BLOCCO_BLOOM = 1 << 20
+
+    def __init__(self, key='Sample code number', path: str = None, bloom_bits: int = None, bloom_hashes: int = 7):
+        """
+        Args:
+            key (str | list | None): Colonna/e della chiave, 'ID' per l'indice, None per l'intera riga.
+            path (str, optional): File `.npy` in cui conservare le chiavi viste tra un'ingestione e l'altra.
+            bloom_bits (int, optional): Dimensione in bit del filtro di Bloom (None = nessun filtro).
+            bloom_hashes (int): Numero di funzioni hash del filtro di Bloom.
+
+        Raises:
+            ValueError: Se i parametri del filtro di Bloom non sono positivi.
+        """
+        if bloom_bits is not None and bloom_bits <= 0:
+            raise ValueError("bloom_bits deve essere un intero positivo")
+        if bloom_hashes <= 0:
+            raise ValueError("bloom_hashes deve essere un intero positivo")
+
+        self.key = [key] if isinstance(key, str) else (list(key) if key is not None else None)
+        self.path = path
+        self.bloom_bits = bloom_bits
+        self.bloom_hashes = bloom_hashes
+        self.duplicati_rimossi = 0
+
+        # Chiavi delle ingestioni precedenti (in memory-mapping) e della sessione corrente
+        self._salvate = np.empty(0, dtype=np.uint64)
+        if path is not None and os.path.exists(path):
+            self._salvate = np.load(path, mmap_mode='r')
+        self._sessione = _SequenzeOrdinate()
+
+        self._bloom = None
+        if bloom_bits is not None:
+            self._bloom = np.zeros((bloom_bits + 7) // 8, dtype=np.uint8)
+            for start in range(0, len(self._salvate), self.BLOCCO_BLOOM):
+                self._aggiungi_bloom(np.asarray(self._salvate[start:start + self.BLOCCO_BLOOM]))
+
+    @staticmethod
+    def bloom_size(n_chiavi: int, falsi_positivi: float = 0.01) -> tuple[int, int]:
+        """
+        Dimensione ottimale del filtro di Bloom per il numero di chiavi atteso.
+
+        Returns:
+            tuple[int, int]: (bloom_bits, bloom_hashes) da passare al costruttore.
+        """
+        if n_chiavi <= 0 or not 0 < falsi_positivi < 1:
+            raise ValueError("Servono un numero di chiavi positivo e un tasso di falsi positivi tra 0 e 1")
+        bits = math.ceil(-n_chiavi * math.log(falsi_positivi) / math.log(2) ** 2)
+        return bits, max(1, round(bits / n_chiavi * math.log(2)))
+
+    def __len__(self) -> int:
+        """Numero di chiavi distinte viste finora (comprese quelle delle ingestioni precedenti)."""
+        return len(self._salvate) + len(self._sessione)
+
+    def filter(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Rimuove dal blocco le righe con chiave già vista (nei blocchi o nelle ingestioni precedenti,
+        oppure prima nello stesso blocco) e registra le chiavi nuove.
+        Le righe con chiave mancante vengono mantenute e non registrate.
+
+        Raises:
+            ValueError: Se le colonne della chiave non sono presenti nel blocco.
+        """
+        if len(chunk) == 0:
+            return chunk
+
+        hash_chiavi, valide = self._hash(chunk)
+        tenere = np.ones(len(chunk), dtype=bool)
+        posizioni = np.flatnonzero(valide)
+        hash_chiavi = hash_chiavi[posizioni]
+
+        duplicate = pd.Index(hash_chiavi).duplicated(keep='first')
+        forse_viste = self._contiene_bloom(hash_chiavi) if self._bloom is not None else np.ones(len(hash_chiavi), dtype=bool)
+        candidate = hash_chiavi[forse_viste]
+        duplicate[forse_viste] |= _in_ordinato(self._salvate, candidate) | self._sessione.contiene(candidate)
+        tenere[posizioni[duplicate]] = False
+
+        nuove = hash_chiavi[~duplicate]
+        self._sessione.aggiungi(nuove)
+        if self._bloom is not None:
+            self._aggiungi_bloom(nuove)
+        self.duplicati_rimossi += int(duplicate.sum())
+        return chunk if tenere.all() else chunk[tenere]
+
+    def filter_chunks(self, chunks, save: bool = True) -> Iterator[pd.DataFrame]:
+        """
+        Applica `filter` a ogni blocco (ad es. da `parse_chunks`); al termine, se è indicato `path`,
+        le chiavi viste vengono salvate per la prossima ingestione.
+
+        Con `save=False` le chiavi restano solo in memoria finché non si chiama `save()`: così
+        un'ingestione che fallisce nei passi successivi (imputazione, scaling, ...) non marca
+        le sue righe come già viste.
+        """
+        for chunk in chunks:
+            yield self.filter(chunk)
+        if save and self.path is not None:
+            self.save()
+
+    def save(self, path: str = None) -> None:
+        """
+        Salva l'insieme ordinato delle chiavi viste (scrittura su file temporaneo e sostituzione atomica).
+
+        Raises:
+            ValueError: Se non è indicato alcun percorso.
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("Nessun percorso indicato per salvare le chiavi viste")
+
+        chiavi = np.union1d(self._salvate, self._sessione.ordinato())
+        cartella = os.path.dirname(os.path.abspath(path))
+        descrittore, temporaneo = tempfile.mkstemp(dir=cartella, prefix='.tmp-', suffix='.npy')
+        try:
+            with os.fdopen(descrittore, 'wb') as file:
+                np.save(file, chiavi)
+            os.replace(temporaneo, path)
+        except BaseException:
+            if os.path.exists(temporaneo):
+                os.remove(temporaneo)
+            raise
+        print(f"[INFO] Salvate {len(chiavi)} chiavi viste in {path}")
+
+        if path == self.path:
+            self._salvate = np.load(path, mmap_mode='r')
+            self._sessione = _SequenzeOrdinate()
+
+    def _hash(self, chunk: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        """Hash a 64 bit della chiave di ogni riga e maschera delle righe con chiave completa."""
+        if self.key is None:
+            valori = chunk
+        elif self.key == ['ID'] and 'ID' not in chunk.columns and chunk.index.name == 'ID':
+            valori = chunk.index.to_frame(index=False)
+        else:
+            mancanti = [col for col in self.key if col not in chunk.columns]
+            if mancanti:
+                raise ValueError(f"Colonne della chiave non presenti nel blocco: {mancanti}")
+            valori = chunk[self.key]
+
+        # Le colonne numeriche sono confrontate come float64, così il tipo letto da ciascun file non conta
+        valori = valori.apply(lambda serie: serie.astype(np.float64) if pd.api.types.is_numeric_dtype(serie) else serie)
+        valide = np.ones(len(chunk), dtype=bool) if self.key is None else valori.notna().all(axis=1).to_numpy()
+        return pd.util.hash_pandas_object(valori, index=False).to_numpy(), valide
+
+    def _posizioni_bloom(self, hash_chiavi: np.ndarray) -> np.ndarray:
+        # Doppio hashing: h1 + i * h2 (mod m), con h1 e h2 ricavati dalle due metà dell'hash a 64 bit
+        h1 = hash_chiavi & np.uint64(0xFFFFFFFF)
+        h2 = (hash_chiavi >> np.uint64(32)) | np.uint64(1)
+        i = np.arange(self.bloom_hashes, dtype=np.uint64)
+        return (h1[:, None] + i[None, :] * h2[:, None]) % np.uint64(self.bloom_bits)
+
+    def _aggiungi_bloom(self, hash_chiavi: np.ndarray) -> None:
+        posizioni = self._posizioni_bloom(hash_chiavi).ravel()
+        np.bitwise_or.at(self._bloom, posizioni >> np.uint64(3), (1 << (posizioni & np.uint64(7))).astype(np.uint8))
+
+    def _contiene_bloom(self, hash_chiavi: np.ndarray) -> np.ndarray:
+        posizioni = self._posizioni_bloom(hash_chiavi)
+        bit = (self._bloom[posizioni >> np.uint64(3)] >> (posizioni & np.uint64(7)).astype(np.uint8)) & 1
+        return bit.all(axis=1)
+
+
+def _in_ordinato(ordinato: np.ndarray, valori: np.ndarray) -> np.ndarray:
+    """Appartenenza dei valori a un array ordinato, tramite ricerca binaria."""
+    if len(ordinato) == 0 or len(valori) == 0:
+        return np.zeros(len(valori), dtype=bool)
+    posizioni = np.searchsorted(ordinato, valori)
+    trovati = posizioni < len(ordinato)
+    trovati[trovati] = ordinato[posizioni[trovati]] == valori[trovati]
+    return trovati
+
+
+class _SequenzeOrdinate:
+    """
+    Insieme di hash uint64 tenuto come lista di sequenze ordinate, dalla più lunga alla più corta.
+
+    Le chiavi di ogni blocco diventano una nuova sequenza, fusa con le ultime solo finché queste
+    non sono almeno il doppio più lunghe (come nei livelli di un LSM-tree): le sequenze restano
+    O(log n) e ogni chiave viene ricopiata O(log n) volte in tutto, invece di ricopiare l'intero
+    insieme a ogni blocco come farebbe `np.union1d`.
+    """
+
+    def __init__(self):
+        self._sequenze = []
+
+    def __len__(self) -> int:
+        return sum(len(sequenza) for sequenza in self._sequenze)
+
+    def contiene(self, valori: np.ndarray) -> np.ndarray:
+        """Appartenenza dei valori all'insieme (ricerca binaria in ogni sequenza)."""
+        trovati = np.zeros(len(valori), dtype=bool)
+        for sequenza in self._sequenze:
+            trovati |= _in_ordinato(sequenza, valori)
+        return trovati
+
+    def aggiungi(self, valori: np.ndarray) -> None:
+        """Aggiunge i valori all'insieme (quelli già presenti vengono ignorati)."""
+        nuova = np.unique(np.asarray(valori, dtype=np.uint64))
+        if len(self._sequenze) > 0:
+            nuova = nuova[~self.contiene(nuova)]
+        if len(nuova) == 0:
+            return
+        while self._sequenze and len(self._sequenze[-1]) < 2 * len(nuova):
+            nuova = _fondi(self._sequenze.pop(), nuova)
+        self._sequenze.append(nuova)
+
+    def ordinato(self) -> np.ndarray:
+        """Tutti i valori in un unico array ordinato."""
+        if not self._sequenze:
+            return np.empty(0, dtype=np.uint64)
+        return np.sort(np.concatenate(self._sequenze), kind='stable')
+
+
+def _fondi(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Fonde due array ordinati e disgiunti in un unico array ordinato."""
+    risultato = np.empty(len(a) + len(b), dtype=np.uint64)
+    posizioni = np.searchsorted(a, b) + np.arange(len(b))
+    inseriti = np.zeros(len(risultato), dtype=bool)
+    inseriti[posizioni] = True
+    risultato[posizioni] = b
+    risultato[~inseriti] = a
+    return risultato
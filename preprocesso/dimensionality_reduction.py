@@ -0,0 +1,258 @@
+import json
+import math
+import numpy as np
+import pandas as pd
+from abc import abstractmethod
+from .feature_transformer import FeatureTransformerInterface
+
+
+class FittedReducer(FeatureTransformerInterface):
+    """
+    Riduzione di dimensionalità con stato: la proiezione `(X - media) @ componenti` viene appresa una
+    sola volta con `fit` (ad es. sul training set) e applicata allo stesso modo ai dati di query con
+    `transform`, così le distanze del k-NN si calcolano su molte meno dimensioni.
+    Le colonne non ridotte (ad es. l'etichetta) restano invariate. I parametri si salvano in JSON.
+    """
+
+    strategy = None
+    prefisso = None
+
+    def __init__(self, n_components=None, random_state: int = None):
+        self.n_components = n_components
+        self.random_state = random_state
+        self.columns = None
+        self.mean = None
+        self.components = None
+
+    @property
+    def output_columns(self) -> list[str]:
+        """Nomi delle colonne prodotte dalla proiezione (es. 'PC1', 'PC2', ...)."""
+        return [f"{self.prefisso}{i + 1}" for i in range(self.components.shape[1])]
+
+    @abstractmethod
+    def _fit_components(self, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Calcola media e matrice delle componenti (n_feature x n_componenti) dalla matrice `values`."""
+
+    def fit(self, data: pd.DataFrame, skip_columns: list = None) -> 'FittedReducer':
+        """
+        Apprende la proiezione sulle colonne numeriche non saltate.
+
+        Raises:
+            ValueError: Se i dati contengono valori mancanti o non ci sono colonne da ridurre.
+        """
+        skip_columns = skip_columns or []
+        numeric_cols = data.select_dtypes(include=[np.number]).columns
+        self.columns = [col for col in numeric_cols if col not in skip_columns]
+        if not self.columns:
+            raise ValueError("Nessuna colonna numerica da ridurre")
+
+        values = data[self.columns].to_numpy(dtype=float)
+        if np.isnan(values).any():
+            raise ValueError("La riduzione di dimensionalità richiede dati senza valori mancanti: imputali prima")
+        self.mean, self.components = self._fit_components(values)
+        print(f"[INFO] {self.__class__.__name__}: {len(self.columns)} -> {self.components.shape[1]} dimensioni")
+        return self
+
+    def transform(self, data: pd.DataFrame, skip_columns: list = None) -> pd.DataFrame:
+        """
+        Proietta le colonne viste in `fit`; le altre colonne vengono mantenute dopo le componenti.
+
+        Raises:
+            ValueError: Se il riduttore non è stato addestrato o mancano colonne viste in `fit`.
+        """
+        if self.components is None:
+            raise ValueError("Il riduttore non è stato addestrato: chiama prima fit()")
+        mancanti = [col for col in self.columns if col not in data.columns]
+        if mancanti:
+            raise ValueError(f"Colonne mancanti rispetto all'addestramento: {mancanti}")
+
+        ridotte = (data[self.columns].to_numpy(dtype=float) - self.mean) @ self.components
+        risultato = pd.DataFrame(ridotte, index=data.index, columns=self.output_columns)
+        altre = [col for col in data.columns if col not in self.columns]
+        return pd.concat([risultato, data[altre]], axis=1) if altre else risultato
+
+    def fit_transform(self, data: pd.DataFrame, skip_columns: list = None) -> pd.DataFrame:
+        return self.fit(data, skip_columns).transform(data)
+
+    def to_dict(self) -> dict:
+        """Parametri appresi in forma serializzabile."""
+        if self.components is None:
+            raise ValueError("Il riduttore non è stato addestrato: chiama prima fit()")
+        return {'strategy': self.strategy, 'columns': list(self.columns),
+                'mean': self.mean.tolist(), 'components': self.components.tolist()}
+
+    @staticmethod
+    def from_dict(params: dict) -> 'FittedReducer':
+        """Ricostruisce un riduttore addestrato dai parametri salvati con `to_dict`."""
+        reducer = DimensionalityReductionManager.create_reducer(params['strategy'])
+        reducer.columns = list(params['columns'])
+        reducer.mean = np.asarray(params['mean'], dtype=float)
+        reducer.components = np.asarray(params['components'], dtype=float).reshape(len(reducer.columns), -1)
+        reducer.n_components = reducer.components.shape[1]
+        reducer._ripristina(params)
+        return reducer
+
+    def _ripristina(self, params: dict) -> None:
+        """Ripristina gli attributi specifici della strategia salvati da `to_dict` (nessuno di default)."""
+
+    def save(self, file_path: str) -> None:
+        """Salva i parametri appresi in un file JSON."""
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file)
+
+    @staticmethod
+    def load(file_path: str) -> 'FittedReducer':
+        """Carica un riduttore addestrato da un file JSON."""
+        with open(file_path, encoding='utf-8') as file:
+            return FittedReducer.from_dict(json.load(file))
+
+
+class FittedPCA(FittedReducer):
+    """
+    Analisi delle componenti principali calcolata con SVD randomizzata (Halko et al.): la matrice
+    centrata viene proiettata su poche direzioni casuali, raffinate con alcune iterazioni di potenza,
+    e la SVD esatta si calcola solo sulla piccola matrice risultante.
+
+    `n_components` può essere un intero (numero di componenti) oppure una frazione in (0, 1) della
+    varianza da spiegare; in questo caso il rango della proiezione casuale viene raddoppiato finché
+    le componenti trovate non spiegano la frazione richiesta.
+    """
+
+    strategy = 'pca'
+    prefisso = 'PC'
+
+    def __init__(self, n_components=0.95, n_iter: int = 4, oversampling: int = 10, random_state: int = None):
+        """
+        Args:
+            n_components (int | float): Numero di componenti o frazione di varianza da spiegare.
+            n_iter (int): Iterazioni di potenza della SVD randomizzata.
+            oversampling (int): Direzioni casuali aggiuntive oltre al numero di componenti.
+            random_state (int, optional): Seme delle direzioni casuali.
+
+        Raises:
+            ValueError: Se `n_components` non è un intero positivo né una frazione in (0, 1).
+        """
+        _verifica_componenti(n_components, frazione=True)
+        super().__init__(n_components, random_state)
+        self.n_iter = n_iter
+        self.oversampling = oversampling
+        self.explained_variance_ratio = None
+
+    def _fit_components(self, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        mean = values.mean(axis=0)
+        centrati = values - mean
+        rango_massimo = min(centrati.shape)
+        varianza_totale = np.einsum('ij,ij->', centrati, centrati)
+        rng = np.random.default_rng(self.random_state)
+
+        frazione = isinstance(self.n_components, float)
+        obiettivo = rango_massimo if frazione else min(self.n_components, rango_massimo)
+        rango = min(rango_massimo, (1 if frazione else obiettivo) + self.oversampling)
+        while True:
+            valori_singolari, vettori = _svd_randomizzata(centrati, rango, self.n_iter, rng)
+            rapporti = valori_singolari ** 2 / varianza_totale if varianza_totale > 0 else np.zeros_like(valori_singolari)
+            if frazione:
+                cumulata = np.cumsum(rapporti)
+                raggiunte = np.flatnonzero(cumulata >= self.n_components - 1e-12)
+                if len(raggiunte) or rango == rango_massimo:
+                    obiettivo = int(raggiunte[0]) + 1 if len(raggiunte) else rango
+                    break
+                rango = min(rango_massimo, 2 * rango)
+            else:
+                break
+
+        self.explained_variance_ratio = rapporti[:obiettivo]
+        return mean, vettori[:, :obiettivo]
+
+    def to_dict(self) -> dict:
+        params = super().to_dict()
+        if self.explained_variance_ratio is not None:
+            params['explained_variance_ratio'] = self.explained_variance_ratio.tolist()
+        return params
+
+    def _ripristina(self, params: dict) -> None:
+        if 'explained_variance_ratio' in params:
+            self.explained_variance_ratio = np.asarray(params['explained_variance_ratio'], dtype=float)
+
+
+class GaussianRandomProjection(FittedReducer):
+    """
+    Proiezione casuale gaussiana: le feature vengono moltiplicate per una matrice con elementi
+    N(0, 1/n_componenti), che conserva le distanze a meno di un fattore (1 ± eps) con alta
+    probabilità (lemma di Johnson-Lindenstrauss). L'addestramento non richiede passate sui dati
+    oltre alla lettura del numero di feature, quindi è adatto a dataset molto larghi.
+    """
+
+    strategy = 'random_projection'
+    prefisso = 'RP'
+
+    def __init__(self, n_components: int = None, eps: float = 0.1, random_state: int = None):
+        """
+        Args:
+            n_components (int, optional): Dimensioni dello spazio ridotto. Se None vengono ricavate
+                dal lemma di Johnson-Lindenstrauss per il numero di righe e `eps`.
+            eps (float): Distorsione massima tollerata delle distanze, usata quando n_components è None.
+            random_state (int, optional): Seme della matrice di proiezione.
+        """
+        if n_components is not None:
+            _verifica_componenti(n_components, frazione=False)
+        if not 0 < eps < 1:
+            raise ValueError("eps deve essere compreso tra 0 e 1")
+        super().__init__(n_components, random_state)
+        self.eps = eps
+
+    @staticmethod
+    def componenti_minime(n_righe: int, eps: float = 0.1) -> int:
+        """Dimensioni sufficienti secondo il lemma di Johnson-Lindenstrauss: 4 ln(n) / (eps²/2 - eps³/3)."""
+        return math.ceil(4 * math.log(max(n_righe, 2)) / (eps ** 2 / 2 - eps ** 3 / 3))
+
+    def _fit_components(self, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        n_righe, n_feature = values.shape
+        n_components = self.n_components or self.componenti_minime(n_righe, self.eps)
+        if n_components >= n_feature:
+            # Una proiezione casuale quadrata distorcerebbe le distanze senza ridurre nulla: identità
+            print(f"[INFO] {n_components} dimensioni non riducono le {n_feature} feature: "
+                  f"le feature vengono mantenute senza proiezione")
+            return np.zeros(n_feature), np.eye(n_feature)
+        rng = np.random.default_rng(self.random_state)
+        # Le distanze non dipendono dalla traslazione: nessuna centratura
+        return np.zeros(n_feature), rng.normal(0.0, 1.0 / math.sqrt(n_components), (n_feature, n_components))
+
+
+class DimensionalityReductionManager:
+    """
+    Gestore delle strategie di riduzione di dimensionalità, analogo a `FeatureTransformationManager`.
+    """
+
+    @staticmethod
+    def create_reducer(strategy: str, n_components=None, random_state: int = None) -> FittedReducer:
+        """Crea un riduttore con stato (da addestrare con `fit`) per la strategia indicata."""
+        if strategy.lower() == 'pca':
+            return FittedPCA(n_components if n_components is not None else 0.95, random_state=random_state)
+        elif strategy.lower() == 'random_projection':
+            return GaussianRandomProjection(n_components, random_state=random_state)
+        else:
+            raise ValueError("Strategia non supportata. Usa 'pca' o 'random_projection'.")
+
+
+def _verifica_componenti(n_components, frazione: bool) -> None:
+    if isinstance(n_components, float) and frazione:
+        if not 0 < n_components < 1:
+            raise ValueError("La frazione di varianza deve essere compresa tra 0 e 1")
+    elif not isinstance(n_components, (int, np.integer)) or isinstance(n_components, bool) or n_components <= 0:
+        raise ValueError("Il numero di componenti deve essere un intero positivo")
+
+
+def _svd_randomizzata(matrice: np.ndarray, rango: int, n_iter: int, rng) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Valori singolari e vettori singolari destri (per colonne) approssimati di rango `rango`.
+    """
+    Q, _ = np.linalg.qr(matrice @ rng.standard_normal((matrice.shape[1], rango)))
+    for _ in range(n_iter):
+        # Iterazioni di potenza con riortogonalizzazione, per spettri che decadono lentamente
+        Q, _ = np.linalg.qr(matrice.T @ Q)
+        Q, _ = np.linalg.qr(matrice @ Q)
+    _, valori_singolari, vt = np.linalg.svd(Q.T @ matrice, full_matrices=False)
+    # Segno deterministico: la componente di modulo massimo di ogni vettore è positiva
+    segni = np.sign(vt[np.arange(len(vt)), np.abs(vt).argmax(axis=1)])
+    return valori_singolari, (vt * segni[:, None]).T
@@ -0,0 +1,227 @@
+import json
+import numpy as np
+import pandas as pd
+
+
+def mutual_information(features: pd.DataFrame, labels, n_bins: int = 10) -> pd.Series:
+    """
+    Informazione mutua (in nat) tra ciascuna feature e l'etichetta, calcolata per tutte le feature
+    con un unico istogramma congiunto: ogni feature viene discretizzata in `n_bins` intervalli di
+    uguale frequenza e i conteggi (feature, intervallo, classe) si ottengono con un solo `bincount`.
+    I valori mancanti vengono esclusi dal calcolo della sola feature in cui mancano.
+
+    Args:
+        features (pd.DataFrame): Feature numeriche.
+        labels (array-like): Etichette delle righe.
+        n_bins (int): Numero di intervalli per feature.
+
+    Returns:
+        pd.Series: Informazione mutua per colonna.
+    """
+    if n_bins < 2:
+        raise ValueError("Il numero di intervalli deve essere almeno 2")
+
+    # Intervalli per quantili (dal rango percentuale): valori uguali cadono nello stesso intervallo
+    # e i valori anomali non schiacciano gli altri in pochi intervalli
+    ranghi = features.rank(method='min', pct=True).to_numpy(dtype=float)
+    _, y = np.unique(np.asarray(labels), return_inverse=True)
+    n_classi = int(y.max()) + 1 if len(y) else 1
+    n_feature = ranghi.shape[1]
+
+    presenti = ~np.isnan(ranghi)
+    intervalli = np.clip(np.ceil(np.where(presenti, ranghi, 0.0) * n_bins).astype(np.intp) - 1, 0, n_bins - 1)
+
+    # Codice unico (feature, intervallo, classe) per ogni cella presente
+    codici = (np.arange(n_feature) * n_bins + intervalli) * n_classi + y[:, None]
+    congiunta = np.bincount(codici[presenti], minlength=n_feature * n_bins * n_classi)
+    congiunta = congiunta.reshape(n_feature, n_bins, n_classi).astype(float)
+    totale = congiunta.sum(axis=(1, 2), keepdims=True)
+    p_xy = np.divide(congiunta, totale, out=np.zeros_like(congiunta), where=totale > 0)
+    p_x = p_xy.sum(axis=2, keepdims=True)
+    p_y = p_xy.sum(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        termini = np.where(p_xy > 0, p_xy * np.log(p_xy / (p_x * p_y)), 0.0)
+    return pd.Series(termini.sum(axis=(1, 2)), index=features.columns, name='informazione_mutua')
+
+
+class FeatureSelector:
+    """
+    Selezione delle feature per il k-NN: filtro per informazione mutua seguito da una selezione
+    wrapper in avanti (forward) o all'indietro (backward).
+
+    Il wrapper valuta ogni sottoinsieme con l'accuratezza leave-one-out del k-NN. La matrice delle
+    distanze al quadrato del sottoinsieme corrente viene mantenuta e aggiornata sommando o sottraendo
+    il termine della sola feature candidata, quindi valutare un candidato costa un'operazione n x n
+    invece di ricalcolare tutte le distanze. Con dati contenenti NaN si usa la distanza parziale di
+    `NeighborIndex`, mantenendo anche il numero di feature in comune per ogni coppia di punti.
+    """
+
+    def __init__(self, k: int = 5, direction: str = 'backward', n_features: int = None, min_mi: float = None,
+                 n_bins: int = 10, tol: float = 0.0, max_samples: int = 2000, random_state: int = None):
+        """
+        Args:
+            k (int): Numero di vicini usato per valutare i sottoinsiemi.
+            direction (str): 'forward' (aggiunge feature) o 'backward' (rimuove feature).
+            n_features (int, optional): Numero di feature da selezionare. Se None la ricerca si ferma
+                quando il punteggio non migliora (forward) o peggiora di più di `tol` (backward).
+            min_mi (float, optional): Le feature con informazione mutua non superiore vengono scartate dal
+                filtro. Con None la soglia è il doppio della distorsione attesa della stima per una feature
+                indipendente dall'etichetta, (n_bins - 1) * (n_classi - 1) / n_righe.
+            n_bins (int): Intervalli usati per stimare l'informazione mutua.
+            tol (float): Variazione minima del punteggio considerata significativa.
+            max_samples (int): Righe usate al massimo dal wrapper (campione casuale), per limitare la matrice n x n.
+            random_state (int, optional): Seme del campionamento delle righe.
+
+        Raises:
+            ValueError: Se i parametri non sono validi.
+        """
+        if direction not in ('forward', 'backward'):
+            raise ValueError("La direzione deve essere 'forward' o 'backward'")
+        if k <= 0 or max_samples <= k:
+            raise ValueError("k deve essere positivo e minore di max_samples")
+        if n_features is not None and n_features <= 0:
+            raise ValueError("n_features deve essere un intero positivo")
+
+        self.k = k
+        self.direction = direction
+        self.n_features = n_features
+        self.min_mi = min_mi
+        self.n_bins = n_bins
+        self.tol = tol
+        self.max_samples = max_samples
+        self.random_state = random_state
+        self.mi = None
+        self.selected = None
+        self.history = []
+
+    def fit(self, features: pd.DataFrame, labels) -> 'FeatureSelector':
+        """
+        Sceglie le colonne da mantenere; il risultato è in `selected` (nell'ordine originale delle colonne)
+        e i passi della ricerca, con il relativo punteggio, in `history`.
+        """
+        if not isinstance(features, pd.DataFrame):
+            raise ValueError("I dati devono essere sotto forma di DataFrame di Pandas.")
+        if len(features) != len(labels):
+            raise ValueError("Feature ed etichette devono avere lo stesso numero di righe.")
+        if len(features) < 2:
+            raise ValueError("Servono almeno 2 righe per valutare i sottoinsiemi con il k-NN.")
+        if self.k >= len(features):
+            print(f"[INFO] Solo {len(features)} righe: i sottoinsiemi sono valutati con k = {len(features) - 1}")
+
+        self.history = []
+        self.mi = mutual_information(features, labels, self.n_bins)
+        soglia = self.min_mi
+        if soglia is None:
+            soglia = (self.n_bins - 1) * (len(np.unique(np.asarray(labels))) - 1) / len(features)
+        candidate = [col for col in features.columns if self.mi[col] > soglia]
+        if not candidate:
+            candidate = [self.mi.idxmax()]
+        print(f"[INFO] Filtro per informazione mutua: {len(candidate)} feature su {features.shape[1]}")
+
+        X = features[candidate].to_numpy(dtype=float)
+        y = np.unique(np.asarray(labels), return_inverse=True)[1]
+        if len(X) > self.max_samples:
+            righe = np.sort(np.random.default_rng(self.random_state).choice(len(X), self.max_samples, replace=False))
+            X, y = X[righe], y[righe]
+
+        scelte = self._forward(X, y) if self.direction == 'forward' else self._backward(X, y)
+        scelte = {candidate[j] for j in scelte}
+        self.selected = [col for col in features.columns if col in scelte]
+        self.history = [([candidate[j] for j in sorted(passo)], punteggio) for passo, punteggio in self.history]
+        print(f"[INFO] Feature selezionate ({len(self.selected)}): {self.selected}")
+        return self
+
+    def transform(self, features: pd.DataFrame) -> pd.DataFrame:
+        """Restituisce le sole colonne selezionate."""
+        if self.selected is None:
+            raise ValueError("Il selettore non è stato addestrato. Esegui 'fit' prima di usare 'transform'.")
+        return features[self.selected]
+
+    def fit_transform(self, features: pd.DataFrame, labels) -> pd.DataFrame:
+        return self.fit(features, labels).transform(features)
+
+    def save(self, path: str) -> None:
+        """Salva in JSON le colonne selezionate e l'informazione mutua di ogni feature."""
+        if self.selected is None:
+            raise ValueError("Il selettore non è stato addestrato. Esegui 'fit' prima di salvarlo.")
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({'selected': self.selected, 'mutual_information': self.mi.to_dict()}, file,
+                      indent=2, ensure_ascii=False)
+
+    def _forward(self, X: np.ndarray, y: np.ndarray) -> set:
+        n, d = X.shape
+        somma, comuni = np.zeros((n, n)), np.zeros((n, n))
+        scelte, punteggio = set(), -np.inf
+        while len(scelte) < min(self.n_features or d, d):
+            migliore, migliore_punteggio = None, -np.inf
+            for j in range(d):
+                if j in scelte:
+                    continue
+                termine, presenti = _termine(X[:, j])
+                valore = self._punteggio(somma + termine, comuni + presenti, len(scelte) + 1, y)
+                if valore > migliore_punteggio:
+                    migliore, migliore_punteggio = j, valore
+            if self.n_features is None and migliore_punteggio <= punteggio + self.tol:
+                break
+            termine, presenti = _termine(X[:, migliore])
+            somma += termine
+            comuni += presenti
+            scelte.add(migliore)
+            punteggio = migliore_punteggio
+            self.history.append((set(scelte), punteggio))
+        return scelte
+
+    def _backward(self, X: np.ndarray, y: np.ndarray) -> set:
+        n, d = X.shape
+        somma, comuni = np.zeros((n, n)), np.zeros((n, n))
+        for j in range(d):
+            termine, presenti = _termine(X[:, j])
+            somma += termine
+            comuni += presenti
+        scelte = set(range(d))
+        punteggio = self._punteggio(somma, comuni, d, y)
+        self.history.append((set(scelte), punteggio))
+        obiettivo = self.n_features or 1
+        while len(scelte) > obiettivo:
+            migliore, migliore_punteggio = None, -np.inf
+            for j in sorted(scelte):
+                termine, presenti = _termine(X[:, j])
+                valore = self._punteggio(somma - termine, comuni - presenti, len(scelte) - 1, y)
+                if valore > migliore_punteggio:
+                    migliore, migliore_punteggio = j, valore
+            # A parità di punteggio (entro tol) si preferisce il sottoinsieme più piccolo
+            if self.n_features is None and migliore_punteggio < punteggio - self.tol:
+                break
+            termine, presenti = _termine(X[:, migliore])
+            somma -= termine
+            comuni -= presenti
+            scelte.remove(migliore)
+            punteggio = migliore_punteggio
+            self.history.append((set(scelte), punteggio))
+        return scelte
+
+    def _punteggio(self, somma: np.ndarray, comuni: np.ndarray, n_scelte: int, y: np.ndarray) -> float:
+        """
+        Accuratezza leave-one-out attesa del k-NN: a parità di voti la classe è estratta a caso
+        (come in `vote_neighbors`), quindi una parità con la classe corretta vale 1 / n_classi_pari.
+        Con n righe si usano al più n - 1 vicini (ad es. su un fold piccolo della pipeline).
+        """
+        k = min(self.k, len(y) - 1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            distanze = np.where(comuni > 0, somma * n_scelte / comuni, np.inf)
+        np.fill_diagonal(distanze, np.inf)
+        vicini = np.argpartition(distanze, k - 1, axis=1)[:, :k]
+
+        n_classi = int(y.max()) + 1
+        conteggi = np.zeros((len(y), n_classi), dtype=np.intp)
+        np.add.at(conteggi, (np.repeat(np.arange(len(y)), k), y[vicini].ravel()), 1)
+        massimo = conteggi.max(axis=1)
+        corretti = conteggi[np.arange(len(y)), y] == massimo
+        return float(np.mean(np.where(corretti, 1.0 / (conteggi == massimo[:, None]).sum(axis=1), 0.0)))
+
+
+def _termine(colonna: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Differenze al quadrato tra tutte le coppie di punti per una feature (0 dove manca un valore) e presenza."""
+    diff = colonna[:, None] - colonna[None, :]
+    presenti = ~np.isnan(diff)
+    return np.where(presenti, diff * diff, 0.0), presenti
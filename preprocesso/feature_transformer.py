@@ -1,6 +1,8 @@
+import json
 import pandas as pd
 import numpy as np
 from abc import ABC, abstractmethod
+from .streaming_statistics import StreamingStatistics
 
 
 class FeatureTransformerInterface(ABC):
@@ -13,26 +15,237 @@ class FeatureTransformerInterface(ABC):
         pass
 
 
-class Normalizer(FeatureTransformerInterface):
+class FittedTransformer(FeatureTransformerInterface):
     """
-    Applica una normalizzazione [0,1] alle colonne numeriche.
+    Trasformatore con stato: i parametri di scaling (offset e scala per colonna) vengono appresi
+    una sola volta con `fit` (ad es. solo sul training set) e poi applicati a qualunque nuovo batch
+    con un'unica operazione vettoriale `(X - offset) / scala`, senza ricalcolarli.
+    I parametri possono essere salvati e ricaricati in formato JSON.
     """
 
-    def transform(self, data: pd.DataFrame, skip_columns: list = None) -> pd.DataFrame:
+    strategy = None
+
+    def __init__(self):
+        self.columns = None
+        self.offset = None
+        self.scale = None
+
+    @abstractmethod
+    def _fit_params(self, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Calcola offset e scala di ogni colonna della matrice `values`."""
+
+    def fit(self, data: pd.DataFrame, skip_columns: list = None) -> 'FittedTransformer':
+        """
+        Apprende i parametri di scaling sulle colonne numeriche non saltate.
+
+        Se il DataFrame è un unico blocco float, le statistiche di tutte le colonne vengono
+        calcolate con una sola riduzione direttamente sul buffer, senza copiarlo.
+
+        Args:
+            data (pd.DataFrame): Dati su cui stimare i parametri (ad es. il solo training set).
+            skip_columns (list, optional): Colonne da non trasformare (ad es. l'etichetta).
+        """
+        if skip_columns is None:
+            skip_columns = []
+
+        values = _blocco_float(data)
+        if values is not None:
+            self.columns = [col for col in data.columns if col not in skip_columns]
+            posizioni = data.columns.get_indexer(self.columns)
+            offset, scale = (param[posizioni] for param in self._fit_params(values))
+        else:
+            numeric_cols = data.select_dtypes(include=[np.number]).columns.tolist()
+            self.columns = [col for col in numeric_cols if col not in skip_columns]
+            offset, scale = self._fit_params(data[self.columns].to_numpy(dtype=float))
+
+        return self._imposta_parametri(offset, scale)
+
+    def fit_from_statistics(self, stats: StreamingStatistics, skip_columns: list = None) -> 'FittedTransformer':
+        """
+        Apprende i parametri da statistiche accumulate a blocchi (`StreamingStatistics`),
+        così da poter scalare dataset che non stanno in memoria dopo una sola passata di lettura.
+
+        Args:
+            stats (StreamingStatistics): Statistiche calcolate su tutti i blocchi.
+            skip_columns (list, optional): Colonne da non trasformare (ad es. l'etichetta).
+
+        Raises:
+            ValueError: Se le statistiche sono vuote.
+        """
+        if stats.count is None:
+            raise ValueError("Le statistiche sono vuote: aggiorna l'accumulatore con almeno un blocco")
         if skip_columns is None:
             skip_columns = []
 
-        df = data.copy()
-        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        columns_to_scale = [col for col in numeric_cols if col not in skip_columns]
+        selezionate = np.array([col not in skip_columns for col in stats.columns], dtype=bool)
+        self.columns = [col for col in stats.columns if col not in skip_columns]
+        offset, scale = self._params_from_statistics(stats)
+        return self._imposta_parametri(offset[selezionate], scale[selezionate])
+
+    @abstractmethod
+    def _params_from_statistics(self, stats: StreamingStatistics) -> tuple[np.ndarray, np.ndarray]:
+        """Calcola offset e scala di ogni colonna dalle statistiche accumulate."""
+
+    def _imposta_parametri(self, offset: np.ndarray, scale: np.ndarray) -> 'FittedTransformer':
+        # Le colonne costanti restano invariate (evita la divisione per zero)
+        costanti = ~(scale > 0)
+        self.offset = np.where(costanti, 0.0, offset)
+        self.scale = np.where(costanti, 1.0, scale)
+        return self
 
-        for col in columns_to_scale:
-            min_val = df[col].min()
-            max_val = df[col].max()
-            if max_val != min_val:  # Evita divisione per zero
-                df[col] = (df[col] - min_val) / (max_val - min_val)
+    def transform(self, data: pd.DataFrame, skip_columns: list = None, inplace: bool = False) -> pd.DataFrame:
+        """
+        Applica i parametri appresi; `skip_columns` è ignorato perché le colonne sono fissate da `fit`.
+
+        Se il DataFrame è un unico blocco float, la trasformazione è un solo broadcast sull'intera
+        matrice (le colonne non scalate hanno offset 0 e scala 1, quindi restano identiche):
+        con `inplace=True` il risultato viene scritto nel buffer esistente e viene restituito `data`
+        stesso, altrimenti viene allocata una sola matrice per il risultato.
+
+        Args:
+            data (pd.DataFrame): Dati da trasformare.
+            skip_columns (list, optional): Ignorato.
+            inplace (bool): Se True modifica `data` invece di crearne una copia.
+
+        Raises:
+            ValueError: Se il trasformatore non è stato addestrato o mancano colonne viste in `fit`.
+        """
+        if self.columns is None:
+            raise ValueError("Il trasformatore non è stato addestrato: chiama prima fit()")
+        mancanti = [col for col in self.columns if col not in data.columns]
+        if mancanti:
+            raise ValueError(f"Colonne mancanti rispetto all'addestramento: {mancanti}")
+
+        values = _blocco_float(data)
+        if values is not None and (not inplace or _condivide_buffer(values, data)):
+            offset = np.zeros(data.shape[1])
+            scale = np.ones(data.shape[1])
+            posizioni = data.columns.get_indexer(self.columns)
+            offset[posizioni] = self.offset
+            scale[posizioni] = self.scale
+
+            out = values if inplace else data.to_numpy(copy=True)
+            np.subtract(out, offset, out=out)
+            np.divide(out, scale, out=out)
+            return data if inplace else pd.DataFrame(out, index=data.index, columns=data.columns, copy=False)
+
+        df = data if inplace else data.copy()
+        df[self.columns] = (data[self.columns].to_numpy(dtype=float) - self.offset) / self.scale
         return df
 
+    def fit_transform(self, data: pd.DataFrame, skip_columns: list = None, inplace: bool = False) -> pd.DataFrame:
+        return self.fit(data, skip_columns).transform(data, inplace=inplace)
+
+    def to_dict(self) -> dict:
+        """Parametri appresi in forma serializzabile."""
+        if self.columns is None:
+            raise ValueError("Il trasformatore non è stato addestrato: chiama prima fit()")
+        return {'strategy': self.strategy, 'columns': list(self.columns),
+                'offset': self.offset.tolist(), 'scale': self.scale.tolist()}
+
+    @staticmethod
+    def from_dict(params: dict) -> 'FittedTransformer':
+        """Ricostruisce un trasformatore addestrato dai parametri salvati con `to_dict`."""
+        transformer = FeatureTransformationManager.create_transformer(params['strategy'])
+        transformer.columns = list(params['columns'])
+        transformer.offset = np.asarray(params['offset'], dtype=float)
+        transformer.scale = np.asarray(params['scale'], dtype=float)
+        return transformer
+
+    def save(self, file_path: str) -> None:
+        """Salva i parametri appresi in un file JSON."""
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file)
+
+    @staticmethod
+    def load(file_path: str) -> 'FittedTransformer':
+        """Carica un trasformatore addestrato da un file JSON."""
+        with open(file_path, encoding='utf-8') as file:
+            return FittedTransformer.from_dict(json.load(file))
+
+
+def _blocco_float(data: pd.DataFrame):
+    """
+    Restituisce la matrice dei valori se tutte le colonne hanno lo stesso tipo float, altrimenti None.
+    Per un DataFrame formato da un unico blocco la matrice è una vista sul buffer, senza copie.
+    """
+    dtypes = set(data.dtypes)
+    if data.shape[1] == 0 or len(dtypes) != 1:
+        return None
+    dtype = dtypes.pop()
+    if not isinstance(dtype, np.dtype) or dtype.kind != 'f':
+        return None
+    return data.to_numpy()
+
+
+def _condivide_buffer(values: np.ndarray, data: pd.DataFrame) -> bool:
+    """Indica se `values` è una vista sul buffer di `data` (e non una copia consolidata)."""
+    return values.flags.writeable and np.may_share_memory(values, data.iloc[:, 0].to_numpy())
+
+
+class FittedNormalizer(FittedTransformer):
+    """
+    Normalizzazione [0,1] con minimo e massimo appresi in `fit`.
+    """
+
+    strategy = 'normalize'
+
+    def _fit_params(self, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        min_val = np.nanmin(values, axis=0)
+        return min_val, np.nanmax(values, axis=0) - min_val
+
+    def _params_from_statistics(self, stats: StreamingStatistics) -> tuple[np.ndarray, np.ndarray]:
+        return stats.min, stats.max - stats.min
+
+
+class FittedStandardizer(FittedTransformer):
+    """
+    Standardizzazione (mean=0, std=1) con media e deviazione standard apprese in `fit`.
+    """
+
+    strategy = 'standardize'
+
+    def _fit_params(self, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # ddof=1 come pandas.Series.std; le versioni nan-aware (che copiano la matrice) solo per le colonne con NaN
+        mean_val = values.mean(axis=0)
+        std_val = values.std(axis=0, ddof=1)
+        con_nan = np.isnan(mean_val)
+        if con_nan.any():
+            mean_val[con_nan] = np.nanmean(values[:, con_nan], axis=0)
+            std_val[con_nan] = np.nanstd(values[:, con_nan], axis=0, ddof=1)
+        return mean_val, std_val
+
+    def _params_from_statistics(self, stats: StreamingStatistics) -> tuple[np.ndarray, np.ndarray]:
+        return stats.mean, stats.std(ddof=1)
+
+
+class FittedRobustScaler(FittedTransformer):
+    """
+    Scaling robusto agli outlier: sottrae la mediana e divide per lo scarto interquartile (IQR).
+
+    In memoria i quantili sono calcolati per selezione (senza ordinare le colonne); con
+    `fit_from_statistics` vengono stimati dagli sketch KLL di `StreamingStatistics`
+    (creato con `quantile_k`), con errore di rango limitato e configurabile tramite k.
+    """
+
+    strategy = 'robust'
+
+    def _fit_params(self, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        q25, mediana, q75 = np.nanquantile(values, [0.25, 0.5, 0.75], axis=0)
+        return mediana, q75 - q25
+
+    def _params_from_statistics(self, stats: StreamingStatistics) -> tuple[np.ndarray, np.ndarray]:
+        return stats.quantile(0.5), stats.quantile(0.75) - stats.quantile(0.25)
+
+
+class Normalizer(FeatureTransformerInterface):
+    """
+    Applica una normalizzazione [0,1] alle colonne numeriche.
+    """
+
+    def transform(self, data: pd.DataFrame, skip_columns: list = None) -> pd.DataFrame:
+        return FittedNormalizer().fit_transform(data, skip_columns)
+
 
 class Standardizer(FeatureTransformerInterface):
     """
@@ -40,19 +253,16 @@ class Standardizer(FeatureTransformerInterface):
     """
 
     def transform(self, data: pd.DataFrame, skip_columns: list = None) -> pd.DataFrame:
-        if skip_columns is None:
-            skip_columns = []
+        return FittedStandardizer().fit_transform(data, skip_columns)
 
-        df = data.copy()
-        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        columns_to_scale = [col for col in numeric_cols if col not in skip_columns]
 
-        for col in columns_to_scale:
-            mean_val = df[col].mean()
-            std_val = df[col].std()
-            if std_val != 0:  # Evita divisione per zero
-                df[col] = (df[col] - mean_val) / std_val
-        return df
+class RobustScaler(FeatureTransformerInterface):
+    """
+    Applica uno scaling robusto (mediana=0, IQR=1) alle colonne numeriche.
+    """
+
+    def transform(self, data: pd.DataFrame, skip_columns: list = None) -> pd.DataFrame:
+        return FittedRobustScaler().fit_transform(data, skip_columns)
 
 
 class FeatureTransformationManager:
@@ -62,12 +272,18 @@ class FeatureTransformationManager:
     """
 
     @staticmethod
-    def apply_transformation(strategy: str, data: pd.DataFrame, skip_columns: list = None) -> pd.DataFrame:
+    def create_transformer(strategy: str) -> FittedTransformer:
+        """Crea un trasformatore con stato (da addestrare con `fit`) per la strategia indicata."""
         if strategy.lower() == 'normalize':
-            transformer = Normalizer()
+            return FittedNormalizer()
         elif strategy.lower() == 'standardize':
-            transformer = Standardizer()
+            return FittedStandardizer()
+        elif strategy.lower() == 'robust':
+            return FittedRobustScaler()
         else:
-            raise ValueError("Strategia non supportata. Usa 'normalize' o 'standardize'.")
+            raise ValueError("Strategia non supportata. Usa 'normalize', 'standardize' o 'robust'.")
 
-        return transformer.transform(data, skip_columns)
+    @staticmethod
+    def apply_transformation(strategy: str, data: pd.DataFrame, skip_columns: list = None, inplace: bool = False) -> pd.DataFrame:
+        transformer = FeatureTransformationManager.create_transformer(strategy)
+        return transformer.fit_transform(data, skip_columns, inplace=inplace)
@@ -1,5 +1,60 @@
+import json
+import numpy as np
 import pandas as pd
 from abc import ABC, abstractmethod
+from typing import Iterator
+
+
+class StreamingSchema:
+    """
+    Schema dichiarato per la lettura a blocchi: tipi delle feature, dell'etichetta e colonne da non leggere.
+    """
+
+    def __init__(self, target_col: str = 'classtype_v1', feature_dtype=np.float32, label_dtype=np.int8,
+                 id_columns: list = ('Sample code number',), skip_columns: list = None):
+        """
+        Args:
+            target_col (str): Colonna dell'etichetta; le righe senza etichetta vengono scartate.
+            feature_dtype: Tipo numerico delle feature (default float32).
+            label_dtype: Tipo intero dell'etichetta (default int8, sufficiente per le classi 2/4).
+            id_columns (list): Colonne identificative mantenute in float64 per non perdere precisione.
+            skip_columns (list, optional): Colonne da non leggere affatto.
+        """
+        self.target_col = target_col
+        self.feature_dtype = feature_dtype
+        self.label_dtype = label_dtype
+        self.id_columns = list(id_columns)
+        self.skip_columns = list(skip_columns) if skip_columns else []
+
+    def read_dtypes(self, columns) -> dict:
+        """
+        Tipi da dichiarare già in lettura per le colonne indicate, così i valori vengono letti
+        direttamente nel tipo compatto. L'etichetta viene letta come float (può mancare) e resa
+        intera da `coerce`; la colonna 'ID' mantiene il tipo dedotto.
+        """
+        return {col: (np.float64 if col in self.id_columns else self.feature_dtype)
+                for col in columns if col != 'ID'}
+
+    def coerce(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Converte un blocco nei tipi dichiarati. Le colonne già numeriche vengono solo convertite di tipo;
+        solo quelle lette come testo passano da `pd.to_numeric` (valori non interpretabili -> NaN).
+        """
+        colonne = {}
+        for col in chunk.columns:
+            serie = chunk[col]
+            if not pd.api.types.is_numeric_dtype(serie):
+                serie = pd.to_numeric(serie, errors='coerce')
+            dtype = np.float64 if col in self.id_columns else self.feature_dtype
+            colonne[col] = serie.astype(dtype, copy=False)
+
+        # Le righe senza etichetta vengono scartate, poi l'etichetta diventa un intero compatto
+        if self.target_col in colonne:
+            con_etichetta = colonne[self.target_col].notna().to_numpy()
+            if not con_etichetta.all():
+                colonne = {col: serie[con_etichetta] for col, serie in colonne.items()}
+            colonne[self.target_col] = colonne[self.target_col].astype(self.label_dtype)
+        return pd.DataFrame(colonne)
 
 
 class AbstractFileParser(ABC):
@@ -14,6 +69,66 @@ class AbstractFileParser(ABC):
         """
         pass
 
+    def parse_chunks(self, file_path: str, schema: StreamingSchema = None, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+        """
+        Legge il file a blocchi restituendo blocchi già convertiti secondo lo schema.
+        Di default legge l'intero file e lo restituisce come unico blocco; i formati testuali
+        delimitati ridefiniscono il metodo per leggere davvero a blocchi con memoria limitata.
+        """
+        schema = schema or StreamingSchema()
+        df = self.parse_file(file_path)
+        yield schema.coerce(df.drop(columns=schema.skip_columns, errors='ignore'))
+
+
+def _read_delimited_chunks(file_path: str, delimiter: str, schema: StreamingSchema, chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Legge un file delimitato a blocchi di `chunksize` righe, saltando le colonne ignorate,
+    rimuovendo i duplicati per 'ID' anche tra blocchi diversi e convertendo ogni blocco nei tipi dello schema.
+    """
+    if chunksize <= 0:
+        raise ValueError("Il chunksize deve essere un intero positivo")
+
+    schema = schema or StreamingSchema()
+    intestazione = pd.read_csv(file_path, delimiter=delimiter, nrows=0).columns
+    usecols = [col for col in intestazione if col not in schema.skip_columns]
+    # Tipi dichiarati in lettura: le colonne numeriche non passano da una copia intermedia float64
+    dtype = schema.read_dtypes(usecols)
+    id_visti = set()
+    lette = 0
+    while True:
+        ripresa = range(1, lette + 1) if lette else None
+        with pd.read_csv(file_path, delimiter=delimiter, usecols=usecols, dtype=dtype, skiprows=ripresa,
+                         chunksize=chunksize) as reader:
+            blocchi = iter(reader)
+            while True:
+                try:
+                    chunk = next(blocchi)
+                except StopIteration:
+                    return
+                except ValueError:
+                    # Valori non numerici nel blocco: le loro colonne vengono lette come testo (e convertite
+                    # da `coerce`) e la lettura riprende dallo stesso blocco
+                    testuali = [col for col in _colonne_testuali(file_path, delimiter, usecols, lette, chunksize) if col in dtype]
+                    if not testuali:
+                        raise
+                    dtype = {col: tipo for col, tipo in dtype.items() if col not in testuali}
+                    break
+
+                lette += len(chunk)
+                if 'ID' in chunk.columns:
+                    chunk = chunk.drop_duplicates(subset='ID')
+                    chunk = chunk[~chunk['ID'].isin(id_visti)]
+                    id_visti.update(chunk['ID'].tolist())
+                    chunk = chunk.set_index('ID')
+                yield schema.coerce(chunk)
+
+
+def _colonne_testuali(file_path: str, delimiter: str, usecols: list, lette: int, chunksize: int) -> list:
+    """Colonne non numeriche del blocco che inizia dopo `lette` righe di dati, letto senza tipi dichiarati."""
+    ripresa = range(1, lette + 1) if lette else None
+    blocco = pd.read_csv(file_path, delimiter=delimiter, usecols=usecols, skiprows=ripresa, nrows=chunksize)
+    return [col for col in blocco.columns if not pd.api.types.is_numeric_dtype(blocco[col])]
+
 
 class CSVFileParser(AbstractFileParser):
     """
@@ -27,18 +142,102 @@ class CSVFileParser(AbstractFileParser):
             df = df.drop_duplicates(subset='ID').set_index('ID')
         return df
 
+    def parse_chunks(self, file_path: str, schema: StreamingSchema = None, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+        print(f"[INFO] Streaming CSV: {file_path}")
+        return _read_delimited_chunks(file_path, ',', schema, chunksize)
+
 
 class ExcelFileParser(AbstractFileParser):
     """
     Parser per file Excel (XLSX).
+
+    `parse_chunks` legge il foglio riga per riga con openpyxl in modalità sola lettura, senza
+    costruire il modello dell'intera cartella di lavoro: la memoria resta limitata al blocco corrente.
     """
+
+    def __init__(self, sheet_name=0, columns: list = None, skip_columns: list = None):
+        """
+        Args:
+            sheet_name (int | str): Foglio da leggere (indice o nome, default il primo).
+            columns (list, optional): Colonne da leggere (default: tutte).
+            skip_columns (list, optional): Colonne da non leggere (es. 'Sample code number').
+        """
+        self.sheet_name = sheet_name
+        self.columns = list(columns) if columns else None
+        self.skip_columns = list(skip_columns) if skip_columns else []
+
     def parse_file(self, file_path: str) -> pd.DataFrame:
         print(f"[INFO] Parsing Excel: {file_path}")
-        df = pd.read_excel(file_path)
+        usecols = (lambda col: col not in self.skip_columns) if self.skip_columns else None
+        df = pd.read_excel(file_path, sheet_name=self.sheet_name, usecols=self.columns or usecols)
         if 'ID' in df.columns:
             df = df.drop_duplicates(subset='ID').set_index('ID')
         return df
 
+    def parse_chunks(self, file_path: str, schema: StreamingSchema = None, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+        if chunksize <= 0:
+            raise ValueError("Il chunksize deve essere un intero positivo")
+
+        schema = schema or StreamingSchema()
+        openpyxl = _import_openpyxl()
+        print(f"[INFO] Streaming Excel: {file_path}")
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            foglio = self._foglio(workbook)
+            # La dimensione salvata nel file può essere errata: si legge fino all'ultima riga effettiva
+            foglio.reset_dimensions()
+            righe = foglio.iter_rows(values_only=True)
+            intestazione = next(righe, None)
+            if intestazione is None:
+                return
+
+            nomi = [col for col in intestazione if col is not None and col not in schema.skip_columns]
+            nomi = self._projection(nomi)
+            posizioni = [intestazione.index(col) for col in nomi]
+            id_visti = set()
+            blocco = []
+            for riga in righe:
+                valori = [riga[i] if i < len(riga) else None for i in posizioni]
+                if all(valore is None for valore in valori):
+                    continue
+                blocco.append(valori)
+                if len(blocco) == chunksize:
+                    yield self._converti(blocco, nomi, schema, id_visti)
+                    blocco = []
+            if blocco:
+                yield self._converti(blocco, nomi, schema, id_visti)
+        finally:
+            # In sola lettura il file resta aperto finché la cartella di lavoro non viene chiusa
+            workbook.close()
+
+    def _foglio(self, workbook):
+        if isinstance(self.sheet_name, int):
+            if not 0 <= self.sheet_name < len(workbook.sheetnames):
+                raise ValueError(f"Foglio {self.sheet_name} non presente: il file ne contiene {len(workbook.sheetnames)}")
+            return workbook.worksheets[self.sheet_name]
+        if self.sheet_name not in workbook.sheetnames:
+            raise ValueError(f"Foglio '{self.sheet_name}' non presente. Fogli disponibili: {workbook.sheetnames}")
+        return workbook[self.sheet_name]
+
+    def _projection(self, nomi: list) -> list:
+        """Colonne effettivamente da leggere: quelle richieste, meno quelle da saltare."""
+        if self.columns is not None:
+            mancanti = [col for col in self.columns if col not in nomi]
+            if mancanti:
+                raise ValueError(f"Colonne non presenti nel file: {mancanti}")
+            nomi = self.columns
+        return [col for col in nomi if col not in self.skip_columns]
+
+    @staticmethod
+    def _converti(blocco: list, nomi: list, schema: StreamingSchema, id_visti: set) -> pd.DataFrame:
+        chunk = pd.DataFrame.from_records(blocco, columns=nomi)
+        if 'ID' in chunk.columns:
+            chunk = chunk.drop_duplicates(subset='ID')
+            chunk = chunk[~chunk['ID'].isin(id_visti)]
+            id_visti.update(chunk['ID'].tolist())
+            chunk = chunk.set_index('ID')
+        return schema.coerce(chunk)
+
 
 class JSONFileParser(AbstractFileParser):
     """
@@ -52,6 +251,97 @@ class JSONFileParser(AbstractFileParser):
         return df
 
 
+class NDJSONFileParser(AbstractFileParser):
+    """
+    Parser per file JSON Lines / NDJSON (un record JSON per riga), ad es. i log degli strumenti.
+
+    `parse_chunks` legge i record a blocchi limitati partendo da un offset in byte e aggiorna `offset`
+    alla fine dell'ultimo blocco restituito: con `read_new` si riprende da lì e si leggono solo i
+    record aggiunti nel frattempo, anche mentre il file è ancora in scrittura.
+    """
+
+    def __init__(self, skip_columns: list = None):
+        """
+        Args:
+            skip_columns (list, optional): Colonne da scartare dai record (es. 'Sample code number').
+        """
+        self.skip_columns = list(skip_columns) if skip_columns else []
+        self.offset = 0
+        self._id_visti = set()
+
+    def parse_file(self, file_path: str) -> pd.DataFrame:
+        print(f"[INFO] Parsing NDJSON: {file_path}")
+        df = pd.read_json(file_path, lines=True).drop(columns=self.skip_columns, errors='ignore')
+        if 'ID' in df.columns:
+            df = df.drop_duplicates(subset='ID').set_index('ID')
+        return df
+
+    def parse_chunks(self, file_path: str, schema: StreamingSchema = None, chunksize: int = 100_000,
+                     offset: int = 0) -> Iterator[pd.DataFrame]:
+        """
+        Legge i record a blocchi di al più `chunksize` righe a partire da `offset` (in byte).
+        Gli 'ID' già restituiti in precedenza vengono saltati; ripartendo da 0 la memoria degli 'ID' si azzera.
+        L'ultima riga senza terminatore viene letta solo se è già un record JSON completo.
+
+        Raises:
+            ValueError: Se il chunksize o l'offset non sono validi o una riga non è un oggetto JSON.
+        """
+        if chunksize <= 0:
+            raise ValueError("Il chunksize deve essere un intero positivo")
+        if offset < 0:
+            raise ValueError("L'offset deve essere un intero non negativo")
+
+        schema = schema or StreamingSchema()
+        if offset == 0:
+            self._id_visti = set()
+        print(f"[INFO] Streaming NDJSON: {file_path} (offset {offset})")
+        return self._leggi_record(file_path, schema, chunksize, offset)
+
+    def read_new(self, file_path: str, schema: StreamingSchema = None, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+        """Legge solo i record aggiunti dopo l'ultima lettura (riprende da `offset`)."""
+        return self.parse_chunks(file_path, schema=schema, chunksize=chunksize, offset=self.offset)
+
+    def _leggi_record(self, file_path: str, schema: StreamingSchema, chunksize: int, offset: int) -> Iterator[pd.DataFrame]:
+        ignorate = set(self.skip_columns) | set(schema.skip_columns)
+        record = []
+        with open(file_path, 'rb') as file:
+            file.seek(offset)
+            posizione = offset
+            for riga in iter(file.readline, b''):
+                completa = riga.endswith(b'\n')
+                if riga.strip():
+                    try:
+                        valore = json.loads(riga)
+                    except json.JSONDecodeError as e:
+                        if not completa:
+                            # Riga ancora in scrittura: verrà letta alla prossima ripresa
+                            break
+                        raise ValueError(f"Riga JSON non valida all'offset {posizione} di {file_path}") from e
+                    if not isinstance(valore, dict):
+                        raise ValueError(f"La riga all'offset {posizione} di {file_path} non è un oggetto JSON")
+                    record.append({col: v for col, v in valore.items() if col not in ignorate})
+                posizione += len(riga)
+
+                if len(record) == chunksize:
+                    # L'offset avanza insieme ai blocchi consegnati: interrompendo la lettura,
+                    # la ripresa parte dal primo record non ancora restituito
+                    self.offset = posizione
+                    yield self._converti(record, schema)
+                    record = []
+        self.offset = posizione
+        if record:
+            yield self._converti(record, schema)
+
+    def _converti(self, record: list, schema: StreamingSchema) -> pd.DataFrame:
+        chunk = pd.DataFrame.from_records(record)
+        if 'ID' in chunk.columns:
+            chunk = chunk.drop_duplicates(subset='ID')
+            chunk = chunk[~chunk['ID'].isin(self._id_visti)]
+            self._id_visti.update(chunk['ID'].tolist())
+            chunk = chunk.set_index('ID')
+        return schema.coerce(chunk)
+
+
 class TXTFileParser(AbstractFileParser):
     """
     Parser per file TXT (delimitato da virgole).
@@ -63,6 +353,10 @@ class TXTFileParser(AbstractFileParser):
             df = df.drop_duplicates(subset='ID').set_index('ID')
         return df
 
+    def parse_chunks(self, file_path: str, schema: StreamingSchema = None, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+        print(f"[INFO] Streaming TXT: {file_path}")
+        return _read_delimited_chunks(file_path, ',', schema, chunksize)
+
 
 class TSVFileParser(AbstractFileParser):
     """
@@ -75,27 +369,165 @@ class TSVFileParser(AbstractFileParser):
             df = df.drop_duplicates(subset='ID').set_index('ID')
         return df
 
+    def parse_chunks(self, file_path: str, schema: StreamingSchema = None, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+        print(f"[INFO] Streaming TSV: {file_path}")
+        return _read_delimited_chunks(file_path, '\t', schema, chunksize)
+
+
+class _ColumnarFileParser(AbstractFileParser):
+    """
+    Base per i formati colonnari (Parquet, Feather, Arrow IPC) letti tramite pyarrow.
+    Vengono lette solo le colonne necessarie e, dove possibile, il file viene mappato in memoria.
+    """
+    formato = None
+
+    def __init__(self, columns: list = None, skip_columns: list = None):
+        """
+        Args:
+            columns (list, optional): Colonne da leggere (default: tutte).
+            skip_columns (list, optional): Colonne da non leggere (es. 'Sample code number').
+        """
+        self.columns = list(columns) if columns else None
+        self.skip_columns = list(skip_columns) if skip_columns else []
+
+    def parse_file(self, file_path: str) -> pd.DataFrame:
+        print(f"[INFO] Parsing {self.formato}: {file_path}")
+        df = self._read_table(file_path, self._projection(self._column_names(file_path))).to_pandas()
+        if 'ID' in df.columns:
+            df = df.drop_duplicates(subset='ID').set_index('ID')
+        return df
+
+    def parse_chunks(self, file_path: str, schema: StreamingSchema = None, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+        if chunksize <= 0:
+            raise ValueError("Il chunksize deve essere un intero positivo")
+
+        schema = schema or StreamingSchema()
+        print(f"[INFO] Streaming {self.formato}: {file_path}")
+        nomi = [col for col in self._column_names(file_path) if col not in schema.skip_columns]
+        id_visti = set()
+        for batch in self._iter_batches(file_path, self._projection(nomi), chunksize):
+            chunk = batch.to_pandas()
+            if 'ID' in chunk.columns:
+                chunk = chunk.drop_duplicates(subset='ID')
+                chunk = chunk[~chunk['ID'].isin(id_visti)]
+                id_visti.update(chunk['ID'].tolist())
+                chunk = chunk.set_index('ID')
+            yield schema.coerce(chunk)
+
+    def _projection(self, nomi: list) -> list:
+        """Colonne effettivamente da leggere: quelle richieste, meno quelle da saltare."""
+        if self.columns is not None:
+            mancanti = [col for col in self.columns if col not in nomi]
+            if mancanti:
+                raise ValueError(f"Colonne non presenti nel file: {mancanti}")
+            nomi = self.columns
+        return [col for col in nomi if col not in self.skip_columns]
+
+    @abstractmethod
+    def _column_names(self, file_path: str) -> list:
+        """Nomi delle colonne del file, letti dai soli metadati."""
+        pass
+
+    @abstractmethod
+    def _read_table(self, file_path: str, columns: list):
+        """Tabella pyarrow con le sole colonne indicate."""
+        pass
+
+    def _iter_batches(self, file_path: str, columns: list, chunksize: int):
+        # Di default si legge la tabella proiettata e la si divide in batch (senza copie)
+        return self._read_table(file_path, columns).to_batches(max_chunksize=chunksize)
+
+
+class ParquetFileParser(_ColumnarFileParser):
+    """
+    Parser per file Parquet.
+    """
+    formato = "Parquet"
+
+    def _column_names(self, file_path: str) -> list:
+        pq = _import_pyarrow('parquet')
+        return pq.read_schema(file_path, memory_map=True).names
+
+    def _read_table(self, file_path: str, columns: list):
+        pq = _import_pyarrow('parquet')
+        return pq.read_table(file_path, columns=columns, memory_map=True)
+
+    def _iter_batches(self, file_path: str, columns: list, chunksize: int):
+        # I row group vengono letti uno alla volta: la memoria resta limitata al batch corrente
+        pq = _import_pyarrow('parquet')
+        return pq.ParquetFile(file_path, memory_map=True).iter_batches(batch_size=chunksize, columns=columns)
+
+
+class FeatherFileParser(_ColumnarFileParser):
+    """
+    Parser per file Feather e Arrow IPC (stesso formato su disco), letti con memory map.
+    """
+    formato = "Feather/Arrow"
+
+    def _column_names(self, file_path: str) -> list:
+        pa = _import_pyarrow()
+        with pa.memory_map(file_path) as source:
+            return pa.ipc.open_file(source).schema.names
+
+    def _read_table(self, file_path: str, columns: list):
+        feather = _import_pyarrow('feather')
+        return feather.read_table(file_path, columns=columns, memory_map=True)
+
+
+def _import_pyarrow(modulo: str = None):
+    """Importa pyarrow (dipendenza opzionale, necessaria solo per i formati colonnari)."""
+    try:
+        import pyarrow
+        if modulo == 'parquet':
+            import pyarrow.parquet as pq
+            return pq
+        if modulo == 'feather':
+            import pyarrow.feather as feather
+            return feather
+        import pyarrow.ipc
+        return pyarrow
+    except ImportError as e:
+        raise ImportError("Per leggere file Parquet/Feather/Arrow è necessario installare 'pyarrow'.") from e
+
+
+def _import_openpyxl():
+    """Importa openpyxl (necessario per la lettura a blocchi dei file Excel)."""
+    try:
+        import openpyxl
+        return openpyxl
+    except ImportError as e:
+        raise ImportError("Per leggere file Excel a blocchi è necessario installare 'openpyxl'.") from e
+
 
 class ParserDispatcher:
     """
     Factory/Dispatcher per restituire il parser adeguato a seconda del formato del file.
     """
 
+    SUPPORTED_EXTENSIONS = ('.csv', '.xlsx', '.json', '.jsonl', '.ndjson', '.txt', '.tsv', '.parquet', '.feather', '.arrow', '.ipc')
+
     @staticmethod
-    def get_parser(file_path: str) -> AbstractFileParser:
+    def get_parser(file_path: str, skip_columns: list = None) -> AbstractFileParser:
         """
         Restituisce un oggetto parser specifico basato sull'estensione del file.
+        Per i formati colonnari e per Excel, `skip_columns` indica le colonne da non leggere affatto.
         """
         file_path_lower = file_path.lower()
         if file_path_lower.endswith(".csv"):
             return CSVFileParser()
         elif file_path_lower.endswith(".xlsx"):
-            return ExcelFileParser()
+            return ExcelFileParser(skip_columns=skip_columns)
+        elif file_path_lower.endswith((".jsonl", ".ndjson")):
+            return NDJSONFileParser(skip_columns=skip_columns)
         elif file_path_lower.endswith(".json"):
             return JSONFileParser()
         elif file_path_lower.endswith(".txt"):
             return TXTFileParser()
         elif file_path_lower.endswith(".tsv"):
             return TSVFileParser()
+        elif file_path_lower.endswith(".parquet"):
+            return ParquetFileParser(skip_columns=skip_columns)
+        elif file_path_lower.endswith((".feather", ".arrow", ".ipc")):
+            return FeatherFileParser(skip_columns=skip_columns)
         else:
             raise ValueError(f"Formato file non riconosciuto: {file_path}")
@@ -12,12 +12,52 @@ class MissingDataHandler:
         Converte tutte le colonne che possono essere interpretate come numeriche in float,
         sostituendo i valori non validi con NaN.
         """
-        converted_df = df.copy()
-        for col in converted_df.columns:
-            # Convertiamo forzatamente in float (coerce -> NaN se non convertibile)
-            converted_series = pd.to_numeric(converted_df[col], errors='coerce')
-            converted_df[col] = converted_series.astype(float)
-        return converted_df
+        return MissingDataHandler.clean_numeric(df)[0]
+
+    @staticmethod
+    def clean_numeric(df: pd.DataFrame, target_col: str = None) -> tuple[pd.DataFrame, pd.Series]:
+        """
+        Pulizia in un solo passaggio: converte tutte le colonne in un unico blocco float (una sola
+        allocazione, riempita colonna per colonna) ed elimina nello stesso passaggio le righe
+        con target mancante o non numerico.
+
+        Il blocco è float32 se tutte le colonne sono già float32 o interi piccoli (es. dati letti a blocchi
+        con uno schema), altrimenti float64.
+
+        Args:
+            df (pd.DataFrame): Dati da convertire.
+            target_col (str, optional): Colonna target; se presente, le righe senza target vengono eliminate.
+
+        Returns:
+            tuple[pd.DataFrame, pd.Series]: Dati convertiti e, per ogni colonna, il numero di valori
+            non numerici convertiti in NaN.
+        """
+        tipi = [dtype for dtype in df.dtypes if isinstance(dtype, np.dtype) and dtype.kind in 'biuf']
+        dtype = np.result_type(np.float32, *tipi) if len(tipi) == df.shape[1] else np.dtype(np.float64)
+
+        def converti(col: pd.Series) -> np.ndarray:
+            if col.dtype.kind != 'f':
+                col = pd.to_numeric(col, errors='coerce')
+            return col.to_numpy(dtype=dtype, na_value=np.nan)
+
+        # Righe da tenere: il target viene convertito per primo, così il blocco nasce già filtrato
+        tieni = None
+        if target_col is not None and target_col in df.columns:
+            tieni = ~np.isnan(converti(df[target_col]))
+
+        n_righe = len(df) if tieni is None else int(tieni.sum())
+        # Ordine Fortran: ogni colonna è contigua e diventa il blocco interno del DataFrame senza copie
+        blocco = np.empty((n_righe, df.shape[1]), dtype=dtype, order='F')
+        convertiti = np.zeros(df.shape[1], dtype=np.int64)
+        for j in range(df.shape[1]):
+            originale = df.iloc[:, j]
+            valori = converti(originale)
+            convertiti[j] = np.count_nonzero(np.isnan(valori) & originale.notna().to_numpy())
+            blocco[:, j] = valori if tieni is None else valori[tieni]
+
+        index = df.index if tieni is None else df.index[tieni]
+        return (pd.DataFrame(blocco, index=index, columns=df.columns, copy=False),
+                pd.Series(convertiti, index=df.columns, name='convertiti'))
 
     @staticmethod
     def drop_rows_with_missing_target(df: pd.DataFrame, target_col: str = 'target_class') -> pd.DataFrame:
@@ -59,6 +99,78 @@ class MissingDataHandler:
         mode_values = df.mode(dropna=True).iloc[0]
         return df.fillna(mode_values)
 
+    @staticmethod
+    def fill_missing_with_knn(df: pd.DataFrame, n_neighbors: int = 5, exclude_columns: list = None,
+                              block_size: int = 256) -> pd.DataFrame:
+        """
+        Riempie ogni valore mancante con la media dei k vicini più prossimi tra le righe complete.
+
+        La distanza di una riga incompleta da ciascuna riga completa è calcolata solo sulle feature
+        che la riga possiede, dopo averle standardizzate con media e deviazione standard delle righe
+        complete: così una colonna con valori grandi non domina le altre. I valori imputati restano
+        nelle unità originali. Tutte le righe incomplete di un blocco vengono elaborate insieme con
+        un prodotto matriciale: sum_j m_j * (x_j - d_j)^2 = (m*x^2)·1 - 2 (m*x)·d + m·d^2,
+        dove m è la maschera dei valori presenti. Le righe senza alcuna feature presente ricevono
+        la media delle righe complete.
+
+        Args:
+            df (pd.DataFrame): Dati numerici con valori mancanti.
+            n_neighbors (int): Numero di vicini da cui ricavare ogni valore.
+            exclude_columns (list, optional): Colonne da non usare né imputare (ad es. il target e
+                gli identificativi come 'Sample code number').
+            block_size (int): Righe incomplete elaborate per blocco (limita la memoria usata).
+
+        Raises:
+            ValueError: Se `n_neighbors` o `block_size` non sono positivi.
+        """
+        if n_neighbors <= 0 or block_size <= 0:
+            raise ValueError("n_neighbors e block_size devono essere interi positivi")
+        if exclude_columns is None:
+            exclude_columns = []
+
+        colonne = [col for col in df.select_dtypes(include=[np.number]).columns if col not in exclude_columns]
+        X = df[colonne].to_numpy(dtype=float, copy=True)
+        mancanti = np.isnan(X)
+        incomplete = np.flatnonzero(mancanti.any(axis=1))
+        if len(incomplete) == 0:
+            return df
+
+        donatori = X[~mancanti.any(axis=1)]
+        if len(donatori) == 0:
+            print("[INFO] Nessuna riga completa per l'imputazione KNN: uso la media delle colonne.")
+            return df.fillna(df[colonne].mean())
+
+        k = min(n_neighbors, len(donatori))
+        media_donatori = donatori.mean(axis=0)
+        # Standardizzazione usata solo per le distanze (colonne costanti lasciate con scala 1)
+        scala = donatori.std(axis=0)
+        scala[scala == 0] = 1.0
+        donatori_std = (donatori - media_donatori) / scala
+        # [d^2, d] affiancati: le distanze di un blocco diventano un unico prodotto matriciale
+        donatori_estesi = np.hstack([donatori_std ** 2, donatori_std]).T.copy()
+        # Il blocco si riduce quando i donatori sono molti, così la matrice delle distanze resta entro ~32 MB
+        righe_blocco = max(1, min(block_size, (1 << 22) // len(donatori)))
+        distanze = np.empty((righe_blocco, len(donatori)))
+
+        for start in range(0, len(incomplete), righe_blocco):
+            righe = incomplete[start:start + righe_blocco]
+            blocco = X[righe]
+            presenti = ~mancanti[righe]
+
+            # Distanze quadratiche parziali (solo sulle feature presenti), a meno del termine (m*x^2)·1
+            # che è costante su ogni riga e quindi non cambia l'ordine dei vicini
+            query = np.hstack([presenti, -2.0 * np.where(presenti, (blocco - media_donatori) / scala, 0.0)])
+            d = np.matmul(query, donatori_estesi, out=distanze[:len(righe)])
+            vicini = np.argpartition(d, k - 1, axis=1)[:, :k]
+            stime = donatori[vicini].mean(axis=1)
+            stime[~presenti.any(axis=1)] = media_donatori
+
+            X[righe] = np.where(presenti, blocco, stime)
+
+        risultato = df.copy()
+        risultato[colonne] = X
+        return risultato
+
     @staticmethod
     def fill_missing_ffill(df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -74,20 +186,32 @@ class MissingDataStrategyManager:
     """
 
     @staticmethod
-    def handle_missing_data(strategy: str, data: pd.DataFrame, target_col: str = 'target_class') -> pd.DataFrame:
+    def handle_missing_data(strategy: str, data: pd.DataFrame, target_col: str = 'target_class',
+                            return_counts: bool = False, exclude_columns: list = None):
         """
         Parametri:
-            - strategy: stringa che indica la strategia ('remove', 'mean', 'median', 'mode', 'ffill').
+            - strategy: stringa che indica la strategia ('remove', 'mean', 'median', 'mode', 'ffill', 'knn', 'keep').
             - data: DataFrame Pandas da processare.
             - target_col: eventuale colonna target che NON deve presentare valori mancanti.
+            - return_counts: se True restituisce anche, per colonna, il numero di valori non numerici convertiti in NaN.
+            - exclude_columns: colonne identificative da non usare né imputare con la strategia 'knn'.
         """
-        # Prima convertiamo tutte le colonne in numeriche (se possibile)
-        df = MissingDataHandler.convert_numerical_values(data)
-
-        # Eliminiamo righe con target mancante (se c'è la colonna)
-        df = MissingDataHandler.drop_rows_with_missing_target(df, target_col)
+        # Convertiamo tutte le colonne in numeriche ed eliminiamo le righe con target mancante in un solo passaggio
+        df, convertiti = MissingDataHandler.clean_numeric(data, target_col)
 
         # Applichiamo la strategia di cleaning specificata
+        df = MissingDataStrategyManager.apply_strategy(strategy, df, target_col, exclude_columns)
+        return (df, convertiti) if return_counts else df
+
+    @staticmethod
+    def apply_strategy(strategy: str, df: pd.DataFrame, target_col: str = 'target_class',
+                       exclude_columns: list = None) -> pd.DataFrame:
+        """
+        Applica la sola strategia di gestione dei valori mancanti a dati già convertiti in numeri
+        (ad es. con `MissingDataHandler.clean_numeric`).
+
+        `exclude_columns` elenca le colonne (ID, chiavi) che la strategia 'knn' non deve usare né imputare.
+        """
         strategy = strategy.lower()
         if strategy == 'remove':
             df = MissingDataHandler.remove_any_missing(df)
@@ -99,8 +223,15 @@ class MissingDataStrategyManager:
             df = MissingDataHandler.fill_missing_with_mode(df)
         elif strategy == 'ffill':
             df = MissingDataHandler.fill_missing_ffill(df)
+        elif strategy == 'keep':
+            # Nessuna imputazione: i NaN restano e le distanze del KNN diventano parziali
+            pass
+        elif strategy == 'knn':
+            # Target e identificativi non partecipano alle distanze: le feature vengono stimate solo dalle altre feature
+            escluse = [target_col] + list(exclude_columns or [])
+            df = MissingDataHandler.fill_missing_with_knn(df, exclude_columns=escluse)
         else:
-            raise ValueError("Strategia non valida. Scegli tra: 'remove', 'mean', 'median', 'mode', 'ffill'.")
+            raise ValueError("Strategia non valida. Scegli tra: 'remove', 'mean', 'median', 'mode', 'ffill', 'knn', 'keep'.")
 
         return df
 
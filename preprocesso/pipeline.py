@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import random
+import numpy as np
+import pandas as pd
+from .file_parser import ParserDispatcher, StreamingSchema
+from .missing_data_manager import MissingDataHandler, MissingDataStrategyManager
+from .feature_transformer import FeatureTransformationManager
+from .stage_cache import StageCache
+from .profiling import DatasetProfiler
+from .feature_selection import FeatureSelector
+from .dimensionality_reduction import DimensionalityReductionManager
+
+
+class PreprocessingPipeline:
+    """
+    Pipeline dichiarativa e pigra del preprocessing: parse -> coerce -> impute -> scale -> select -> split.
+
+    Le fasi vengono eseguite solo quando se ne richiede l'output con `output`. L'impronta (fingerprint)
+    di ogni fase combina l'impronta della fase precedente con i parametri della fase stessa: se cambia
+    un'opzione, cambiano le impronte di quella fase e delle successive, mentre le fasi precedenti
+    vengono recuperate da `StageCache` senza essere rieseguite.
+    """
+
+    STAGES = ('parse', 'coerce', 'impute', 'scale', 'select', 'split')
+
+    # Parametri da cui dipende l'output di ciascuna fase (oltre all'output della fase precedente)
+    STAGE_PARAMS = {
+        'parse': ('file_path', 'chunksize', 'ignored_columns'),
+        'coerce': ('target_col',),
+        'impute': ('missing_strategy', 'ignored_columns'),
+        'scale': ('scaling_strategy',),
+        'select': ('feature_columns', 'feature_selection', 'reduction', 'n_components'),
+        'split': ('validation_strategy', 'random_state'),
+    }
+
+    def __init__(self, file_path: str, missing_strategy: str = 'remove', scaling_strategy: str = 'normalize',
+                 target_col: str = 'classtype_v1', ignored_columns: list = ('Sample code number', 'classtype_v1'),
+                 feature_columns: list = None, feature_selection: str = None, reduction: str = None,
+                 n_components=None, validation_strategy=None, random_state: int = None,
+                 chunksize: int = None, cache: StageCache = None):
+        """
+        Args:
+            file_path (str): Percorso del dataset.
+            missing_strategy (str): Strategia per i valori mancanti (vedi `MissingDataStrategyManager`).
+            scaling_strategy (str): Strategia di scaling (vedi `FeatureTransformationManager`).
+            target_col (str): Colonna delle etichette.
+            ignored_columns (list): Colonne escluse dalle feature (l'etichetta compresa).
+            feature_columns (list, optional): Sottoinsieme di feature da selezionare (None = tutte).
+            feature_selection (str, optional): 'forward' o 'backward' per scegliere le feature con
+                `FeatureSelector` (dopo l'eventuale `feature_columns`); None = nessuna selezione.
+                La selezione usa le etichette: nella fase 'select' è addestrata su tutto il dataset
+                e serve solo per l'esplorazione; per la validazione si usa `fold`, che la addestra
+                sul solo training set di ogni split.
+            reduction (str, optional): 'pca' o 'random_projection' per ridurre le feature selezionate
+                (vedi `DimensionalityReductionManager`); None = nessuna riduzione.
+            n_components (int | float, optional): Dimensioni ridotte (per 'pca' anche frazione di varianza).
+            validation_strategy (ValidationProcess, optional): Strategia usata dalla fase 'split'.
+            random_state (int, optional): Seme per rendere riproducibili gli split.
+            chunksize (int, optional): Se indicato, il file viene letto a blocchi con tipi compatti.
+            cache (StageCache, optional): Cache delle fasi, condivisibile tra più pipeline.
+        """
+        self.params = {}
+        self.cache = cache if cache is not None else StageCache()
+        self.eseguite = []
+        self.set(file_path=file_path, missing_strategy=missing_strategy, scaling_strategy=scaling_strategy,
+                 target_col=target_col, ignored_columns=ignored_columns, feature_columns=feature_columns,
+                 feature_selection=feature_selection, reduction=reduction, n_components=n_components,
+                 validation_strategy=validation_strategy, random_state=random_state, chunksize=chunksize)
+
+    def set(self, **params) -> 'PreprocessingPipeline':
+        """
+        Modifica una o più opzioni. Nessuna fase viene eseguita: le fasi interessate
+        (e le successive) verranno ricalcolate alla prossima richiesta di output.
+
+        Raises:
+            ValueError: Se un'opzione non appartiene ad alcuna fase.
+        """
+        validi = {nome for nomi in self.STAGE_PARAMS.values() for nome in nomi}
+        sconosciuti = set(params) - validi
+        if sconosciuti:
+            raise ValueError(f"Opzioni non riconosciute: {sorted(sconosciuti)}")
+
+        for nome, valore in params.items():
+            self.params[nome] = tuple(valore) if isinstance(valore, list) else valore
+        return self
+
+    def fingerprint(self, stage: str) -> str:
+        """
+        Impronta di una fase: hash dell'impronta precedente e dei parametri della fase.
+        Per 'parse' include anche dimensione e data di modifica del file, così un file modificato
+        invalida l'intera catena.
+        """
+        posizione = self._posizione(stage)
+        precedente = self.fingerprint(self.STAGES[posizione - 1]) if posizione > 0 else ''
+
+        parametri = [(nome, self._descrivi(self.params[nome])) for nome in self.STAGE_PARAMS[stage]]
+        if stage == 'parse':
+            stat = os.stat(self.params['file_path'])
+            parametri.append(('file', (stat.st_size, stat.st_mtime_ns)))
+
+        digest = hashlib.sha256(f"{precedente}|{stage}|{parametri!r}".encode())
+        return digest.hexdigest()[:16]
+
+    def output(self, stage: str = 'select'):
+        """
+        Restituisce l'output di una fase, eseguendo solo le fasi non presenti in cache.
+        Le fasi effettivamente eseguite sono elencate in `eseguite`.
+
+        Returns:
+            parse/coerce/impute: pd.DataFrame; scale: (pd.DataFrame, FittedTransformer);
+            select: (features, labels); split: lista di (train_idx, test_idx).
+
+        Raises:
+            ValueError: Se la fase non esiste o manca la strategia di validazione per 'split'.
+        """
+        self._posizione(stage)
+        self.eseguite = []
+        return self._calcola(stage)
+
+    def profile(self, report_path: str = None) -> dict:
+        """
+        Profilo del dataset letto (output della fase 'parse'), calcolato una sola volta per impronta.
+        Con `report_path` viene anche salvato in formato JSON.
+        """
+        self.eseguite = []
+
+        def compute():
+            self.eseguite.append('profile')
+            return DatasetProfiler().update(self._calcola('parse')).report()
+
+        report = self.cache.get_or_compute('profile', (self.fingerprint('parse'),), compute)
+        if report_path:
+            with open(report_path, 'w', encoding='utf-8') as file:
+                json.dump(report, file, indent=2, ensure_ascii=False)
+        return report
+
+    def _calcola(self, stage: str):
+        posizione = self._posizione(stage)
+
+        def compute():
+            ingresso = self._calcola(self.STAGES[posizione - 1]) if posizione > 0 else None
+            self.eseguite.append(stage)
+            return getattr(self, f'_{stage}')(ingresso)
+
+        return self.cache.get_or_compute(stage, (self.fingerprint(stage),), compute)
+
+    def _parse(self, _):
+        file_path = self.params['file_path']
+        skip_columns = [col for col in self.params['ignored_columns'] if col != self.params['target_col']]
+        parser = ParserDispatcher.get_parser(file_path, skip_columns=skip_columns)
+        if self.params['chunksize']:
+            schema = StreamingSchema(target_col=self.params['target_col'])
+            chunks = list(parser.parse_chunks(file_path, schema=schema, chunksize=self.params['chunksize']))
+            return pd.concat(chunks) if chunks else pd.DataFrame()
+        return parser.parse_file(file_path)
+
+    def _coerce(self, raw: pd.DataFrame) -> pd.DataFrame:
+        return MissingDataHandler.clean_numeric(raw, self.params['target_col'])[0]
+
+    def _impute(self, coerced: pd.DataFrame) -> pd.DataFrame:
+        return MissingDataStrategyManager.apply_strategy(self.params['missing_strategy'], coerced, self.params['target_col'],
+                                                         list(self.params['ignored_columns']))
+
+    def _scale(self, imputed: pd.DataFrame):
+        # Niente scaling in place: l'output della fase precedente resta valido nella cache
+        scaler = FeatureTransformationManager.create_transformer(self.params['scaling_strategy'])
+        return scaler.fit_transform(imputed, skip_columns=list(self.params['ignored_columns'])), scaler
+
+    def fold(self, train_idx, test_idx) -> tuple[pd.DataFrame, pd.Series, pd.DataFrame, pd.Series]:
+        """
+        Feature ed etichette di uno split (ad es. da `output('split')`) senza fughe di informazione:
+        selezione delle feature e riduzione vengono addestrate sulle sole righe di training e poi
+        applicate a quelle di test.
+
+        Args:
+            train_idx, test_idx: Indici posizionali delle righe di training e di test.
+
+        Returns:
+            tuple: (feature di training, etichette di training, feature di test, etichette di test).
+        """
+        self.eseguite = []
+        features, labels = self._feature_base(self._calcola('scale')[0])
+        train, test = features.iloc[train_idx], features.iloc[test_idx]
+        train, test = self._seleziona(train, labels.iloc[train_idx], test)
+        return train, labels.iloc[train_idx], test, labels.iloc[test_idx]
+
+    def _feature_base(self, data: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
+        target_col = self.params['target_col']
+        if target_col not in data.columns:
+            raise ValueError(f"La colonna delle etichette '{target_col}' non è presente nel dataset.")
+
+        features = data.drop(columns=list(self.params['ignored_columns']), errors='ignore')
+        if self.params['feature_columns'] is not None:
+            features = features[list(self.params['feature_columns'])]
+        return features, data[target_col]
+
+    def _seleziona(self, features: pd.DataFrame, labels: pd.Series, query: pd.DataFrame = None):
+        """Addestra selezione e riduzione su `features` e le applica anche a `query`, se indicato."""
+        if self.params['feature_selection'] is not None:
+            # Seme fisso: l'output della fase deve dipendere solo dai suoi parametri
+            selector = FeatureSelector(direction=self.params['feature_selection'], random_state=0).fit(features, labels)
+            features = selector.transform(features)
+            query = selector.transform(query) if query is not None else None
+        if self.params['reduction'] is not None:
+            reducer = DimensionalityReductionManager.create_reducer(
+                self.params['reduction'], self.params['n_components'], random_state=0
+            ).fit(features)
+            features = reducer.transform(features)
+            query = reducer.transform(query) if query is not None else None
+        return features, query
+
+    def _select(self, scaled):
+        features, labels = self._feature_base(scaled[0])
+        if self.params['feature_selection'] is not None:
+            print("[INFO] Selezione delle feature addestrata su tutte le etichette: output esplorativo, "
+                  "per la validazione usa `fold` sugli split.")
+        return self._seleziona(features, labels)[0], labels
+
+    def _split(self, selected):
+        strategy = self.params['validation_strategy']
+        if strategy is None:
+            raise ValueError("Serve una strategia di validazione per la fase 'split'")
+        if self.params['random_state'] is not None:
+            np.random.seed(self.params['random_state'])
+            random.seed(self.params['random_state'])
+        features, labels = selected
+        return strategy.generate_splits(features, labels)
+
+    def _posizione(self, stage: str) -> int:
+        if stage not in self.STAGES:
+            raise ValueError(f"Fase sconosciuta: '{stage}'. Fasi disponibili: {', '.join(self.STAGES)}")
+        return self.STAGES.index(stage)
+
+    @staticmethod
+    def _descrivi(valore):
+        # Le strategie di validazione sono descritte da classe e attributi, così due istanze equivalenti coincidono
+        if hasattr(valore, '__dict__') and not isinstance(valore, type):
+            return (valore.__class__.__name__, sorted((k, repr(v)) for k, v in vars(valore).items()))
+        return valore
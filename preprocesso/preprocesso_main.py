@@ -1,24 +1,45 @@
+import os
 import pandas as pd
-from .file_parser import ParserDispatcher
-from .missing_data_manager import MissingDataStrategyManager, MissingDataHandler
+from .file_parser import ParserDispatcher, StreamingSchema
+from .missing_data_manager import MissingDataStrategyManager
 from .feature_transformer import FeatureTransformationManager
+from .sharded_loader import ShardedDatasetLoader
+from .profiling import DatasetProfiler
 
 
 class DataPreprocessor:
-    def __init__(self, file_path):
+    def __init__(self, file_path, chunksize=None, report_path=None, deduplicator=None):
         self.file_path = file_path
+        self.chunksize = chunksize  # Se indicato, il file viene letto a blocchi con tipi compatti
+        self.report_path = report_path  # Se indicato, il profilo del dataset viene salvato in JSON
+        self.deduplicator = deduplicator  # StreamingDeduplicator: rimuove le righe già viste, anche in ingestioni precedenti
+        self.profile = None
         self.data = pd.DataFrame()
         self.scaled_data = pd.DataFrame()
         self.labels = None
         self.features = None
+        self.scaler = None
         self.ignored_columns = ['Sample code number', 'classtype_v1']
         self.kind_cell_column = 'classtype_v1'
 
     def load_data(self):
         """Carica i dati dal file specificato."""
         try:
-            parser = ParserDispatcher.get_parser(self.file_path)
-            self.data = parser.parse_file(self.file_path)  # Lettura del file
+            # Le colonne ignorate (tranne l'etichetta e la chiave di de-duplicazione) non vengono lette dai formati colonnari
+            chiave = (self.deduplicator.key or []) if self.deduplicator is not None else []
+            skip_columns = [col for col in self.ignored_columns if col != self.kind_cell_column and col not in chiave]
+            if os.path.isdir(self.file_path) or any(c in self.file_path for c in '*?['):
+                # Dataset suddiviso in più file: shard letti in parallelo con uno schema condiviso
+                schema = StreamingSchema(target_col=self.kind_cell_column, skip_columns=skip_columns)
+                self.data = self._deduplica([ShardedDatasetLoader(schema=schema).load(self.file_path)])
+            elif self.chunksize:
+                parser = ParserDispatcher.get_parser(self.file_path, skip_columns=skip_columns)
+                # Lettura a blocchi: ogni blocco arriva già convertito (feature float32, etichetta intera)
+                schema = StreamingSchema(target_col=self.kind_cell_column, skip_columns=skip_columns)
+                self.data = self._deduplica(parser.parse_chunks(self.file_path, schema=schema, chunksize=self.chunksize))
+            else:
+                parser = ParserDispatcher.get_parser(self.file_path, skip_columns=skip_columns)
+                self.data = self._deduplica([parser.parse_file(self.file_path)])  # Lettura del file
         except Exception as e:
             print(f"Errore durante la lettura del file: {e}. Verrà utilizzato un dataset vuoto.")
             self.data = pd.DataFrame()
@@ -29,18 +50,45 @@ class DataPreprocessor:
 
         print("Dati iniziali:")
         print(self.data.head())  # Mostra le prime righe per verifica
+        self.profile_data()
         return True  # Indica che il caricamento è riuscito
 
-    def handle_missing_values(self):
-        """Gestisce i valori mancanti in base alla scelta dell'utente."""
+    def _deduplica(self, chunks):
+        """
+        Unisce i blocchi letti, rimuovendo in streaming le righe già viste se è presente un deduplicatore.
+        Le chiavi nuove vengono salvate solo da `commit_deduplication`, a preprocessing riuscito.
+        """
+        if self.deduplicator is not None:
+            chunks = self.deduplicator.filter_chunks(chunks, save=False)
+        chunks = list(chunks)
+        if self.deduplicator is not None and self.deduplicator.duplicati_rimossi:
+            print(f"[INFO] Righe duplicate rimosse: {self.deduplicator.duplicati_rimossi}")
+        if not chunks:
+            return pd.DataFrame()
+        return chunks[0] if len(chunks) == 1 else pd.concat(chunks)
+
+    def profile_data(self):
+        """Mostra (e salva in JSON, se richiesto) il profilo del dataset, utile per scegliere la strategia dei valori mancanti."""
+        try:
+            self.profile = DatasetProfiler().update(self.data)
+            print(f"[INFO] Profilo del dataset ({self.profile.n_righe} righe, "
+                  f"{self.profile.righe_duplicate} duplicate):")
+            print(self.profile.to_frame())
+            if self.report_path:
+                self.profile.save(self.report_path)
+        except Exception as e:
+            print(f"Errore durante il profiling del dataset: {e}. Procedo senza profilo.")
+
+    def ask_missing_strategy(self):
+        """Chiede all'utente la strategia di gestione dei valori mancanti."""
         print("Come vuoi gestire i valori mancanti?")
-        print("Hai quattro possibilità: remove | mode | mean | median")
+        print("Hai sei possibilità: remove | mode | mean | median | knn | keep")
         attempts = 0
         max_attempts = 2
 
         while attempts < max_attempts:
             missing_strategy = input("Inserisci la tua scelta ").strip().lower()
-            if missing_strategy in ['remove', 'mode', 'mean', 'median']:
+            if missing_strategy in ['remove', 'mode', 'mean', 'median', 'knn', 'keep']:
                 print(f"Hai scelto: {missing_strategy}")
                 break
             attempts += 1
@@ -51,22 +99,32 @@ class DataPreprocessor:
             print("Hai superato il numero massimo di tentativi. Verrà usata la strategia 'remove' per default.")
             missing_strategy = 'remove'
 
+        return missing_strategy
+
+    def handle_missing_values(self, missing_strategy=None):
+        """Gestisce i valori mancanti in base alla scelta dell'utente (richiesta se non indicata)."""
+        if missing_strategy is None:
+            missing_strategy = self.ask_missing_strategy()
+
         try:
-            handler = MissingDataHandler()
-            self.data = handler.drop_rows_with_missing_target(self.data, target_col='classtype_v1')
-            self.data = MissingDataStrategyManager.handle_missing_data(strategy=missing_strategy, data=self.data)
+            self.data, convertiti = MissingDataStrategyManager.handle_missing_data(
+                strategy=missing_strategy, data=self.data, target_col=self.kind_cell_column, return_counts=True,
+                exclude_columns=self.ignored_columns
+            )
+            if convertiti.any():
+                print(f"[INFO] Valori non numerici convertiti in NaN: {convertiti[convertiti > 0].to_dict()}")
         except Exception as e:
             print(f"Errore durante la gestione dei valori mancanti: {e}. Procedo con i dati originali.")
 
-    def apply_feature_scaling(self):
-        """Applica la normalizzazione o la standardizzazione ai dati."""
-        print("Come vuoi svolgere lo scaling delle feature: normalize | standardize?")
+    def ask_scaling_strategy(self):
+        """Chiede all'utente la strategia di scaling delle feature."""
+        print("Come vuoi svolgere lo scaling delle feature: normalize | standardize | robust?")
         attempts = 0
         max_attempts = 2
 
         while attempts < max_attempts:
             feature_scaling = input("Inserisci la tua scelta ").strip().lower()
-            if feature_scaling in ['standardize', 'normalize']:
+            if feature_scaling in ['standardize', 'normalize', 'robust']:
                 scaling_strategy = feature_scaling
                 print(f"Hai scelto: {scaling_strategy}")
                 break
@@ -78,10 +136,18 @@ class DataPreprocessor:
             print("Hai superato il numero massimo di tentativi. Verrà usata la strategia 'normalize' per default.")
             scaling_strategy = 'normalize'
 
+        return scaling_strategy
+
+    def apply_feature_scaling(self, scaling_strategy=None):
+        """Applica la normalizzazione o la standardizzazione ai dati (strategia richiesta se non indicata)."""
+        if scaling_strategy is None:
+            scaling_strategy = self.ask_scaling_strategy()
+
         try:
-            self.scaled_data = FeatureTransformationManager.apply_transformation(
-                strategy=scaling_strategy, data=self.data, skip_columns=self.ignored_columns
-            )
+            # Il trasformatore addestrato resta disponibile per scalare nuovi campioni con gli stessi parametri
+            self.scaler = FeatureTransformationManager.create_transformer(scaling_strategy)
+            # self.data è già una copia pulita e non serve più non scalata: lo scaling avviene sul suo buffer
+            self.scaled_data = self.scaler.fit_transform(self.data, skip_columns=self.ignored_columns, inplace=True)
         except Exception as e:
             print(f"Errore durante lo scaling delle feature: {e}. Utilizzo dei dati senza scaling.")
             self.scaled_data = self.data
@@ -103,15 +169,56 @@ class DataPreprocessor:
             
         return True, self.features, self.labels, self.scaled_data  # Aggiunto scaled_data
 
-
-def preprocess_data(file_path):
-    """Carica, pulisce e scala i dati restituendo le feature, le etichette e il dataset scalato."""
-    preprocessor = DataPreprocessor(file_path)
-
+    def commit_deduplication(self):
+        """Salva le chiavi viste in questa ingestione, da chiamare solo quando il preprocessing è riuscito."""
+        if self.deduplicator is not None and self.deduplicator.path is not None:
+            self.deduplicator.save()
+
+
+def preprocess_data(file_path, chunksize=None, cache=None, report_path=None, deduplicator=None):
+    """
+    Carica, pulisce e scala i dati restituendo le feature, le etichette e il dataset scalato.
+    Il file viene sempre letto e profilato prima della scelta delle strategie; se viene fornita
+    una `DatasetCache` e il file e le strategie scelte non sono cambiati, pulizia e scaling
+    vengono saltati e il risultato viene letto dalla cache.
+    Con `report_path` il profilo del dataset letto viene salvato in formato JSON.
+    Con `deduplicator` (StreamingDeduplicator) le righe già viste vengono rimosse e le chiavi nuove
+    salvate solo a preprocessing riuscito; la cache non viene usata, perché il risultato dipende
+    anche dalle ingestioni precedenti.
+    """
+    preprocessor = DataPreprocessor(file_path, chunksize=chunksize, report_path=report_path, deduplicator=deduplicator)
+    if cache is not None and deduplicator is not None:
+        print("[INFO] Cache non usata: con la de-duplicazione il risultato dipende dalle chiavi già viste.")
+        cache = None
+
+    # Caricamento, anteprima e profilo precedono sempre la scelta delle strategie
     if not preprocessor.load_data():
         return None  # Termina il processo in caso di errore
 
-    preprocessor.handle_missing_values()
-    preprocessor.apply_feature_scaling()
-    
-    return preprocessor.prepare_features_and_labels()
\ No newline at end of file
+    if cache is None or not os.path.isfile(file_path):
+        preprocessor.handle_missing_values()
+        preprocessor.apply_feature_scaling()
+        risultato = preprocessor.prepare_features_and_labels()
+        if risultato[0]:
+            preprocessor.commit_deduplication()
+        return risultato
+
+    # Le strategie fanno parte della chiave: l'hash del file si calcola solo dopo la scelta
+    missing_strategy = preprocessor.ask_missing_strategy()
+    scaling_strategy = preprocessor.ask_scaling_strategy()
+    key = cache.key(file_path, missing_strategy, scaling_strategy, chunksize=chunksize)
+    cached = cache.load(key)
+    if cached is not None:
+        # Stessa forma del percorso senza cache; i dati sono mappati in copy-on-write, quindi
+        # possono essere modificati senza alterare la voce salvata
+        features, labels, data = cached
+        print("Dati preprocessati letti dalla cache.")
+        return True, features, labels, data
+
+    preprocessor.handle_missing_values(missing_strategy)
+    preprocessor.apply_feature_scaling(scaling_strategy)
+    risultato = preprocessor.prepare_features_and_labels()
+    if risultato[0]:
+        report = preprocessor.profile.report() if preprocessor.profile is not None else None
+        cache.store(key, risultato[1], risultato[2], data=risultato[3], report=report)
+    return risultato
@@ -0,0 +1,219 @@
+import json
+import numpy as np
+import pandas as pd
+from .streaming_statistics import StreamingStatistics
+from .deduplication import _SequenzeOrdinate
+
+
+class DatasetProfiler:
+    """
+    Profilo del dataset calcolato in una sola passata, anche a blocchi (ad es. da `parse_chunks`).
+
+    Per ogni colonna vengono riportati valori mancanti e non numerici, tasso di mancanti dopo la
+    conversione numerica (come in `MissingDataHandler.clean_numeric`), numero di valori distinti,
+    minimo, massimo, media e deviazione standard; per l'intero dataset il numero di righe duplicate
+    e, se l'indice è 'ID', di ID ripetuti. Ogni blocco viene convertito una sola volta
+    in una matrice float su cui tutte le statistiche sono calcolate con operazioni vettoriali.
+
+    I valori distinti sono contati esattamente fino a `max_distinct`; oltre, sono stimati dai
+    `max_distinct` hash più piccoli (stimatore k-minimum-values, errore relativo circa 1/sqrt(k)).
+    Righe e ID duplicati sono riconosciuti tramite hash a 64 bit, tenuti in sequenze ordinate fuse a
+    livelli come in `StreamingDeduplicator`, così ogni blocco costa in proporzione alle sue righe.
+    Due profili calcolati su righe diverse si uniscono con `merge`.
+    """
+
+    def __init__(self, max_distinct: int = 4096):
+        """
+        Args:
+            max_distinct (int): Valori distinti mantenuti per colonna prima di passare alla stima.
+
+        Raises:
+            ValueError: Se max_distinct è minore di 2.
+        """
+        if max_distinct < 2:
+            raise ValueError("max_distinct deve essere almeno 2")
+
+        self.max_distinct = max_distinct
+        self.columns = None
+        self.dtypes = None
+        self.n_righe = 0
+        self.mancanti = None
+        self.non_numerici = None
+        self.righe_duplicate = 0
+        self.id_duplicati = None
+        self.stats = StreamingStatistics()
+        self._distinti = None
+        self._hash_righe = _SequenzeOrdinate()
+        self._hash_id = None
+
+    def update(self, chunk: pd.DataFrame) -> 'DatasetProfiler':
+        """
+        Aggiorna il profilo con un nuovo blocco di righe.
+
+        Raises:
+            ValueError: Se il blocco non ha le stesse colonne dei blocchi precedenti.
+        """
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+            self.dtypes = [str(dtype) for dtype in chunk.dtypes]
+            self.mancanti = np.zeros(len(self.columns), dtype=np.int64)
+            self.non_numerici = np.zeros(len(self.columns), dtype=np.int64)
+            self._distinti = [np.empty(0, dtype=np.uint64) for _ in self.columns]
+            if chunk.index.name == 'ID':
+                self.id_duplicati = 0
+                self._hash_id = _SequenzeOrdinate()
+        elif list(chunk.columns) != self.columns:
+            raise ValueError("Il blocco non ha le stesse colonne dei blocchi precedenti")
+
+        if len(chunk) == 0:
+            return self
+
+        # Un'unica matrice float per tutte le colonne: i valori non interpretabili diventano NaN
+        valori = np.empty((len(chunk), len(self.columns)), dtype=float, order='F')
+        nulli = chunk.isna().to_numpy()
+        for j, col in enumerate(self.columns):
+            serie = chunk[col]
+            numerica = pd.api.types.is_numeric_dtype(serie)
+            if not numerica:
+                serie = pd.to_numeric(serie, errors='coerce')
+            valori[:, j] = serie.to_numpy(dtype=float, na_value=np.nan)
+            # Le colonne numeriche sono confrontate come float, così il tipo del singolo blocco non conta
+            originali = valori[:, j] if numerica else chunk[col].to_numpy()
+            self._distinti[j] = self._unisci_hash(self._distinti[j], _hash_valori(originali[~nulli[:, j]]))
+
+        self.n_righe += len(chunk)
+        self.mancanti += nulli.sum(axis=0)
+        self.non_numerici += (np.isnan(valori) & ~nulli).sum(axis=0)
+        self.stats.update(valori)
+
+        hash_righe = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        self.righe_duplicate += _conta_duplicati(hash_righe, self._hash_righe)
+        self._hash_righe.aggiungi(hash_righe)
+        if self._hash_id is not None:
+            hash_id = pd.util.hash_array(chunk.index.to_numpy())
+            self.id_duplicati += _conta_duplicati(hash_id, self._hash_id)
+            self._hash_id.aggiungi(hash_id)
+        return self
+
+    def merge(self, other: 'DatasetProfiler') -> 'DatasetProfiler':
+        """
+        Unisce (in place) il profilo calcolato su altre righe dello stesso dataset.
+
+        Raises:
+            ValueError: Se i due profili riguardano colonne diverse.
+        """
+        if other.columns is None:
+            return self
+        if self.columns is None:
+            self.columns, self.dtypes = list(other.columns), list(other.dtypes)
+            self.mancanti = np.zeros(len(self.columns), dtype=np.int64)
+            self.non_numerici = np.zeros(len(self.columns), dtype=np.int64)
+            self._distinti = [np.empty(0, dtype=np.uint64) for _ in self.columns]
+            if other._hash_id is not None:
+                self.id_duplicati, self._hash_id = 0, _SequenzeOrdinate()
+        elif self.columns != other.columns:
+            raise ValueError("Impossibile unire profili calcolati su colonne diverse")
+
+        self.n_righe += other.n_righe
+        self.mancanti += other.mancanti
+        self.non_numerici += other.non_numerici
+        self.stats.merge(other.stats)
+        self._distinti = [self._unisci_hash(a, b) for a, b in zip(self._distinti, other._distinti)]
+
+        # I duplicati tra le due parti si aggiungono a quelli già trovati all'interno di ciascuna
+        hash_righe = other._hash_righe.ordinato()
+        self.righe_duplicate += other.righe_duplicate + int(self._hash_righe.contiene(hash_righe).sum())
+        self._hash_righe.aggiungi(hash_righe)
+        if self._hash_id is not None and other._hash_id is not None:
+            hash_id = other._hash_id.ordinato()
+            self.id_duplicati += other.id_duplicati + int(self._hash_id.contiene(hash_id).sum())
+            self._hash_id.aggiungi(hash_id)
+        else:
+            self.id_duplicati, self._hash_id = None, None
+        return self
+
+    @classmethod
+    def from_chunks(cls, chunks, max_distinct: int = 4096) -> 'DatasetProfiler':
+        """Calcola il profilo in una sola passata su un iterabile di blocchi (ad es. `parse_chunks`)."""
+        profiler = cls(max_distinct=max_distinct)
+        for chunk in chunks:
+            profiler.update(chunk)
+        return profiler
+
+    def valori_distinti(self) -> list[int]:
+        """Numero di valori distinti per colonna: esatto fino a `max_distinct`, stimato oltre."""
+        distinti = []
+        for hash_colonna in self._distinti:
+            if len(hash_colonna) < self.max_distinct:
+                distinti.append(len(hash_colonna))
+            else:
+                # Stimatore KMV: il k-esimo hash più piccolo indica la densità dei valori distinti
+                distinti.append(int(round((self.max_distinct - 1) / (float(hash_colonna[-1]) / 2.0 ** 64))))
+        return distinti
+
+    def report(self) -> dict:
+        """
+        Restituisce il profilo come dizionario serializzabile in JSON (i valori non definiti sono None).
+
+        Raises:
+            ValueError: Se il profilo non ha ancora ricevuto dati.
+        """
+        if self.columns is None:
+            raise ValueError("Il profilo è vuoto: nessun blocco elaborato")
+
+        vuoto = self.stats.count is None
+        distinti = self.valori_distinti()
+        colonne = {}
+        for j, col in enumerate(self.columns):
+            presenti = 0 if vuoto else int(self.stats.count[j])
+            colonne[str(col)] = {
+                'tipo': self.dtypes[j],
+                'mancanti': int(self.mancanti[j]),
+                'non_numerici': int(self.non_numerici[j]),
+                'tasso_mancanti': _numero((self.n_righe - presenti) / self.n_righe) if self.n_righe else None,
+                'valori_distinti': distinti[j],
+                'distinti_stimati': len(self._distinti[j]) >= self.max_distinct,
+                'min': None if vuoto else _numero(self.stats.min[j]),
+                'max': None if vuoto else _numero(self.stats.max[j]),
+                'media': None if vuoto or presenti == 0 else _numero(self.stats.mean[j]),
+                'std': None if vuoto else _numero(self.stats.std()[j]),
+            }
+        return {'righe': self.n_righe, 'righe_duplicate': self.righe_duplicate,
+                'id_duplicati': self.id_duplicati, 'colonne': colonne}
+
+    def save(self, path: str) -> dict:
+        """Scrive il profilo in formato JSON e lo restituisce."""
+        report = self.report()
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        print(f"[INFO] Profilo del dataset salvato in {path}")
+        return report
+
+    def to_frame(self) -> pd.DataFrame:
+        """Riepilogo per colonna (una riga per colonna), comodo da stampare."""
+        return pd.DataFrame(self.report()['colonne']).T[
+            ['tipo', 'tasso_mancanti', 'non_numerici', 'valori_distinti', 'min', 'max']
+        ]
+
+    def _unisci_hash(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        # Si tengono solo i max_distinct hash più piccoli (ordinati e senza ripetizioni)
+        return np.union1d(a, b)[:self.max_distinct]
+
+
+def _hash_valori(valori: np.ndarray) -> np.ndarray:
+    """Hash a 64 bit dei valori di una colonna (numeri e stringhe)."""
+    if len(valori) == 0:
+        return np.empty(0, dtype=np.uint64)
+    return pd.util.hash_array(valori)
+
+
+def _conta_duplicati(hash_blocco: np.ndarray, hash_visti: _SequenzeOrdinate) -> int:
+    """Righe del blocco già viste nei blocchi precedenti o ripetute all'interno del blocco stesso."""
+    ripetuti = pd.Index(hash_blocco).duplicated()
+    return int((ripetuti | hash_visti.contiene(hash_blocco)).sum())
+
+
+def _numero(valore):
+    """Converte un valore numpy in un numero JSON (None per NaN e infiniti)."""
+    valore = float(valore)
+    return valore if np.isfinite(valore) else None
@@ -0,0 +1,143 @@
+import math
+import numpy as np
+
+
+class KLLSketch:
+    """
+    Sketch KLL (Karnin, Lang, Liberty) per stimare i quantili di una colonna in una sola passata.
+
+    I valori sono conservati in livelli di compattatori: un elemento al livello h rappresenta 2^h
+    valori originali. Quando un livello supera la sua capacità viene ordinato e metà dei suoi elementi
+    (quelli in posizione pari o dispari, a caso) viene promossa al livello successivo.
+    La memoria è O(k) indipendentemente dal numero di valori, e due sketch possono essere uniti
+    con `merge` (ad es. quando sono calcolati da processi paralleli).
+
+    L'errore di rango è inversamente proporzionale a `k`: con `k_per_errore` si ricava il `k`
+    necessario per un errore di rango desiderato.
+    """
+
+    # Errore di rango normalizzato osservato per k=200 (circa 1.65% con confidenza del 99%)
+    ERRORE_K200 = 0.0165
+
+    def __init__(self, k: int = 200, seed=None):
+        """
+        Args:
+            k (int): Capacità del livello più alto; controlla il compromesso tra memoria ed errore.
+            seed (int, optional): Seme per la scelta casuale degli elementi promossi.
+
+        Raises:
+            ValueError: Se `k` è minore di 8.
+        """
+        if k < 8:
+            raise ValueError("Il parametro k dello sketch deve essere almeno 8")
+
+        self.k = k
+        self.count = 0
+        self.min = np.nan
+        self.max = np.nan
+        self._livelli = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def k_per_errore(errore: float) -> int:
+        """
+        Restituisce il `k` necessario per un errore di rango normalizzato pari a `errore`.
+
+        Raises:
+            ValueError: Se l'errore non è compreso tra 0 e 1.
+        """
+        if not (0 < errore < 1):
+            raise ValueError("L'errore di rango deve essere compreso tra 0 e 1")
+        return max(8, math.ceil(200 * KLLSketch.ERRORE_K200 / errore))
+
+    @property
+    def errore_rango(self) -> float:
+        """Errore di rango normalizzato atteso con il `k` scelto."""
+        return self.ERRORE_K200 * 200 / self.k
+
+    def update(self, values) -> 'KLLSketch':
+        """Aggiunge un blocco di valori (i NaN vengono ignorati)."""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        self.count += len(values)
+        self.min = np.fmin(self.min, values.min())
+        self.max = np.fmax(self.max, values.max())
+        self._livelli[0] = np.concatenate([self._livelli[0], values])
+        self._compatta()
+        return self
+
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        """
+        Unisce (in place) uno sketch costruito su valori diversi.
+
+        Raises:
+            ValueError: Se i due sketch hanno `k` diversi.
+        """
+        if other.k != self.k:
+            raise ValueError("Impossibile unire sketch con parametri k diversi")
+        if other.count == 0:
+            return self
+
+        while len(self._livelli) < len(other._livelli):
+            self._livelli.append(np.empty(0))
+        for h, livello in enumerate(other._livelli):
+            self._livelli[h] = np.concatenate([self._livelli[h], livello])
+        self.count += other.count
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        self._compatta()
+        return self
+
+    def quantile(self, q):
+        """
+        Stima il quantile (o i quantili) `q` compresi tra 0 e 1; NaN se lo sketch è vuoto.
+
+        Raises:
+            ValueError: Se `q` non è compreso tra 0 e 1.
+        """
+        q = np.asarray(q, dtype=float)
+        if ((q < 0) | (q > 1)).any():
+            raise ValueError("I quantili devono essere compresi tra 0 e 1")
+        if self.count == 0:
+            return np.full(q.shape, np.nan)[()]
+
+        valori = np.concatenate(self._livelli)
+        pesi = np.concatenate([np.full(len(livello), 2.0 ** h) for h, livello in enumerate(self._livelli)])
+        ordine = np.argsort(valori, kind='stable')
+        valori, cumulati = valori[ordine], np.cumsum(pesi[ordine])
+
+        indici = np.searchsorted(cumulati, q * cumulati[-1], side='left')
+        stima = valori[np.minimum(indici, len(valori) - 1)]
+        # Gli estremi sono noti esattamente
+        stima = np.where(q == 0, self.min, np.where(q == 1, self.max, stima))
+        return stima[()]
+
+    def __len__(self):
+        """Numero di elementi effettivamente conservati."""
+        return sum(len(livello) for livello in self._livelli)
+
+    def _capacita(self, h: int) -> int:
+        # Capacità decrescente in modo geometrico (fattore 2/3) dal livello più alto verso il basso
+        return max(2, math.ceil(self.k * (2 / 3) ** (len(self._livelli) - 1 - h)))
+
+    def _compatta(self):
+        h = 0
+        while h < len(self._livelli):
+            livello = self._livelli[h]
+            if len(livello) <= self._capacita(h):
+                h += 1
+                continue
+            if h + 1 == len(self._livelli):
+                self._livelli.append(np.empty(0))
+
+            # Ordina, tiene da parte un elemento se sono dispari e promuove metà degli altri
+            livello = np.sort(livello)
+            dispari = len(livello) % 2
+            promossi = livello[dispari + int(self._rng.integers(2))::2]
+            self._livelli[h] = livello[:dispari]
+            self._livelli[h + 1] = np.concatenate([self._livelli[h + 1], promossi])
+            # Un nuovo livello riduce la capacità di quelli inferiori: si ricontrolla dall'inizio
+            h = 0
@@ -0,0 +1,141 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from .file_parser import ParserDispatcher, StreamingSchema
+
+
+class ShardedDatasetLoader:
+    """
+    Caricamento di un dataset suddiviso in più file (shard), ad es. un'esportazione CSV/XLSX per giorno.
+
+    Gli shard vengono letti in parallelo (pool di thread o di processi) e convertiti con lo stesso
+    `StreamingSchema`; i duplicati per 'ID' vengono rimossi anche tra shard diversi (vale la prima
+    occorrenza nell'ordine dei file). Il risultato viene copiato una sola volta in buffer preallocati
+    (uno per tipo di dato), invece di concatenare ripetutamente DataFrame.
+    """
+
+    def __init__(self, schema: StreamingSchema = None, n_jobs: int = None, executor: str = 'thread',
+                 chunksize: int = 1_000_000):
+        """
+        Args:
+            schema (StreamingSchema, optional): Schema condiviso da tutti gli shard.
+            n_jobs (int, optional): Numero di worker (None = numero di CPU, 1 = sequenziale).
+            executor (str): 'thread' o 'process'.
+            chunksize (int): Righe per blocco nella lettura di ciascuno shard.
+
+        Raises:
+            ValueError: Se l'executor non è valido o n_jobs non è positivo.
+        """
+        if executor not in ('thread', 'process'):
+            raise ValueError("L'executor deve essere 'thread' o 'process'")
+        if n_jobs is not None and n_jobs <= 0:
+            raise ValueError("n_jobs deve essere un intero positivo")
+
+        self.schema = schema or StreamingSchema()
+        self.n_jobs = n_jobs
+        self.executor = executor
+        self.chunksize = chunksize
+
+    @staticmethod
+    def shard_paths(source: str) -> list[str]:
+        """
+        Restituisce gli shard in ordine: tutti i file supportati di una cartella, oppure i file
+        che corrispondono a un pattern glob (es. 'export/*.csv').
+
+        Raises:
+            ValueError: Se non viene trovato alcuno shard supportato.
+        """
+        if os.path.isdir(source):
+            candidati = [os.path.join(source, nome) for nome in os.listdir(source)]
+        else:
+            candidati = glob.glob(source)
+        paths = sorted(path for path in candidati
+                       if os.path.isfile(path) and path.lower().endswith(ParserDispatcher.SUPPORTED_EXTENSIONS))
+        if not paths:
+            raise ValueError(f"Nessun file supportato trovato in: {source}")
+        return paths
+
+    def load(self, source) -> pd.DataFrame:
+        """
+        Legge tutti gli shard e li unisce in un unico DataFrame.
+
+        Args:
+            source (str | list[str]): Cartella, pattern glob o lista esplicita di file.
+
+        Raises:
+            ValueError: Se gli shard non hanno le stesse colonne.
+        """
+        paths = list(source) if isinstance(source, (list, tuple)) else self.shard_paths(source)
+        print(f"[INFO] Caricamento di {len(paths)} shard")
+
+        n_jobs = self.n_jobs or os.cpu_count() or 1
+        if n_jobs == 1 or len(paths) == 1:
+            shards = [leggi_shard(path, self.schema, self.chunksize) for path in paths]
+        else:
+            pool_cls = ThreadPoolExecutor if self.executor == 'thread' else ProcessPoolExecutor
+            with pool_cls(max_workers=min(n_jobs, len(paths))) as pool:
+                # map conserva l'ordine dei file, necessario per la de-duplicazione
+                shards = list(pool.map(leggi_shard, paths, [self.schema] * len(paths), [self.chunksize] * len(paths)))
+
+        return _unisci_shard(paths, shards)
+
+
+def leggi_shard(path: str, schema: StreamingSchema, chunksize: int) -> pd.DataFrame:
+    """Legge e converte un singolo shard (funzione di modulo, quindi utilizzabile da un pool di processi)."""
+    parser = ParserDispatcher.get_parser(path, skip_columns=schema.skip_columns)
+    chunks = list(parser.parse_chunks(path, schema=schema, chunksize=chunksize))
+    return chunks[0] if len(chunks) == 1 else pd.concat(chunks)
+
+
+def _unisci_shard(paths: list[str], shards: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Copia gli shard in buffer preallocati, saltando gli 'ID' già visti negli shard precedenti.
+    Le colonne dello stesso tipo condividono un unico buffer bidimensionale, che diventa
+    direttamente il blocco interno del DataFrame risultante.
+    """
+    colonne = list(shards[0].columns)
+    for path, shard in zip(paths, shards):
+        if set(shard.columns) != set(colonne):
+            raise ValueError(f"Lo shard {path} non ha le stesse colonne del primo shard")
+
+    # De-duplicazione per 'ID' tra shard: si tiene la prima occorrenza nell'ordine dei file
+    con_id = all(shard.index.name == 'ID' for shard in shards)
+    if con_id:
+        tieni = ~pd.Index(np.concatenate([shard.index.to_numpy() for shard in shards])).duplicated(keep='first')
+    else:
+        tieni = np.ones(sum(len(shard) for shard in shards), dtype=bool)
+    confini = np.cumsum([0] + [len(shard) for shard in shards])
+    maschere = [tieni[inizio:fine] for inizio, fine in zip(confini[:-1], confini[1:])]
+    n_righe = int(tieni.sum())
+
+    # Colonne raggruppate per tipo: un buffer (n_colonne, n_righe) per ciascun tipo
+    gruppi = {}
+    for col in colonne:
+        dtype = np.result_type(*[shard[col].dtype for shard in shards])
+        gruppi.setdefault(dtype, []).append(col)
+    buffer = {dtype: np.empty((len(cols), n_righe), dtype=dtype) for dtype, cols in gruppi.items()}
+
+    index = np.empty(n_righe, dtype=np.result_type(*[shard.index.dtype for shard in shards])) if con_id else None
+    posizione = 0
+    for shard, maschera in zip(shards, maschere):
+        fine = posizione + int(maschera.sum())
+        if con_id:
+            index[posizione:fine] = shard.index.to_numpy()[maschera]
+        for dtype, cols in gruppi.items():
+            for i, col in enumerate(cols):
+                buffer[dtype][i, posizione:fine] = shard[col].to_numpy()[maschera]
+        posizione = fine
+
+    # Il gruppo più numeroso diventa il DataFrame di base (senza copie); gli altri vengono inseriti
+    # come colonne nella loro posizione originale
+    principale = max(gruppi, key=lambda dtype: len(gruppi[dtype]))
+    df = pd.DataFrame(buffer[principale].T, columns=gruppi[principale],
+                      index=pd.Index(index, name='ID') if con_id else pd.RangeIndex(n_righe), copy=False)
+    for posizione, col in enumerate(colonne):
+        if col in gruppi[principale]:
+            continue
+        dtype = next(dtype for dtype, cols in gruppi.items() if col in cols)
+        df.insert(posizione, col, buffer[dtype][gruppi[dtype].index(col)])
+    return df
@@ -0,0 +1,40 @@
+class StageCache:
+    """
+    Cache in memoria degli output delle fasi di preprocessing.
+
+    Ogni risultato è indicizzato dal nome della fase e dai parametri che lo determinano,
+    così che una fase già calcolata con gli stessi parametri non venga rieseguita.
+    """
+
+    def __init__(self):
+        self._store = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, stage: str, params: tuple, compute):
+        """
+        Restituisce l'output della fase se già presente, altrimenti lo calcola e lo memorizza.
+
+        Args:
+            stage (str): Nome della fase (es. 'parse', 'missing', 'scaling').
+            params (tuple): Parametri (hashable) che identificano l'output della fase.
+            compute (callable): Funzione senza argomenti che calcola l'output.
+        """
+        key = (stage, params)
+        if key in self._store:
+            self.hits += 1
+            return self._store[key]
+
+        self.misses += 1
+        result = compute()
+        self._store[key] = result
+        return result
+
+    def clear(self):
+        """Svuota la cache e azzera i contatori."""
+        self._store.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._store)
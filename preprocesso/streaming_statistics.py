@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+from .quantile_sketch import KLLSketch
+
+
+class StreamingStatistics:
+    """
+    Statistiche per colonna calcolate a blocchi, senza tenere l'intero dataset in memoria.
+
+    Per ogni colonna numerica vengono aggiornati conteggio dei valori non mancanti, media e somma
+    dei quadrati degli scarti (algoritmo di Welford nella forma a blocchi di Chan), minimo e massimo.
+    Due accumulatori calcolati su parti diverse (ad es. da processi paralleli) possono essere uniti
+    con `merge` ottenendo lo stesso risultato di un'unica passata.
+    Se indicato `quantile_k`, per ogni colonna viene mantenuto anche uno sketch KLL dei quantili.
+    """
+
+    def __init__(self, quantile_k: int = None, seed=None):
+        """
+        Args:
+            quantile_k (int, optional): Parametro k degli sketch dei quantili (None = nessuno sketch).
+            seed (int, optional): Seme degli sketch dei quantili.
+        """
+        self.quantile_k = quantile_k
+        self.seed = seed
+        self.sketches = None
+        self.columns = None
+        self.count = None
+        self.mean = None
+        self._m2 = None
+        self.min = None
+        self.max = None
+
+    def update(self, chunk) -> 'StreamingStatistics':
+        """
+        Aggiorna le statistiche con un nuovo blocco di righe.
+
+        Args:
+            chunk (pd.DataFrame | np.ndarray): Blocco di dati. Per un DataFrame vengono considerate
+                le colonne numeriche, fissate dal primo blocco.
+
+        Raises:
+            ValueError: Se il blocco non contiene le colonne viste nel primo blocco.
+        """
+        if isinstance(chunk, pd.DataFrame):
+            if self.columns is None:
+                self.columns = chunk.select_dtypes(include=[np.number]).columns.tolist()
+            mancanti = [col for col in self.columns if col not in chunk.columns]
+            if mancanti:
+                raise ValueError(f"Colonne mancanti nel blocco: {mancanti}")
+            values = chunk[self.columns].to_numpy(dtype=float)
+        else:
+            values = np.asarray(chunk, dtype=float)
+            if values.ndim == 1:
+                values = values.reshape(-1, 1)
+            if self.columns is None:
+                self.columns = list(range(values.shape[1]))
+            if values.shape[1] != len(self.columns):
+                raise ValueError("Il numero di colonne del blocco non coincide con quello dei blocchi precedenti")
+
+        if len(values) == 0:
+            return self
+
+        presenti = ~np.isnan(values)
+        count = presenti.sum(axis=0)
+        somma = np.where(presenti, values, 0.0).sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, somma / count, 0.0)
+        m2 = np.where(presenti, values - mean, 0.0)
+        m2 = np.einsum('ij,ij->j', m2, m2)
+
+        if self.quantile_k is not None and self.count is None:
+            self.sketches = [KLLSketch(self.quantile_k, seed=self.seed) for _ in self.columns]
+        if self.sketches is not None:
+            for j, sketch in enumerate(self.sketches):
+                sketch.update(values[:, j])
+
+        parziale = StreamingStatistics()
+        parziale.columns = self.columns
+        parziale.count, parziale.mean, parziale._m2 = count, mean, m2
+        parziale.min = np.fmin.reduce(values, axis=0)
+        parziale.max = np.fmax.reduce(values, axis=0)
+        return self._unisci_momenti(parziale)
+
+    def merge(self, other: 'StreamingStatistics') -> 'StreamingStatistics':
+        """
+        Unisce (in place) le statistiche di un altro accumulatore calcolato su righe diverse.
+        Gli sketch dei quantili restano disponibili solo se entrambe le parti li mantengono.
+
+        Raises:
+            ValueError: Se i due accumulatori riguardano colonne diverse.
+        """
+        if other.count is None:
+            return self
+        if self.count is not None and list(self.columns) != list(other.columns):
+            raise ValueError("Impossibile unire statistiche calcolate su colonne diverse")
+
+        if other.sketches is None or (self.count is not None and self.sketches is None):
+            self.sketches = None
+        else:
+            if self.sketches is None:
+                self.quantile_k = other.quantile_k
+                self.sketches = [KLLSketch(other.quantile_k, seed=self.seed) for _ in other.sketches]
+            for sketch, altro in zip(self.sketches, other.sketches):
+                sketch.merge(altro)
+        return self._unisci_momenti(other)
+
+    def _unisci_momenti(self, other: 'StreamingStatistics') -> 'StreamingStatistics':
+        if self.count is None:
+            self.columns = list(other.columns)
+            self.count, self.mean, self._m2 = other.count.copy(), other.mean.copy(), other._m2.copy()
+            self.min, self.max = other.min.copy(), other.max.copy()
+            return self
+
+        # Combinazione di Chan et al.: media e M2 delle due parti pesate per i rispettivi conteggi
+        totale = self.count + other.count
+        delta = other.mean - self.mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            peso = np.where(totale > 0, other.count / totale, 0.0)
+            self._m2 = self._m2 + other._m2 + np.where(totale > 0, delta ** 2 * self.count * other.count / totale, 0.0)
+        self.mean = self.mean + delta * peso
+        self.count = totale
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        return self
+
+    def quantile(self, q: float) -> np.ndarray:
+        """
+        Quantile `q` stimato per ogni colonna dagli sketch KLL.
+
+        Raises:
+            ValueError: Se l'accumulatore non mantiene gli sketch dei quantili.
+        """
+        if self.sketches is None:
+            raise ValueError("Quantili non disponibili: crea l'accumulatore con quantile_k")
+        return np.array([sketch.quantile(q) for sketch in self.sketches])
+
+    @classmethod
+    def from_chunks(cls, chunks, quantile_k: int = None, seed=None) -> 'StreamingStatistics':
+        """Calcola le statistiche in una sola passata su un iterabile di blocchi (ad es. `parse_chunks`)."""
+        stats = cls(quantile_k=quantile_k, seed=seed)
+        for chunk in chunks:
+            stats.update(chunk)
+        return stats
+
+    def variance(self, ddof: int = 1) -> np.ndarray:
+        """Varianza per colonna (ddof=1 come pandas); NaN se i valori non bastano."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > ddof, self._m2 / (self.count - ddof), np.nan)
+
+    def std(self, ddof: int = 1) -> np.ndarray:
+        """Deviazione standard per colonna (ddof=1 come pandas)."""
+        return np.sqrt(self.variance(ddof))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Riepilogo delle statistiche con una riga per colonna."""
+        return pd.DataFrame({'count': self.count, 'mean': np.where(self.count > 0, self.mean, np.nan),
+                             'std': self.std(), 'min': self.min, 'max': self.max}, index=self.columns)
@@ -1,4 +1,9 @@
 from validazione.holdout import Holdout
 from validazione.random_subsampling import RandomSubsampling
 from validazione.stratified_validation import StratifiedValidation
+from validazione.bootstrap import Bootstrap
+from validazione.adaptive_validation import AdaptiveValidation
+from validazione.learning_curve import LearningCurve
+from validazione.grid_search import GridSearch, RandomSearch
+from validazione.successive_halving import SuccessiveHalvingSearch
 from validazione.validazione_main import KNNValidation_main
\ No newline at end of file
@@ -0,0 +1,100 @@
+import copy
+import math
+import time
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+from .validation import ValidationProcess
+from models.neighbors import NeighborIndex, vote_neighbors
+from metriche.metrics import Metrics
+from preprocesso.mapped_dati import ValidationMapper
+
+
+class AdaptiveValidation(ValidationProcess):
+
+    # Classe che ripete una strategia di validazione finché la stima della metrica scelta non converge.
+
+    def __init__(self, strategy: ValidationProcess, metrica: str = "Accuracy Rate", tolleranza: float = 0.02,
+                 confidenza: float = 0.95, min_iterazioni: int = 5, max_iterazioni: int = 200, tempo_massimo: float = None):
+        """
+        Inizializza la modalità adattiva attorno a una strategia ripetibile (RandomSubsampling, StratifiedValidation, ...).
+
+        Le iterazioni proseguono finché l'ampiezza dell'intervallo di confidenza della media della metrica
+        (approssimazione normale) non scende sotto `tolleranza`, oppure finché non si raggiunge
+        `max_iterazioni` o il tempo massimo.
+
+        Args:
+            strategy (ValidationProcess): Strategia da ripetere (deve avere l'attributo `n_iterazioni`).
+            metrica (str): Metrica su cui valutare la convergenza (es. 'Accuracy Rate').
+            tolleranza (float): Ampiezza massima accettata dell'intervallo di confidenza.
+            confidenza (float): Livello di confidenza dell'intervallo (compreso tra 0 e 1).
+            min_iterazioni (int): Iterazioni minime prima di valutare la convergenza (almeno 2).
+            max_iterazioni (int): Iterazioni massime.
+            tempo_massimo (float, optional): Tempo massimo in secondi.
+
+        Raises:
+            ValueError: Se i parametri non sono validi o la strategia non è ripetibile.
+        """
+        if not hasattr(strategy, 'n_iterazioni'):
+            raise ValueError(f"La strategia {strategy.__class__.__name__} non supporta un numero variabile di iterazioni")
+        if not (tolleranza > 0):
+            raise ValueError("La tolleranza deve essere positiva")
+        if not (0 < confidenza < 1):
+            raise ValueError("La confidenza deve essere compresa tra 0 e 1")
+        if not (2 <= min_iterazioni <= max_iterazioni):
+            raise ValueError("Deve valere 2 <= min_iterazioni <= max_iterazioni")
+        if tempo_massimo is not None and not (tempo_massimo > 0):
+            raise ValueError("Il tempo massimo deve essere positivo")
+
+        self.strategy = strategy
+        self.metrica = metrica
+        self.tolleranza = tolleranza
+        self.confidenza = confidenza
+        self.min_iterazioni = min_iterazioni
+        self.max_iterazioni = max_iterazioni
+        self.tempo_massimo = tempo_massimo
+
+        # Esito dell'ultima esecuzione
+        self.iterazioni_eseguite = None
+        self.ampiezza_intervallo = None
+        self.motivo_arresto = None
+
+    def generate_splits(self, data: pd.DataFrame, labels: pd.Series) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Un singolo split della strategia interna (il numero totale è deciso in `split_data`)."""
+        singola = copy.copy(self.strategy)
+        singola.n_iterazioni = 1
+        return singola.generate_splits(data, labels)
+
+    def split_data(self, data: pd.DataFrame, labels: pd.Series, k_vicini: int) -> list[tuple[list[int], list[int], list[float]]]:
+        X = data.to_numpy(dtype=float)
+        y = labels.to_numpy()
+        z = NormalDist().inv_cdf(0.5 + self.confidenza / 2)
+        calculator = Metrics()
+
+        risultati = []
+        valori = []
+        inizio = time.perf_counter()
+        self.motivo_arresto = 'max_iterazioni'
+        while len(risultati) < self.max_iterazioni:
+            for train_idx, test_idx in self.generate_splits(data, labels):
+                _, vicini = NeighborIndex().fit(X[train_idx]).kneighbors(X[test_idx], k_vicini)
+                y_pred, probabilities = vote_neighbors(y[train_idx][vicini], k_vicini)
+                risultati.append((y[test_idx].tolist(), y_pred.tolist(), probabilities.tolist()))
+
+                y_real_m, y_pred_m, proba_m = ValidationMapper.map_static([risultati[-1]])[0]
+                valori.append(calculator.valuta(y_real_m, y_pred_m, proba_m, [self.metrica])[self.metrica])
+
+            # Ampiezza dell'intervallo di confidenza della media: 2 * z * s / sqrt(n)
+            if len(valori) >= 2:
+                self.ampiezza_intervallo = 2 * z * float(np.std(valori, ddof=1)) / math.sqrt(len(valori))
+            if len(valori) >= self.min_iterazioni and self.ampiezza_intervallo < self.tolleranza:
+                self.motivo_arresto = 'convergenza'
+                break
+            if self.tempo_massimo is not None and time.perf_counter() - inizio >= self.tempo_massimo:
+                self.motivo_arresto = 'tempo'
+                break
+
+        self.iterazioni_eseguite = len(risultati)
+        print(f"[INFO] Validazione adattiva: {self.iterazioni_eseguite} iterazioni ({self.motivo_arresto}), "
+              f"ampiezza intervallo {self.metrica}: {self.ampiezza_intervallo}")
+        return risultati
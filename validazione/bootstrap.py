@@ -0,0 +1,148 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from .validation import ValidationProcess
+from models.neighbors import NeighborIndex
+
+
+class Bootstrap(ValidationProcess):
+
+    # Classe che gestisce la validazione Bootstrap con stima out-of-bag (OOB) per il modello KNN.
+
+    def __init__(self, iterazioni, n_jobs=1):
+        """
+        Inizializza la strategia Bootstrap.
+
+        Ogni ricampionamento è rappresentato come vettore di conteggi (quante volte ogni campione
+        compare nel training set) invece che come copia del dataset; il test set è formato dai
+        campioni out-of-bag (conteggio zero). I vicini di tutti i punti vengono cercati una sola volta
+        e condivisi da tutti i ricampionamenti, che sono votati insieme in modo vettoriale.
+
+        Args:
+            iterazioni (int): Numero di ricampionamenti bootstrap (deve essere un numero positivo).
+            n_jobs (int): Processi usati per votare i ricampionamenti (1 = sequenziale, None = numero di CPU).
+
+        Raises:
+            ValueError: Se 'iterazioni' non è positivo.
+        """
+        if not (0 < iterazioni):
+            raise ValueError("Il numero d'iterazioni deve essere un intero positivo")
+
+        self.n_iterazioni = iterazioni
+        self.n_jobs = n_jobs
+
+    def draw_counts(self, n_campioni: int) -> np.ndarray:
+        """
+        Estrae i ricampionamenti come matrice di conteggi (n_iterazioni, n_campioni).
+        I ricampionamenti senza campioni out-of-bag vengono ri-estratti.
+        """
+        if n_campioni < 2:
+            raise ValueError("Servono almeno due campioni per il bootstrap")
+
+        probabilita = np.full(n_campioni, 1.0 / n_campioni)
+        counts = np.random.multinomial(n_campioni, probabilita, size=self.n_iterazioni).astype(np.int32)
+        senza_oob = np.flatnonzero((counts > 0).all(axis=1))
+        while len(senza_oob):
+            counts[senza_oob] = np.random.multinomial(n_campioni, probabilita, size=len(senza_oob))
+            senza_oob = senza_oob[(counts[senza_oob] > 0).all(axis=1)]
+        return counts
+
+    def generate_splits(self, data: pd.DataFrame, labels: pd.Series) -> list[tuple[np.ndarray, np.ndarray]]:
+        """
+        Restituisce gli split (indici di train con ripetizioni, indici out-of-bag).
+        """
+        counts = self.draw_counts(len(data))
+        indici = np.arange(len(data))
+        return [(np.repeat(indici, c), np.flatnonzero(c == 0)) for c in counts]
+
+    def split_data(self, data: pd.DataFrame, labels: pd.Series, k_vicini: int) -> list[tuple[list[int], list[int], list[float]]]:
+        n_campioni = len(data)
+        counts = self.draw_counts(n_campioni)
+        y = labels.to_numpy()
+        X = data.to_numpy(dtype=float)
+        righe = np.arange(n_campioni)
+
+        # Struttura condivisa: vicini ordinati di ogni punto, con una profondità che quasi sempre
+        # copre k campioni bootstrap; le righe che non bastano vengono ricalcolate per intero
+        index = NeighborIndex().fit(X)
+        profondita = min(n_campioni, 2 * k_vicini + 30)
+        _, vicini = index.kneighbors(X, profondita)
+
+        pred, proba, incompleti = self._vota(righe, vicini, y, counts, k_vicini)
+        if incompleti.any():
+            righe_full = righe[incompleti]
+            _, vicini_full = index.kneighbors(X[righe_full], n_campioni)
+            pred[:, righe_full], proba[:, righe_full], _ = self._vota(righe_full, vicini_full, y, counts, k_vicini)
+
+        risultati = []
+        for b in range(self.n_iterazioni):
+            oob = counts[b] == 0
+            risultati.append((y[oob].tolist(), pred[b, oob].tolist(), proba[b, oob].tolist()))
+        return risultati
+
+    def _vota(self, righe, vicini, y, counts, k_vicini):
+        """
+        Divide i ricampionamenti tra i processi (se richiesto) e ricompone i voti.
+
+        Ogni blocco risolve le parità con un seme proprio, generato con `np.random.SeedSequence` a
+        partire dallo stato casuale globale (quindi riproducibile con `np.random.seed`): i processi del
+        pool ereditano lo stesso stato e senza semi distinti estrarrebbero le stesse parità.
+        """
+        radice = np.random.SeedSequence(int(np.random.randint(2 ** 32, dtype=np.int64)))
+        if self.n_jobs == 1 or self.n_iterazioni == 1:
+            return vota_bootstrap(righe, vicini, y, counts, k_vicini, seed=radice)
+
+        blocchi = np.array_split(counts, min(self.n_iterazioni, self.n_jobs or self.n_iterazioni))
+        semi = radice.spawn(len(blocchi))
+        with ProcessPoolExecutor(max_workers=self.n_jobs) as pool:
+            esiti = list(pool.map(vota_bootstrap, *zip(*[(righe, vicini, y, blocco, k_vicini, 4.0, seme)
+                                                         for blocco, seme in zip(blocchi, semi)])))
+        pred = np.concatenate([e[0] for e in esiti])
+        proba = np.concatenate([e[1] for e in esiti])
+        incompleti = np.logical_or.reduce([e[2] for e in esiti])
+        return pred, proba, incompleti
+
+
+def vota_bootstrap(righe: np.ndarray, vicini: np.ndarray, y: np.ndarray, counts: np.ndarray, k: int, positive_label=4.0,
+                   seed=None):
+    """
+    Vota i k vicini di ciascun punto in tutti i ricampionamenti contemporaneamente.
+
+    Un vicino che compare c volte nel ricampionamento pesa c voti; si prendono i vicini in ordine
+    di distanza finché la somma dei pesi non raggiunge k, come con un training set materializzato.
+
+    Args:
+        righe (np.ndarray): Indici dei punti da classificare.
+        vicini (np.ndarray): Vicini ordinati di ciascun punto in `righe`, forma (len(righe), profondità).
+        y (np.ndarray): Etichette di tutti i campioni.
+        counts (np.ndarray): Conteggi bootstrap, forma (n_ricampionamenti, n_campioni).
+        k (int): Numero di vicini.
+        seed (int | np.random.SeedSequence, optional): Seme del generatore locale usato per le parità.
+
+    Returns:
+        tuple: Predizioni e probabilità della classe positiva (n_ricampionamenti, len(righe)) e, per ogni
+        punto, se la profondità di `vicini` non bastava a raggiungere k campioni in qualche ricampionamento.
+    """
+    rng = np.random.default_rng(seed)
+    classi = np.unique(y)
+    n_ric = len(counts)
+    pred = np.empty((n_ric, len(righe)), dtype=y.dtype)
+    proba = np.zeros((n_ric, len(righe)))
+    incompleti = np.zeros(len(righe), dtype=bool)
+
+    for j, i in enumerate(righe):
+        c = counts[:, vicini[j]]
+        cumulati = np.cumsum(c, axis=1)
+        pesi = np.minimum(cumulati, k) - np.minimum(cumulati - c, k)
+
+        # Solo i ricampionamenti in cui il punto è out-of-bag interessano
+        oob = counts[:, i] == 0
+        incompleti[j] = vicini.shape[1] < counts.shape[1] and bool((cumulati[oob, -1] < k).any())
+
+        etichette = y[vicini[j]]
+        voti = np.stack([pesi[:, etichette == classe].sum(axis=1) for classe in classi], axis=1)
+        pari_merito = voti == voti.max(axis=1, keepdims=True)
+        pred[:, j] = classi[np.argmax(np.where(pari_merito, rng.random(voti.shape), -1.0), axis=1)]
+        if positive_label in classi:
+            proba[:, j] = voti[:, np.flatnonzero(classi == positive_label)[0]] / np.maximum(voti.sum(axis=1), 1)
+    return pred, proba, incompleti
@@ -0,0 +1,212 @@
+import itertools
+import random
+import numpy as np
+import pandas as pd
+from .validation import ValidationProcess
+from .holdout import Holdout
+from models.neighbors import NeighborIndex, vote_neighbors
+from metriche.metrics import Metrics
+from preprocesso.file_parser import ParserDispatcher
+from preprocesso.missing_data_manager import MissingDataStrategyManager
+from preprocesso.feature_transformer import FeatureTransformationManager
+from preprocesso.mapped_dati import ValidationMapper
+from preprocesso.stage_cache import StageCache
+
+
+class GridSearch:
+    """
+    Ricerca esaustiva su k, strategia dei valori mancanti, scaling e strategia di validazione.
+
+    Ogni fase di preprocessing viene calcolata una sola volta per combinazione di parametri
+    (tramite `StageCache`) e, per ogni split, i vicini vengono cercati una sola volta con il k
+    massimo richiesto: tutti i valori di k minori riutilizzano lo stesso ordinamento.
+    """
+
+    def __init__(self, file_path: str, k_values: list[int], missing_strategies: list[str] = ('remove',),
+                 scaling_strategies: list[str] = ('normalize',), validation_strategies: list[ValidationProcess] = None,
+                 metriche: list[str] = ("Accuracy Rate",), random_state: int = None, cache: StageCache = None):
+        """
+        Args:
+            file_path (str): Percorso del dataset.
+            k_values (list[int]): Valori di k da esplorare.
+            missing_strategies (list[str]): Strategie per i valori mancanti (vedi `MissingDataStrategyManager`).
+            scaling_strategies (list[str]): Strategie di scaling (vedi `FeatureTransformationManager`).
+            validation_strategies (list[ValidationProcess]): Strategie di validazione (default: Holdout 0.2).
+            metriche (list[str]): Metriche da calcolare; la prima è usata per ordinare i risultati.
+            random_state (int, optional): Seme per rendere riproducibili split e parità nel voto.
+            cache (StageCache, optional): Cache delle fasi da condividere tra più ricerche.
+
+        Raises:
+            ValueError: Se la griglia è vuota o contiene valori di k non positivi.
+        """
+        if not k_values or any(k <= 0 for k in k_values):
+            raise ValueError("I valori di k devono essere interi positivi")
+        if not missing_strategies or not scaling_strategies or not metriche:
+            raise ValueError("La griglia di ricerca non può contenere liste vuote")
+
+        self.file_path = file_path
+        self.k_values = list(k_values)
+        self.missing_strategies = list(missing_strategies)
+        self.scaling_strategies = list(scaling_strategies)
+        self.validation_strategies = list(validation_strategies) if validation_strategies else [Holdout(test_size=0.2)]
+        self.metriche = list(metriche)
+        self.random_state = random_state
+        self.cache = cache if cache is not None else StageCache()
+        self.ignored_columns = ['Sample code number', 'classtype_v1']
+        self.kind_cell_column = 'classtype_v1'
+
+    def candidates(self) -> list[dict]:
+        """Restituisce tutte le combinazioni della griglia."""
+        return [
+            {'k': k, 'missing_strategy': m, 'scaling_strategy': s, 'validation': v}
+            for m, s, v, k in itertools.product(
+                self.missing_strategies, self.scaling_strategies,
+                range(len(self.validation_strategies)), self.k_values
+            )
+        ]
+
+    def run(self) -> pd.DataFrame:
+        """
+        Valuta tutte le combinazioni candidate.
+
+        Returns:
+            pd.DataFrame: Una riga per configurazione, ordinata dalla migliore alla peggiore secondo la prima metrica.
+        """
+        # Raggruppiamo i candidati che differiscono solo per k: condividono dati, split e vicini
+        gruppi = {}
+        for candidato in self.candidates():
+            chiave = (candidato['missing_strategy'], candidato['scaling_strategy'], candidato['validation'])
+            gruppi.setdefault(chiave, set()).add(candidato['k'])
+
+        righe = []
+        for (missing, scaling, v_idx), k_values in gruppi.items():
+            strategy = self.validation_strategies[v_idx]
+            print(f"[INFO] Valutazione: missing={missing}, scaling={scaling}, validazione={_descrivi_strategia(strategy)}, k={sorted(k_values)}")
+            features, labels = self.prepare_data(missing, scaling)
+            for k, valori in self.evaluate(features, labels, strategy, sorted(k_values)).items():
+                righe.append({
+                    'k': k,
+                    'missing_strategy': missing,
+                    'scaling_strategy': scaling,
+                    'validation': _descrivi_strategia(strategy),
+                    **valori,
+                })
+
+        return _ordina_risultati(pd.DataFrame(righe), self.metriche[0])
+
+    def prepare_data(self, missing_strategy: str, scaling_strategy: str) -> tuple[pd.DataFrame, pd.Series]:
+        """
+        Esegue (o recupera dalla cache) parsing, gestione dei valori mancanti e scaling.
+
+        Returns:
+            tuple[pd.DataFrame, pd.Series]: Feature e etichette pronte per il classificatore.
+        """
+        raw = self.cache.get_or_compute(
+            'parse', (self.file_path,),
+            lambda: ParserDispatcher.get_parser(self.file_path).parse_file(self.file_path)
+        )
+        cleaned = self.cache.get_or_compute(
+            'missing', (self.file_path, missing_strategy),
+            lambda: MissingDataStrategyManager.handle_missing_data(
+                strategy=missing_strategy, data=raw, target_col=self.kind_cell_column,
+                exclude_columns=self.ignored_columns
+            )
+        )
+        scaled = self.cache.get_or_compute(
+            'scaling', (self.file_path, missing_strategy, scaling_strategy),
+            lambda: FeatureTransformationManager.apply_transformation(
+                strategy=scaling_strategy, data=cleaned, skip_columns=self.ignored_columns
+            )
+        )
+        if self.kind_cell_column not in scaled.columns:
+            raise ValueError(f"La colonna delle etichette '{self.kind_cell_column}' non è presente nel dataset.")
+
+        labels = scaled[self.kind_cell_column]
+        features = scaled.drop(columns=self.ignored_columns, errors='ignore')
+        return features, labels
+
+    def evaluate(self, features: pd.DataFrame, labels: pd.Series, strategy: ValidationProcess, k_values: list[int]) -> dict[int, dict[str, float]]:
+        """
+        Valuta tutti i k richiesti sugli stessi split, cercando i vicini una sola volta per split.
+
+        Returns:
+            dict[int, dict[str, float]]: Per ogni k, media e deviazione standard delle metriche sugli split.
+        """
+        per_k = valuta_k(features, labels, strategy, k_values, self.metriche, self.random_state)
+        return {k: _riassumi(valori, self.metriche) for k, valori in per_k.items()}
+
+
+class RandomSearch(GridSearch):
+    """
+    Ricerca casuale: valuta solo `n_iter` combinazioni estratte dalla griglia.
+    Le combinazioni estratte che condividono i dati continuano a condividere split e vicini.
+    """
+
+    def __init__(self, *args, n_iter: int = 10, **kwargs):
+        super().__init__(*args, **kwargs)
+        if n_iter <= 0:
+            raise ValueError("Il numero di combinazioni da estrarre deve essere un intero positivo")
+        self.n_iter = n_iter
+
+    def candidates(self) -> list[dict]:
+        griglia = super().candidates()
+        rng = random.Random(self.random_state)
+        return rng.sample(griglia, min(self.n_iter, len(griglia)))
+
+
+def valuta_k(features: pd.DataFrame, labels: pd.Series, strategy: ValidationProcess, k_values: list[int],
+             metriche: list[str], seed: int = None) -> dict[int, list[dict[str, float]]]:
+    """
+    Genera gli split della strategia e, per ciascuno, cerca i vicini una sola volta con il k massimo
+    riutilizzandoli per tutti i k. Funzione di modulo, così da poter essere eseguita in un pool di processi.
+
+    Returns:
+        dict[int, list[dict[str, float]]]: Per ogni k, le metriche di ciascuno split.
+    """
+    if seed is not None:
+        np.random.seed(seed)
+        random.seed(seed)
+
+    splits = strategy.generate_splits(features, labels)
+    X = features.to_numpy(dtype=float)
+    y = labels.to_numpy()
+
+    per_k = {k: [] for k in k_values}
+    calculator = Metrics()
+    for train_idx, test_idx in splits:
+        index = NeighborIndex().fit(X[train_idx])
+        _, vicini = index.kneighbors(X[test_idx], max(k_values))
+        etichette_vicini = y[train_idx][vicini]
+        for k in k_values:
+            y_pred, probabilities = vote_neighbors(etichette_vicini, k)
+            per_k[k].append(valuta_split(calculator, y[test_idx], y_pred, probabilities, metriche))
+    return per_k
+
+
+def valuta_split(calculator: Metrics, y_real, y_pred, probabilities, metriche: list[str]) -> dict[str, float]:
+    """Mappa le etichette (2 -> 0, 4 -> 1) e calcola le metriche di un singolo split."""
+    y_real, y_pred, probabilities = ValidationMapper.map_static([(list(y_real), list(y_pred), list(probabilities))])[0]
+    return calculator.valuta(y_real, y_pred, probabilities, metriche)
+
+
+def _riassumi(valori: list[dict[str, float]], metriche: list[str]) -> dict[str, float]:
+    """Media e deviazione standard di ogni metrica sugli split."""
+    riassunto = {}
+    for metrica in metriche:
+        serie = np.array([v[metrica] for v in valori])
+        riassunto[metrica] = float(serie.mean())
+        riassunto[f"{metrica} std"] = float(serie.std())
+    riassunto['n_split'] = len(valori)
+    return riassunto
+
+
+def _ordina_risultati(risultati: pd.DataFrame, metrica: str) -> pd.DataFrame:
+    """Ordina i risultati dal migliore al peggiore (per 'Error Rate' il migliore è il più basso)."""
+    crescente = metrica == "Error Rate"
+    return risultati.sort_values(metrica, ascending=crescente, kind='stable').reset_index(drop=True)
+
+
+def _descrivi_strategia(strategy: ValidationProcess) -> str:
+    """Rappresentazione leggibile di una strategia di validazione con i suoi parametri."""
+    parametri = ", ".join(f"{nome}={valore}" for nome, valore in vars(strategy).items())
+    return f"{strategy.__class__.__name__}({parametri})"
@@ -24,7 +24,7 @@ class Holdout(ValidationProcess):
         
         self.test_size = test_size
 
-    def split_data(self, data: pd.DataFrame, labels: pd.Series, k_vicini: int) -> list[tuple[list[int], list[int], list[float]]]:
+    def generate_splits(self, data: pd.DataFrame, labels: pd.Series) -> list[tuple[np.ndarray, np.ndarray]]:
         n_samples = len(data)
         n_test = int(n_samples * self.test_size)  # Calcola il numero di campioni nel test set
 
@@ -38,13 +38,18 @@ class Holdout(ValidationProcess):
         shuffled_indices = np.random.permutation(n_samples)
         test_indices = shuffled_indices[:n_test]
         train_indices = shuffled_indices[n_test:]
+
+        return [(train_indices, test_indices)]
+
+    def split_data(self, data: pd.DataFrame, labels: pd.Series, k_vicini: int) -> list[tuple[list[int], list[int], list[float]]]:
+        train_indices, test_indices = self.generate_splits(data, labels)[0]
         
         # Divisione del dataframe in base alle percentuali richieste
         train_data, test_data = data.iloc[train_indices], data.iloc[test_indices]
         train_labels, test_labels = labels.iloc[train_indices], labels.iloc[test_indices]
         
-        # Addestramento e predizione
-        KNN = CustomKNN(k_vicini) 
+        # Addestramento e predizione (con la strategia 'keep' i dati contengono NaN: distanza parziale)
+        KNN = CustomKNN(k_vicini, nan_aware=bool(data.isna().to_numpy().any()))
         KNN.fit(train_data, train_labels)
         
         # Predizioni delle etichette e probabilità per ogni esempio nel test set
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from .validation import ValidationProcess
+from models.neighbors import NeighborIndex, vote_neighbors
+from metriche.metrics import Metrics
+from preprocesso.mapped_dati import ValidationMapper
+
+
+class LearningCurve:
+    """
+    Curva di apprendimento di `CustomKNN` al crescere della dimensione del training set.
+
+    Per ogni split della strategia di validazione il training set viene mescolato una sola volta:
+    le dimensioni crescenti sono prefissi annidati della stessa permutazione. Le distanze dei punti di
+    test dall'intero training set sono calcolate una sola volta, a blocchi di punti di test; per ogni
+    dimensione i k vicini vengono scelti con `argpartition` tra le colonne del prefisso, senza
+    ricalcolare alcuna distanza e senza ordinare tutto il training set.
+    """
+
+    def __init__(self, strategy: ValidationProcess, frazioni: list[float] = (0.1, 0.25, 0.5, 0.75, 1.0),
+                 metriche: list[str] = ("Accuracy Rate",)):
+        """
+        Args:
+            strategy (ValidationProcess): Strategia che fornisce gli split (deve implementare `generate_splits`).
+            frazioni (list[float]): Frazioni del training set da valutare (comprese tra 0 e 1).
+            metriche (list[str]): Metriche da calcolare per ogni dimensione e split.
+
+        Raises:
+            ValueError: Se le frazioni non sono comprese tra 0 e 1 o non ci sono metriche.
+        """
+        if not frazioni or any(not (0 < f <= 1) for f in frazioni):
+            raise ValueError("Le frazioni del training set devono essere comprese tra 0 e 1")
+        if not metriche:
+            raise ValueError("Serve almeno una metrica")
+
+        self.strategy = strategy
+        self.frazioni = sorted(set(frazioni))
+        self.metriche = list(metriche)
+
+    def run(self, data: pd.DataFrame, labels: pd.Series, k_vicini: int) -> pd.DataFrame:
+        """
+        Calcola la curva di apprendimento.
+
+        Returns:
+            pd.DataFrame: Una riga per (frazione, split) con la dimensione del training set e le metriche,
+            cioè la distribuzione delle metriche per ogni dimensione.
+        """
+        X = data.to_numpy(dtype=float)
+        y = labels.to_numpy()
+        calculator = Metrics()
+
+        righe = []
+        for n_split, (train_idx, test_idx) in enumerate(self.strategy.generate_splits(data, labels)):
+            # Ordine di inclusione annidato: la dimensione n usa i primi n punti della permutazione
+            train_idx = train_idx[np.random.permutation(len(train_idx))]
+
+            dimensioni = [max(1, int(round(frazione * len(train_idx)))) for frazione in self.frazioni]
+            richieste = [(n_train, min(k_vicini, n_train)) for n_train in dimensioni]
+            # Gli indici restituiti sono posizioni nella permutazione, quindi coincidono con l'ordine di inclusione
+            vicini_per_dimensione = NeighborIndex().fit(X[train_idx]).kneighbors_prefixes(X[test_idx], richieste)
+
+            for frazione, (n_train, k), (_, vicini) in zip(self.frazioni, richieste, vicini_per_dimensione):
+                y_pred, probabilities = vote_neighbors(y[train_idx][vicini], k)
+                y_real_m, y_pred_m, proba_m = ValidationMapper.map_static(
+                    [(y[test_idx].tolist(), y_pred.tolist(), probabilities.tolist())]
+                )[0]
+                righe.append({
+                    'frazione': frazione,
+                    'n_train': n_train,
+                    'split': n_split,
+                    **calculator.valuta(y_real_m, y_pred_m, proba_m, self.metriche),
+                })
+
+        return pd.DataFrame(righe)
+
+    def summarize(self, risultati: pd.DataFrame) -> pd.DataFrame:
+        """Media e deviazione standard di ogni metrica per dimensione del training set."""
+        return risultati.groupby(['frazione', 'n_train'])[self.metriche].agg(['mean', 'std'])
+
+    def plot(self, risultati: pd.DataFrame) -> None:
+        """
+        Grafica la curva di apprendimento (media ± deviazione standard) per ogni metrica.
+        """
+        riassunto = self.summarize(risultati).reset_index()
+        plt.figure(figsize=(10, 6))
+        for metrica in self.metriche:
+            media = riassunto[(metrica, 'mean')]
+            dev = riassunto[(metrica, 'std')].fillna(0)
+            plt.plot(riassunto['n_train'], media, marker='o', label=metrica)
+            plt.fill_between(riassunto['n_train'], media - dev, media + dev, alpha=0.2)
+        plt.title("Learning Curve")
+        plt.xlabel("Training set size")
+        plt.ylabel("Value")
+        plt.ylim(0, 1)
+        plt.legend()
+        plt.grid(linestyle="--", alpha=0.7)
+        plt.show()
@@ -33,32 +33,36 @@ class RandomSubsampling(ValidationProcess):
         self.test_size = test_size
 
 
-    def split_data(self, data: pd.DataFrame, labels: pd.Series, k_vicini: int) -> list[tuple[list[int], list[int], list[float]]]:
-        risultati = []
+    def generate_splits(self, data: pd.DataFrame, labels: pd.Series) -> list[tuple[np.ndarray, np.ndarray]]:
+        splits = []
         n_campioni = len(data)
         n_test = int(n_campioni * self.test_size)
 
-        for _ in range(self.n_iterazioni):
-            n_campioni = len(data)
-            n_test = int(n_campioni * self.test_size)
-
-            # Verifica che il numero di campioni nel set di test non sia uguale al totale o maggiore del totale
-            if n_test == 0:
-                raise ValueError("Il set di test è vuoto. Aumenta il valore di test_size")
-            if n_test == n_campioni:
-                raise ValueError("Il set di test è troppo grande. Riduci il valore di test_size per avere un set di training valido") 
+        # Verifica che il numero di campioni nel set di test non sia uguale al totale o maggiore del totale
+        if n_test == 0:
+            raise ValueError("Il set di test è vuoto. Aumenta il valore di test_size")
+        if n_test == n_campioni:
+            raise ValueError("Il set di test è troppo grande. Riduci il valore di test_size per avere un set di training valido") 
 
+        for _ in range(self.n_iterazioni):
             # Mescolare in modo casuale l'ordine degli esempi nel dataset (shuffle)
             shuffled_indices = np.random.permutation(n_campioni)
-            test_indici = shuffled_indices[:n_test]
-            train_indici = shuffled_indices[n_test:]
-            
+            splits.append((shuffled_indices[n_test:], shuffled_indices[:n_test]))
+
+        return splits
+
+    def split_data(self, data: pd.DataFrame, labels: pd.Series, k_vicini: int) -> list[tuple[list[int], list[int], list[float]]]:
+        risultati = []
+        # Con la strategia 'keep' i dati contengono NaN: la distanza parziale va richiesta al classificatore
+        nan_aware = bool(data.isna().to_numpy().any())
+
+        for train_indici, test_indici in self.generate_splits(data, labels):
             # Divisione dataframe
             train_data, test_data = data.iloc[train_indici], data.iloc[test_indici]
             train_labels, test_labels = labels.iloc[train_indici], labels.iloc[test_indici]
             
             # Processo/Predizione
-            KNN = CustomKNN(k_vicini)
+            KNN = CustomKNN(k_vicini, nan_aware=nan_aware)
             KNN.fit(train_data, train_labels)
             
             # Predizioni delle etichette
@@ -23,9 +23,9 @@ class StratifiedValidation(ValidationProcess):
         self.n_iterazioni = iterazioni
         self.test_size = test_size
 
-    def split_data(self, data: pd.DataFrame, labels: pd.Series, k_vicini: int) -> list[tuple[list[int], list[int], list[float]]]:
+    def generate_splits(self, data: pd.DataFrame, labels: pd.Series) -> list[tuple[np.ndarray, np.ndarray]]:
         """
-        Ritorna una lista di tuple (y_test, y_pred, probabilità).
+        Ritorna una lista di tuple (indici di train, indici di test) stratificate per classe.
         """
         n_samples = len(data)
         
@@ -36,7 +36,7 @@ class StratifiedValidation(ValidationProcess):
         if test_count == 0 or test_count == n_samples:
             raise ValueError("Impossibile creare train e test set non vuoti con questi parametri")
         
-        risultati = []
+        splits = []
         # Classi uniche presenti nelle label
         classes = labels.unique()
 
@@ -110,12 +110,25 @@ class StratifiedValidation(ValidationProcess):
             if len(test_idx) == 0 or len(train_idx) == 0:
                 raise ValueError("Non è possibile creare train e test set non vuoti con i parametri specificati.")
             
+            splits.append((np.array(train_idx), np.array(test_idx)))
+
+        return splits
+
+    def split_data(self, data: pd.DataFrame, labels: pd.Series, k_vicini: int) -> list[tuple[list[int], list[int], list[float]]]:
+        """
+        Ritorna una lista di tuple (y_test, y_pred, probabilità).
+        """
+        risultati = []
+        # Con la strategia 'keep' i dati contengono NaN: la distanza parziale va richiesta al classificatore
+        nan_aware = bool(data.isna().to_numpy().any())
+
+        for train_idx, test_idx in self.generate_splits(data, labels):
             # Creazione dei set di train e test
             X_train, X_test = data.iloc[train_idx], data.iloc[test_idx]
             y_train, y_test = labels.iloc[train_idx], labels.iloc[test_idx]
             
             # Addestramento KNN
-            knn = CustomKNN(k_vicini)
+            knn = CustomKNN(k_vicini, nan_aware=nan_aware)
             knn.fit(X_train, y_train)
             
             # Predizione
@@ -0,0 +1,142 @@
+import copy
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from .random_subsampling import RandomSubsampling
+from .grid_search import GridSearch, valuta_k, _riassumi, _descrivi_strategia
+
+
+class SuccessiveHalvingSearch(GridSearch):
+    """
+    Ricerca a dimezzamenti successivi (successive halving) sulla stessa griglia di `GridSearch`.
+
+    Tutti i candidati vengono valutati con poche iterazioni della strategia di validazione;
+    solo la frazione migliore (1/eta) passa al livello successivo, dove riceve eta volte più
+    iterazioni. Le iterazioni già svolte vengono conservate: a ogni livello si eseguono solo
+    quelle aggiuntive. I gruppi di candidati che condividono i dati sono valutati in un pool di processi.
+
+    Ogni job di ogni livello riceve un seme distinto, derivato da `random_state` (o da entropia
+    nuova se None) con `np.random.SeedSequence`: i processi del pool ereditano lo stato casuale del
+    processo principale, quindi senza un seme esplicito ogni livello ripeterebbe gli stessi split.
+    """
+
+    def __init__(self, file_path: str, k_values: list[int], missing_strategies: list[str] = ('remove',),
+                 scaling_strategies: list[str] = ('normalize',), validation_strategies: list = None, *,
+                 min_iterazioni: int = 1, max_iterazioni: int = 27, eta: int = 3, n_jobs: int = None, **kwargs):
+        """
+        Args:
+            min_iterazioni (int): Iterazioni assegnate a ogni candidato nel primo livello.
+            max_iterazioni (int): Iterazioni massime per i candidati dell'ultimo livello.
+            eta (int): Fattore di riduzione: a ogni livello sopravvive 1/eta dei candidati.
+            n_jobs (int, optional): Processi del pool (None = numero di CPU, 1 = esecuzione sequenziale).
+
+        Vedi `GridSearch` per gli altri parametri. Le strategie di validazione devono essere ripetibili
+        (con attributo `n_iterazioni`, come `RandomSubsampling` e `StratifiedValidation`);
+        di default viene usato `RandomSubsampling` con test_size=0.2.
+
+        Raises:
+            ValueError: Se i parametri del budget non sono validi o una strategia non è ripetibile.
+        """
+        if not (0 < min_iterazioni <= max_iterazioni):
+            raise ValueError("Deve valere 0 < min_iterazioni <= max_iterazioni")
+        if eta < 2:
+            raise ValueError("Il fattore eta deve essere almeno 2")
+        if validation_strategies is None:
+            validation_strategies = [RandomSubsampling(test_size=0.2, iterazioni=min_iterazioni)]
+
+        super().__init__(file_path, k_values, missing_strategies, scaling_strategies, validation_strategies, **kwargs)
+        for strategy in self.validation_strategies:
+            if not hasattr(strategy, 'n_iterazioni'):
+                raise ValueError(f"La strategia {strategy.__class__.__name__} non supporta un numero variabile di iterazioni")
+
+        self.min_iterazioni = min_iterazioni
+        self.max_iterazioni = max_iterazioni
+        self.eta = eta
+        self.n_jobs = n_jobs
+
+    def run(self) -> pd.DataFrame:
+        """
+        Esegue i livelli di dimezzamento fino a quando resta un solo candidato o si raggiunge `max_iterazioni`.
+
+        Returns:
+            pd.DataFrame: Classifica di tutti i candidati. I candidati arrivati ai livelli più alti
+            precedono gli altri; a parità di livello l'ordine segue la prima metrica.
+        """
+        candidati = self.candidates()
+        punteggi = {i: [] for i in range(len(candidati))}
+        livello = {}
+        attivi = list(range(len(candidati)))
+
+        iterazioni, gia_svolte, rung = self.min_iterazioni, 0, 0
+        radice = np.random.SeedSequence(self.random_state)
+        while True:
+            print(f"[INFO] Livello {rung}: {len(attivi)} candidati con {iterazioni} iterazioni")
+            semi = radice.spawn(1)[0]
+            for i, valori in self._valuta_candidati(candidati, attivi, iterazioni - gia_svolte, semi).items():
+                punteggi[i].extend(valori)
+                livello[i] = rung
+
+            if len(attivi) <= 1 or iterazioni >= self.max_iterazioni:
+                break
+
+            # Sopravvive solo la frazione migliore dei candidati
+            attivi.sort(key=lambda i: self._punteggio(punteggi[i]), reverse=True)
+            attivi = attivi[:max(1, len(attivi) // self.eta)]
+            gia_svolte, iterazioni = iterazioni, min(iterazioni * self.eta, self.max_iterazioni)
+            rung += 1
+
+        righe = []
+        for i, candidato in enumerate(candidati):
+            righe.append({
+                'k': candidato['k'],
+                'missing_strategy': candidato['missing_strategy'],
+                'scaling_strategy': candidato['scaling_strategy'],
+                'validation': _descrivi_strategia(self.validation_strategies[candidato['validation']]),
+                'rung': livello[i],
+                **_riassumi(punteggi[i], self.metriche),
+            })
+
+        classifica = pd.DataFrame(righe)
+        crescente = self.metriche[0] == "Error Rate"
+        return classifica.sort_values(['rung', self.metriche[0]], ascending=[False, crescente], kind='stable').reset_index(drop=True)
+
+    def _valuta_candidati(self, candidati: list[dict], attivi: list[int], nuove_iterazioni: int,
+                          semi: np.random.SeedSequence) -> dict[int, list[dict[str, float]]]:
+        """
+        Esegue `nuove_iterazioni` iterazioni aggiuntive per i candidati attivi, un job per gruppo di dati.
+        Ogni job usa un seme distinto generato da `semi` (la sequenza del livello).
+
+        Returns:
+            dict[int, list[dict[str, float]]]: Per ogni candidato, le metriche dei nuovi split.
+        """
+        gruppi = {}
+        for i in attivi:
+            candidato = candidati[i]
+            chiave = (candidato['missing_strategy'], candidato['scaling_strategy'], candidato['validation'])
+            gruppi.setdefault(chiave, []).append(i)
+
+        jobs = []
+        for ((missing, scaling, v_idx), indici), figlio in zip(gruppi.items(), semi.spawn(len(gruppi))):
+            seed = int(figlio.generate_state(1)[0])
+            features, labels = self.prepare_data(missing, scaling)
+            strategy = copy.copy(self.validation_strategies[v_idx])
+            strategy.n_iterazioni = nuove_iterazioni
+            k_values = sorted({candidati[i]['k'] for i in indici})
+            jobs.append((indici, (features, labels, strategy, k_values, self.metriche, seed)))
+
+        if self.n_jobs == 1:
+            esiti = [valuta_k(*argomenti) for _, argomenti in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=self.n_jobs) as pool:
+                esiti = list(pool.map(valuta_k, *zip(*(argomenti for _, argomenti in jobs))))
+
+        risultati = {}
+        for (indici, _), per_k in zip(jobs, esiti):
+            for i in indici:
+                risultati[i] = per_k[candidati[i]['k']]
+        return risultati
+
+    def _punteggio(self, valori: list[dict[str, float]]) -> float:
+        """Media della prima metrica; per 'Error Rate' il segno è invertito (più alto = migliore)."""
+        media = sum(v[self.metriche[0]] for v in valori) / len(valori)
+        return -media if self.metriche[0] == "Error Rate" else media
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from abc import ABC, abstractmethod
 
@@ -7,3 +8,10 @@ class ValidationProcess(ABC):
     def split_data(self, data: pd.DataFrame, labels: pd.Series, k:int) -> list[tuple[list[int], list[int]]]:
 
         pass
+
+    @abstractmethod
+    def generate_splits(self, data: pd.DataFrame, labels: pd.Series) -> list[tuple[np.ndarray, np.ndarray]]:
+        """
+        Restituisce le sole suddivisioni (indici posizionali di train e di test), senza addestrare il modello.
+        Permette di riutilizzare gli stessi split per più configurazioni del classificatore.
+        """
@@ -1,5 +1,5 @@
 import pandas as pd
-from validazione import Holdout, RandomSubsampling, StratifiedValidation
+from validazione import Holdout, RandomSubsampling, StratifiedValidation, Bootstrap, AdaptiveValidation
 
 class KNNValidation_main:
     def __init__(self):
@@ -35,6 +35,7 @@ class KNNValidation_main:
         print("A. Holdout")
         print("B. Random Subsampling")
         print("C. Stratified Validation")
+        print("D. Bootstrap (out-of-bag)")
         method = input("Inserisci la lettera corrispondente al metodo: ").upper()
         
         try:
@@ -46,11 +47,17 @@ class KNNValidation_main:
                 training_size = float(input("Inserisci la percentuale di training (0-1, default 0.8): ") or 0.8)
                 self.strategy = RandomSubsampling(iterazioni=iterazioni, test_size=1 - training_size)
                 self.K=iterazioni
+                self.get_adaptive_mode()
             elif method == 'C':
                 iterazioni = int(input("Inserisci il numero di iterazioni (default 5): ") or 5)
                 training_size = float(input("Inserisci la percentuale di training (0-1, default 0.8): ") or 0.8)
                 self.strategy = StratifiedValidation(iterazioni=iterazioni, test_size=1 - training_size)
                 self.K=iterazioni
+                self.get_adaptive_mode()
+            elif method == 'D':
+                iterazioni = int(input("Inserisci il numero di ricampionamenti (default 100): ") or 100)
+                self.strategy = Bootstrap(iterazioni=iterazioni)
+                self.K=iterazioni
             else:
                 print("Scelta non valida. Uso Holdout con test_size=0.2 di default.")
                 self.strategy = Holdout(test_size=0.2)
@@ -58,6 +65,25 @@ class KNNValidation_main:
             print("Errore nell'inserimento dei parametri. Uso Holdout con test_size=0.2 di default.")
             self.strategy = Holdout(test_size=0.2)
     
+    def get_adaptive_mode(self):
+        """
+        Chiede se ripetere la strategia in modalità adattiva: le iterazioni scelte diventano il massimo
+        e ci si ferma prima se l'intervallo di confidenza dell'accuracy è più stretto della tolleranza.
+        """
+        scelta = input("Vuoi fermare le iterazioni quando la stima converge? (s/n, default n): ").strip().lower()
+        if scelta != 's':
+            return
+
+        tolleranza = float(input("Inserisci l'ampiezza massima dell'intervallo di confidenza (default 0.02): ") or 0.02)
+        tempo_massimo = input("Inserisci il tempo massimo in secondi (invio per nessun limite): ").strip()
+        self.strategy = AdaptiveValidation(
+            self.strategy,
+            tolleranza=tolleranza,
+            min_iterazioni=min(5, max(2, self.K)),
+            max_iterazioni=max(2, self.K),
+            tempo_massimo=float(tempo_massimo) if tempo_massimo else None,
+        )
+
     def run(self):
         self.get_k_value()
         self.get_validation_strategy()